@@ -0,0 +1,329 @@
+import asyncio
+import logging
+import math
+import re
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+
+from .deadlines import DeadlineExceeded, current_deadline
+from .exceptions import UpstreamError
+from .metrics import admission_rejections_total
+
+logger = logging.getLogger(__name__)
+
+# Prompts that suggest the person may be at risk; these are admitted ahead of other traffic
+CRISIS_PATTERN = re.compile(
+    r'\b(suicid\w*|kill(ing)? myself|end(ing)? my life|take my (own )?life|want to die|self[- ]?harm\w*|'
+    r'hurt(ing)? myself|cut(ting)? myself|overdos\w*|no reason to live|better off dead)\b',
+    re.IGNORECASE,
+)
+
+
+def is_crisis_prompt(prompt):
+    return isinstance(prompt, str) and CRISIS_PATTERN.search(prompt) is not None
+
+
+def admission_priority(prompt):
+    """True when ``prompt`` should take the priority lane; off unless ``ADMISSION_PRIORITY_ENABLED``."""
+    return getattr(settings, 'ADMISSION_PRIORITY_ENABLED', False) and is_crisis_prompt(prompt)
+
+
+class AdmissionRejected(UpstreamError):
+    """The provider's concurrency limit and wait queue are full; the client should retry later."""
+
+    def __init__(self, provider, retry_after):
+        super().__init__(f'{provider} is busy. Please try again shortly.', 429)
+        self.retry_after = retry_after
+
+
+class Slot:
+    """One admitted upstream call; release() is idempotent."""
+
+    def __init__(self, limiter):
+        self._limiter = limiter
+        self._started = time.monotonic()
+        self._released = False
+        self._lock = threading.Lock()
+
+    def release(self):
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self._limiter._release(time.monotonic() - self._started)
+
+
+class _Waiter:
+    def __init__(self, loop=None):
+        self.slot = None
+        self._loop = loop
+        if loop is None:
+            self._event = threading.Event()
+        else:
+            self._future = loop.create_future()
+
+    def grant(self, slot):
+        # Caller holds the limiter's lock
+        self.slot = slot
+        if self._loop is None:
+            self._event.set()
+        else:
+            self._loop.call_soon_threadsafe(self._wake)
+
+    def _wake(self):
+        if not self._future.done():
+            self._future.set_result(None)
+
+    def wait(self, timeout):
+        self._event.wait(timeout)
+
+    async def await_(self, timeout):
+        try:
+            await asyncio.wait_for(asyncio.shield(self._future), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+class ConcurrencyLimiter:
+    """
+    Per-provider cap on concurrent upstream calls with a bounded wait queue.
+
+    At most ``max_concurrency`` calls run at once; up to ``queue_size`` more
+    wait for a free slot, for no longer than ``queue_timeout`` seconds or the
+    time left on the request deadline. A call that finds the queue full, or
+    that times out waiting, fails fast with AdmissionRejected (429 with a
+    Retry-After estimated from recent call durations) instead of adding to
+    the load on a provider that is already saturated. Priority calls have a
+    lane of their own that is always served first. Threads and event loops
+    can share one limiter. A ``max_concurrency`` of 0 turns the limit off.
+    """
+
+    def __init__(self, name, max_concurrency_setting, max_concurrency=None, queue_size=None, queue_timeout=None,
+                 alpha=0.2):
+        self.name = name
+        self._max_concurrency_setting = max_concurrency_setting
+        self._max_concurrency = max_concurrency
+        self._queue_size = queue_size
+        self._queue_timeout = queue_timeout
+        self._alpha = alpha
+        self._in_flight = 0
+        self._queues = {True: deque(), False: deque()}
+        self._hold_time = None
+        self._lock = threading.Lock()
+        self._counters = {'admitted': 0, 'queued': 0, 'rejected': 0, 'timed_out': 0, 'priority': 0}
+
+    def _setting(self, value, name, default):
+        if value is not None:
+            return value
+        return getattr(settings, name, default)
+
+    @property
+    def max_concurrency(self):
+        return self._setting(self._max_concurrency, self._max_concurrency_setting, 0)
+
+    @property
+    def queue_size(self):
+        return self._setting(self._queue_size, 'ADMISSION_QUEUE_SIZE', 32)
+
+    @property
+    def queue_timeout(self):
+        return self._setting(self._queue_timeout, 'ADMISSION_QUEUE_TIMEOUT', 10)
+
+    def _retry_after(self):
+        # Caller holds self._lock: time for the calls ahead to drain through the slots
+        waiting = len(self._queues[True]) + len(self._queues[False]) + 1
+        hold_time = self._hold_time or 1.0
+        return max(1, math.ceil(hold_time * waiting / max(self.max_concurrency, 1)))
+
+    def _enter(self, priority, loop=None):
+        """Take a slot now, or queue a waiter; returns (slot, waiter)."""
+        limit = self.max_concurrency
+        with self._lock:
+            if priority:
+                self._counters['priority'] += 1
+            if limit <= 0 or (self._in_flight < limit and not self._queues[True] and
+                              (priority or not self._queues[False])):
+                self._in_flight += 1
+                self._counters['admitted'] += 1
+                return Slot(self), None
+            queue = self._queues[priority]
+            if len(queue) >= self.queue_size:
+                self._counters['rejected'] += 1
+                retry_after = self._retry_after()
+                admission_rejections_total.inc(provider=self.name, reason='queue_full')
+            else:
+                waiter = _Waiter(loop)
+                queue.append(waiter)
+                self._counters['queued'] += 1
+                return None, waiter
+        logger.warning(f"{self.name} admission queue is full, rejecting the request")
+        raise AdmissionRejected(self.name, retry_after)
+
+    def _wait_time(self):
+        timeout = self.queue_timeout
+        deadline = current_deadline()
+        if deadline is not None:
+            return min(timeout, deadline.remaining()), deadline
+        return timeout, None
+
+    def _leave(self, waiter, priority, deadline):
+        """Give up on a waiter that timed out, unless it was granted a slot meanwhile."""
+        with self._lock:
+            if waiter.slot is not None:
+                return waiter.slot
+            self._queues[priority].remove(waiter)
+            self._counters['timed_out'] += 1
+            retry_after = self._retry_after()
+            admission_rejections_total.inc(provider=self.name, reason='timed_out')
+        if deadline is not None and deadline.expired():
+            raise DeadlineExceeded()
+        raise AdmissionRejected(self.name, retry_after)
+
+    def acquire(self, priority=False):
+        """Block until a slot is free and return it; raises AdmissionRejected or DeadlineExceeded."""
+        slot, waiter = self._enter(priority)
+        if slot is not None:
+            return slot
+        timeout, deadline = self._wait_time()
+        waiter.wait(max(timeout, 0))
+        return self._leave(waiter, priority, deadline)
+
+    async def aacquire(self, priority=False):
+        """Async acquire(); waits without blocking the event loop."""
+        slot, waiter = self._enter(priority, asyncio.get_running_loop())
+        if slot is not None:
+            return slot
+        timeout, deadline = self._wait_time()
+        try:
+            await waiter.await_(max(timeout, 0))
+        except asyncio.CancelledError:
+            # Hand back a slot granted while this task was being cancelled
+            slot = self._leave_quietly(waiter, priority)
+            if slot is not None:
+                slot.release()
+            raise
+        return self._leave(waiter, priority, deadline)
+
+    def _leave_quietly(self, waiter, priority):
+        with self._lock:
+            if waiter.slot is None:
+                self._queues[priority].remove(waiter)
+            return waiter.slot
+
+    def _release(self, hold_time):
+        with self._lock:
+            if self._hold_time is None:
+                self._hold_time = hold_time
+            else:
+                self._hold_time += self._alpha * (hold_time - self._hold_time)
+            for queue in (self._queues[True], self._queues[False]):
+                if queue:
+                    # The slot passes straight to the next waiter, so in_flight is unchanged
+                    self._counters['admitted'] += 1
+                    queue.popleft().grant(Slot(self))
+                    return
+            self._in_flight -= 1
+
+    @contextmanager
+    def slot(self, priority=False):
+        slot = self.acquire(priority)
+        try:
+            yield slot
+        finally:
+            slot.release()
+
+    @asynccontextmanager
+    async def aslot(self, priority=False):
+        slot = await self.aacquire(priority)
+        try:
+            yield slot
+        finally:
+            slot.release()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats['in_flight'] = self._in_flight
+            stats['waiting'] = len(self._queues[True]) + len(self._queues[False])
+            stats['hold_time'] = self._hold_time
+        stats['max_concurrency'] = self.max_concurrency
+        return stats
+
+
+class release_after:
+    """
+    Iterate a stream of response chunks and release ``slot`` once it is done.
+
+    The slot is released when the stream is exhausted, raises or is closed,
+    including a response that is closed before it was ever iterated. A
+    generator closed before it started never runs its own cleanup, so the
+    ``upstream`` response it reads from, if given, is closed here as well.
+    """
+
+    def __init__(self, iterable, slot, upstream=None):
+        self._iterable = iterable
+        self._slot = slot
+        self._upstream = upstream
+
+    def __iter__(self):
+        try:
+            yield from self._iterable
+        finally:
+            self._slot.release()
+
+    def close(self):
+        try:
+            close = getattr(self._iterable, 'close', None)
+            if close is not None:
+                close()
+            if self._upstream is not None:
+                self._upstream.close()
+        finally:
+            self._slot.release()
+
+
+class arelease_after:
+    """
+    Async release_after() for an async iterator.
+
+    Django closes responses from a worker thread with the sync close(),
+    which runs aclose() back on the event loop so the wrapped iterator and
+    the ``upstream`` httpx response are closed where they were opened.
+    """
+
+    def __init__(self, iterable, slot, upstream=None):
+        self._iterable = iterable
+        self._slot = slot
+        self._upstream = upstream
+
+    async def _iterate(self):
+        try:
+            async for item in self._iterable:
+                yield item
+        finally:
+            self._slot.release()
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def aclose(self):
+        try:
+            aclose = getattr(self._iterable, 'aclose', None)
+            if aclose is not None:
+                await aclose()
+            if self._upstream is not None:
+                await self._upstream.aclose()
+        finally:
+            self._slot.release()
+
+    def close(self):
+        async_to_sync(self.aclose)()
+
+
+nvcf_limiter = ConcurrencyLimiter('NVCF', 'NVCF_MAX_CONCURRENCY')
+gemini_limiter = ConcurrencyLimiter('Gemini', 'GEMINI_MAX_CONCURRENCY')
@@ -0,0 +1,81 @@
+import asyncio
+import weakref
+
+import httpx
+from django.conf import settings
+
+from .deadlines import DeadlineExceeded, upstream_timeout
+from .http_client import UpstreamClient
+
+
+class AsyncUpstreamClient(UpstreamClient):
+    """
+    Non-blocking counterpart of UpstreamClient for the async views.
+
+    httpx clients are bound to the event loop that created them, so one
+    ``httpx.AsyncClient`` is kept per running loop: under ASGI that is a
+    single pooled client for the whole process. Timeouts and keep-alive
+    come from the same settings as the synchronous client, but the
+    connection cap is separate since one loop carries many requests.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._clients = weakref.WeakKeyDictionary()
+
+    def client(self):
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=getattr(settings, 'UPSTREAM_ASYNC_MAX_CONNECTIONS', 100),
+                    max_keepalive_connections=self._setting(self._pool_maxsize, 'UPSTREAM_POOL_MAXSIZE', 10),
+                ),
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+            )
+            self._clients[loop] = client
+        return client
+
+    async def request(self, method, url, connect_timeout=None, read_timeout=None, stream=False, **kwargs):
+        """Send a request; with ``stream=True`` the caller must ``aclose()`` the response."""
+        connect_timeout, _ = upstream_timeout(connect_timeout if connect_timeout is not None else self.connect_timeout)
+        read_timeout, limited = upstream_timeout(read_timeout if read_timeout is not None else self.read_timeout)
+        timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        client = self.client()
+        self._count('requests')
+        self._count('in_flight')
+        try:
+            request = client.build_request(method, url, timeout=timeout, **kwargs)
+            return await client.send(request, stream=stream)
+        except httpx.TimeoutException as e:
+            self._count('timeouts')
+            self._count('errors')
+            if limited:
+                raise DeadlineExceeded() from e
+            raise
+        except httpx.HTTPError:
+            self._count('errors')
+            raise
+        finally:
+            self._count('in_flight', -1)
+
+    async def get(self, url, **kwargs):
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request('POST', url, **kwargs)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        stats['clients'] = len(self._clients)
+        return stats
+
+    async def aclose(self):
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+
+async_upstream_client = AsyncUpstreamClient()
@@ -0,0 +1,338 @@
+import asyncio
+import json
+import logging
+import os
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from django.views import View
+
+from .admission import admission_priority, arelease_after, nvcf_limiter
+from .cache import roadmap_cache, roadmap_cache_key, roadmap_flights
+from .hedging import chat_hedger, roadmap_hedger
+from .deadlines import current_deadline, with_request_deadline
+from .exceptions import UpstreamError
+from .metrics import (
+    cache_requests_total, catalog_lookup_seconds, observe_request, parse_failures_total, parse_seconds,
+    record_usage, set_request_model, upstream_seconds
+)
+from .nvcf import CatalogError, chat_completion_result, chat_headers, function_catalog, pexec_url
+from .prompts import ROADMAP_MODEL_NAME, build_chat_payload
+from .registry import providers
+from .resilience import budgeted_retry, nvcf_breaker
+from .response_store import chat_store_key, response_store, roadmap_store_key
+from .router import model_router
+from .roadmap import RoadmapError, parse_roadmap
+from .roadmap_library import LIBRARY_MODEL_NAME, library_roadmap
+from .streaming import astream_chat_completion, sse_response, wants_stream
+from .views import batch_item_error, batch_prompts
+
+logger = logging.getLogger(__name__)
+
+async_upstream_client = providers.proxy('nvcf_async')
+gemini_provider = providers.proxy('gemini')
+
+
+def _request_json(request):
+    """Decode a JSON request body; returns None when it is not a JSON object."""
+    try:
+        data = json.loads(request.body or b'{}')
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _error(message, status):
+    return JsonResponse({'error': message}, status=status)
+
+
+def _upstream_error(e):
+    response = _error(e.message, e.status_code)
+    retry_after = getattr(e, 'retry_after', None)
+    if retry_after is not None:
+        response['Retry-After'] = str(retry_after)
+    return response
+
+
+async def _text_generation_functions(api_key):
+    # After the first lookup the catalog answers from memory without blocking
+    functions = function_catalog.cached(api_key)
+    if functions is None:
+        functions = await sync_to_async(function_catalog.get, thread_sensitive=False)(api_key)
+    return functions
+
+
+class AsyncMentalHealthManagementView(View):
+    """
+    ASGI-native version of MentalHealthManagementView.
+
+    The upstream call is awaited on a shared ``httpx.AsyncClient`` so the
+    worker is free while the model generates; request and response bodies
+    match the synchronous view, including the opt-in SSE stream.
+    """
+
+    http_method_names = ['post', 'options']
+
+    async def call_function(self, api_key, function, prompt, stream=False):
+        """POST the prompt to one NVCF function, reporting latency and outcome to the router and breaker."""
+        import httpx
+
+        nvcf_breaker.before_call()
+        started = time.monotonic()
+        try:
+            with upstream_seconds.time(view=type(self).__name__, model=function['model_name']):
+                response = await async_upstream_client.post(
+                    pexec_url(function['function_id'], function['version_id']),
+                    headers=chat_headers(api_key, stream=stream),
+                    json=build_chat_payload(function['model_name'], prompt, stream=stream),
+                    stream=stream
+                )
+        except httpx.HTTPError:
+            model_router.record(function['function_id'], time.monotonic() - started, ok=False)
+            nvcf_breaker.record_failure()
+            raise
+        model_router.record(function['function_id'], time.monotonic() - started, ok=response.status_code == 200)
+        # Client errors other than rate limiting say nothing about the provider's health
+        nvcf_breaker.record(response.status_code < 500 and response.status_code != 429)
+        return response
+
+    async def complete(self, api_key, function, prompt):
+        store_key = chat_store_key(function['model_name'], prompt)
+        stored = await response_store.aget(store_key)
+        if stored is not None:
+            return stored
+        async with nvcf_limiter.aslot(admission_priority(prompt)):
+            response = await self.call_function(api_key, function, prompt)
+            try:
+                result = chat_completion_result(response)
+            finally:
+                await response.aclose()
+        record_usage(type(self).__name__, function['model_name'], result['usage'])
+        await response_store.aset(store_key, result, 'nvcf', function['model_name'])
+        return result
+
+    @observe_request
+    @with_request_deadline
+    async def post(self, request):
+        import httpx
+
+        data = _request_json(request)
+        if data is None:
+            return _error('Request body must be a JSON object', 400)
+
+        try:
+            prompt = data.get('prompt')
+            if not isinstance(prompt, str) or not prompt:
+                return _error('Prompt is required', 400)
+
+            # Get API key from environment
+            api_key = os.getenv('AI_API_KEY')
+            if not api_key:
+                logger.error("AI_API_KEY not found in environment variables")
+                return _error('API configuration error. Please check server configuration.', 500)
+
+            try:
+                with catalog_lookup_seconds.time(view=type(self).__name__):
+                    functions = await _text_generation_functions(api_key)
+            except CatalogError as e:
+                return _upstream_error(e)
+            selected_function = model_router.choose(functions)
+            set_request_model(selected_function['model_name'])
+
+            if wants_stream(request, data):
+                # The admission slot is held until the stream is done
+                slot = await nvcf_limiter.aacquire(admission_priority(prompt))
+                try:
+                    response = await self.call_function(api_key, selected_function, prompt, stream=True)
+                except BaseException:
+                    slot.release()
+                    raise
+                if response.status_code == 200:
+                    return sse_response(arelease_after(astream_chat_completion(
+                        response, selected_function['model_name'], deadline=current_deadline()
+                    ), slot, upstream=response))
+                slot.release()
+                try:
+                    await response.aread()
+                    return JsonResponse(chat_completion_result(response))
+                except UpstreamError as e:
+                    return _upstream_error(e)
+                finally:
+                    await response.aclose()
+
+            # A slow answer is hedged with a call to another function when HEDGE_ENABLED is set
+            try:
+                return JsonResponse(await chat_hedger.acall(
+                    lambda: self.complete(api_key, selected_function, prompt),
+                    lambda: self.complete(api_key, model_router.alternate(functions, selected_function), prompt)
+                ))
+            except UpstreamError as e:
+                return _upstream_error(e)
+
+        except UpstreamError as e:
+            return _upstream_error(e)
+        except httpx.TimeoutException:
+            logger.error("Timed out waiting for the AI service")
+            return _error('AI service timed out. Please try again later.', 504)
+        except Exception:
+            logger.exception("An error occurred while processing the request")
+            return _error('An unexpected error occurred. Please try again later.', 500)
+
+
+class AsyncMentalHealthBatchView(AsyncMentalHealthManagementView):
+    """ASGI-native version of MentalHealthBatchView; the prompts are awaited concurrently under a semaphore."""
+
+    async def complete_item(self, semaphore, api_key, function, prompt):
+        if not isinstance(prompt, str) or not prompt:
+            return {'error': 'Prompt is required', 'status': 400}
+        async with semaphore:
+            try:
+                return await self.complete(api_key, function, prompt)
+            except Exception as e:
+                return batch_item_error(e)
+
+    @observe_request
+    @with_request_deadline
+    async def post(self, request):
+        data = _request_json(request)
+        if data is None:
+            return _error('Request body must be a JSON object', 400)
+
+        try:
+            try:
+                prompts = batch_prompts(data)
+            except ValueError as e:
+                return _error(str(e), 400)
+
+            # Get API key from environment
+            api_key = os.getenv('AI_API_KEY')
+            if not api_key:
+                logger.error("AI_API_KEY not found in environment variables")
+                return _error('API configuration error. Please check server configuration.', 500)
+
+            try:
+                with catalog_lookup_seconds.time(view=type(self).__name__):
+                    functions = await _text_generation_functions(api_key)
+            except CatalogError as e:
+                return _upstream_error(e)
+            selected_function = model_router.choose(functions)
+            set_request_model(selected_function['model_name'])
+
+            semaphore = asyncio.Semaphore(getattr(settings, 'BATCH_MAX_CONCURRENCY', 8))
+            results = await asyncio.gather(*(
+                self.complete_item(semaphore, api_key, selected_function, prompt) for prompt in prompts
+            ))
+            return JsonResponse({'model': selected_function['model_name'], 'results': list(results)})
+
+        except Exception:
+            logger.exception("An error occurred while processing the batch request")
+            return _error('An unexpected error occurred. Please try again later.', 500)
+
+
+class AsyncWellbeingRoadmapView(View):
+    """ASGI-native version of WellbeingRoadmapView using Gemini's async generate call."""
+
+    http_method_names = ['post', 'options']
+
+    @budgeted_retry((TimeoutError, ConnectionError))
+    async def generate_roadmap(self, prompt):
+        try:
+            # A slow generation is hedged with a second Gemini call when HEDGE_ENABLED is set
+            with upstream_seconds.time(view=type(self).__name__, model=ROADMAP_MODEL_NAME):
+                return await roadmap_hedger.acall(
+                    lambda: gemini_provider.generate_async(prompt),
+                    lambda: gemini_provider.generate_async(prompt)
+                )
+        except Exception as e:
+            logger.error(f"Error generating roadmap: {str(e)}")
+            raise
+
+    async def build_roadmap(self, prompt, cache_key):
+        """Generate, validate and cache one roadmap body, raising UpstreamError on failure."""
+        try:
+            response = await self.generate_roadmap(prompt)
+        except UpstreamError:
+            # Open circuits and missed deadlines keep their own status codes
+            raise
+        except Exception as e:
+            logger.exception("Error generating response with Gemini")
+            raise UpstreamError(f'Failed to generate roadmap: {str(e)}', 500)
+
+        view = type(self).__name__
+        try:
+            with parse_seconds.time(view=view, model=ROADMAP_MODEL_NAME):
+                roadmap_data = parse_roadmap(response.text)
+        except RoadmapError:
+            parse_failures_total.inc(view=view, model=ROADMAP_MODEL_NAME)
+            raise
+        body = {
+            'roadmap': roadmap_data,
+            'model': ROADMAP_MODEL_NAME,
+            'usage': response.usage if hasattr(response, 'usage') else {}
+        }
+        record_usage(view, ROADMAP_MODEL_NAME, body['usage'])
+        roadmap_cache.set(cache_key, body)
+        await response_store.aset(roadmap_store_key(prompt), body, 'gemini', ROADMAP_MODEL_NAME)
+        return body
+
+    @observe_request
+    @with_request_deadline
+    async def post(self, request):
+        data = _request_json(request)
+        if data is None:
+            return _error('Request body must be a JSON object', 400)
+
+        try:
+            prompt = data.get('prompt')
+            if not isinstance(prompt, str) or not prompt:
+                return _error('Prompt is required', 400)
+
+            # Get API key from environment
+            api_key = os.getenv('GEMINI_API_KEY')
+            if not api_key:
+                logger.error("GEMINI_API_KEY not found in environment variables")
+                return _error('API configuration error. Please check server configuration.', 500)
+
+            # Prompts squarely about a common theme get a curated roadmap without a Gemini call
+            curated = library_roadmap(prompt)
+            if curated is not None:
+                set_request_model(LIBRARY_MODEL_NAME)
+                cache_requests_total.inc(view=type(self).__name__, result='library')
+                response = JsonResponse(curated)
+                response['X-Cache'] = 'LIBRARY'
+                return response
+
+            set_request_model(ROADMAP_MODEL_NAME)
+            cache_key = roadmap_cache_key(ROADMAP_MODEL_NAME, prompt)
+            cached = roadmap_cache.get(cache_key)
+            if cached is not None:
+                cache_requests_total.inc(view=type(self).__name__, result='hit')
+                response = JsonResponse(cached)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            # Generated by another worker, or before the last restart
+            stored = await response_store.aget(roadmap_store_key(prompt))
+            if stored is not None:
+                roadmap_cache.set(cache_key, stored)
+                cache_requests_total.inc(view=type(self).__name__, result='stored')
+                response = JsonResponse(stored)
+                response['X-Cache'] = 'STORED'
+                return response
+
+            try:
+                body, shared = await roadmap_flights.do_async(cache_key, lambda: self.build_roadmap(prompt, cache_key))
+            except UpstreamError as e:
+                cache_requests_total.inc(view=type(self).__name__, result='miss')
+                return _upstream_error(e)
+
+            cache_requests_total.inc(view=type(self).__name__, result='shared' if shared else 'miss')
+            response = JsonResponse(body)
+            response['X-Cache'] = 'SHARED' if shared else 'MISS'
+            return response
+
+        except Exception:
+            logger.exception("An error occurred while processing the request")
+            return _error('An unexpected error occurred. Please try again later.', 500)
@@ -0,0 +1,220 @@
+import asyncio
+import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .deadlines import DeadlineExceeded, current_deadline
+
+_PUNCTUATION = re.compile(r'[^\w\s]+')
+
+
+def normalize_prompt(prompt):
+    """Fold case, punctuation and whitespace so trivially different prompts share a key."""
+    return ' '.join(_PUNCTUATION.sub(' ', prompt.casefold()).split())
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache whose entries also expire after a TTL.
+
+    ``maxsize`` and ``ttl`` may be given directly or read from the named
+    settings on each access, so tests and deployments can change them
+    without rebuilding the cache.
+    """
+
+    def __init__(self, maxsize=None, ttl=None, maxsize_setting=None, ttl_setting=None):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._maxsize_setting = maxsize_setting
+        self._ttl_setting = ttl_setting
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    @property
+    def maxsize(self):
+        if self._maxsize is not None:
+            return self._maxsize
+        return getattr(settings, self._maxsize_setting, 128)
+
+    @property
+    def ttl(self):
+        if self._ttl is not None:
+            return self._ttl
+        return getattr(settings, self._ttl_setting, 3600)
+
+    def get(self, key):
+        """Return the cached value or None, counting the hit or miss."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self._counters['misses'] += 1
+                return None
+            value, stored_at = item
+            if time.monotonic() - stored_at >= self.ttl:
+                del self._data[key]
+                self._counters['expirations'] += 1
+                self._counters['misses'] += 1
+                return None
+            self._data.move_to_end(key)
+            self._counters['hits'] += 1
+            return value
+
+    def set(self, key, value):
+        maxsize = self.maxsize
+        if maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > maxsize:
+                self._data.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats['size'] = len(self._data)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['maxsize'] = self.maxsize
+        return stats
+
+
+def _time_left():
+    deadline = current_deadline()
+    return None if deadline is None else max(deadline.remaining(), 0)
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapse identical concurrent calls into one.
+
+    The first caller for a key runs the function; callers that arrive with
+    the same key while it is still running wait for it and receive its
+    result, or re-raise its exception, instead of starting their own call.
+    Nothing is kept once the call finishes, so this complements a cache
+    rather than replacing it. Threads and event-loop tasks are tracked
+    separately, the latter per loop. A waiter gives up with DeadlineExceeded
+    when its own request deadline passes first.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._tasks = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._counters = {'calls': 0, 'shared': 0, 'shared_errors': 0}
+
+    def do(self, key, func):
+        """Return ``(result, shared)``; ``shared`` is True when another caller did the work."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._counters['calls'] += 1
+            else:
+                self._counters['shared'] += 1
+
+        if not leader:
+            if not call.done.wait(_time_left()):
+                raise DeadlineExceeded()
+            if call.error is not None:
+                self._count('shared_errors')
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    async def do_async(self, key, func):
+        """
+        Async counterpart of do(); ``func`` is a coroutine function.
+
+        The call runs as its own task and every caller awaits it through
+        ``asyncio.shield``, so one client disconnecting does not cancel the
+        call for everyone else waiting on it.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            tasks = self._tasks.setdefault(loop, {})
+            task = tasks.get(key)
+            leader = task is None
+            if leader:
+                task = tasks[key] = loop.create_task(func())
+                task.add_done_callback(lambda t: self._finish_task(tasks, key, t))
+                self._counters['calls'] += 1
+            else:
+                self._counters['shared'] += 1
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), _time_left()), not leader
+        except asyncio.TimeoutError:
+            if task.done():
+                raise
+            raise DeadlineExceeded()
+        except asyncio.CancelledError:
+            raise
+        except BaseException:
+            if not leader:
+                self._count('shared_errors')
+            raise
+
+    def _finish_task(self, tasks, key, task):
+        with self._lock:
+            if tasks.get(key) is task:
+                del tasks[key]
+        # Mark the exception as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats['in_flight'] = len(self._calls) + sum(len(tasks) for tasks in self._tasks.values())
+        requests = stats['calls'] + stats['shared']
+        stats['saved_rate'] = stats['shared'] / requests if requests else 0.0
+        return stats
+
+
+# Validated roadmaps keyed on (model, normalized prompt)
+roadmap_cache = LRUCache(maxsize_setting='ROADMAP_CACHE_SIZE', ttl_setting='ROADMAP_CACHE_TTL')
+
+# Roadmap generations in progress, keyed like roadmap_cache; ``shared`` counts Gemini calls saved
+roadmap_flights = SingleFlight()
+
+
+def roadmap_cache_key(model_name, prompt):
+    return (model_name, normalize_prompt(prompt))
@@ -0,0 +1,111 @@
+import contextvars
+import functools
+import inspect
+import logging
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from .exceptions import UpstreamError
+
+logger = logging.getLogger(__name__)
+
+# Seconds the client is willing to wait, e.g. ``X-Request-Timeout: 12.5``
+DEADLINE_HEADER = 'X-Request-Timeout'
+
+
+class DeadlineExceeded(UpstreamError):
+    """The request ran out of time before the upstream call could finish."""
+
+    def __init__(self, message='The request took too long to complete. Please try again.'):
+        super().__init__(message, 504)
+
+
+class Deadline:
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return self.expires_at - time.monotonic()
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def check(self):
+        if self.expired():
+            raise DeadlineExceeded()
+
+
+_current = contextvars.ContextVar('request_deadline', default=None)
+
+
+def current_deadline():
+    """The Deadline of the request being handled in this thread or task, if any."""
+    return _current.get()
+
+
+def deadline_seconds(headers):
+    """
+    Seconds this request may take: the client's header when it is valid,
+    otherwise ``REQUEST_DEADLINE``, never more than ``REQUEST_DEADLINE_MAX``.
+    """
+    default = getattr(settings, 'REQUEST_DEADLINE', 60)
+    maximum = getattr(settings, 'REQUEST_DEADLINE_MAX', 120)
+    value = headers.get(DEADLINE_HEADER)
+    seconds = default
+    if value:
+        try:
+            seconds = float(value)
+        except ValueError:
+            logger.warning(f"Ignoring invalid {DEADLINE_HEADER} header: {value}")
+        if not seconds > 0:
+            seconds = default
+    return min(seconds, maximum)
+
+
+def upstream_timeout(timeout):
+    """
+    Shrink an upstream timeout to the time left on the current deadline.
+
+    Returns ``(timeout, limited)`` where ``limited`` says the deadline, not
+    the configured timeout, is the binding limit; a timeout in that case is
+    reported as DeadlineExceeded rather than as a provider failure. Raises
+    DeadlineExceeded straight away when no time is left.
+    """
+    deadline = current_deadline()
+    if deadline is None:
+        return timeout, False
+    remaining = deadline.remaining()
+    if remaining <= 0:
+        raise DeadlineExceeded()
+    if remaining < timeout:
+        return remaining, True
+    return timeout, False
+
+
+@contextmanager
+def request_deadline(seconds):
+    """Make a Deadline ``seconds`` from now current for the enclosed code."""
+    deadline = Deadline(seconds)
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def with_request_deadline(view_method):
+    """Run a view's handler under the deadline taken from the request headers."""
+    if inspect.iscoroutinefunction(view_method):
+        @functools.wraps(view_method)
+        async def wrapper(self, request, *args, **kwargs):
+            with request_deadline(deadline_seconds(request.headers)):
+                return await view_method(self, request, *args, **kwargs)
+    else:
+        @functools.wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            with request_deadline(deadline_seconds(request.headers)):
+                return view_method(self, request, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,9 @@
+class UpstreamError(Exception):
+    """An upstream AI call failed in a way that maps onto an HTTP error for the client."""
+
+    def __init__(self, message, status_code=500, upstream_status=None):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+        # The provider's own HTTP status, when it differs from the one sent to the client
+        self.upstream_status = upstream_status
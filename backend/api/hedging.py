@@ -0,0 +1,227 @@
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+# One per pool worker; a call takes them up front so its work never queues
+_slots = None
+
+
+def _get_executor():
+    global _executor, _slots
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                max_workers = getattr(settings, 'HEDGE_MAX_WORKERS', 32)
+                _slots = threading.BoundedSemaphore(max_workers)
+                _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hedge')
+    return _executor
+
+
+def _reserve(count):
+    """Take ``count`` pool workers without waiting, or none if that many are not free."""
+    _get_executor()
+    taken = 0
+    while taken < count and _slots.acquire(blocking=False):
+        taken += 1
+    if taken < count:
+        for _ in range(taken):
+            _slots.release()
+        return False
+    return True
+
+
+def _submit(func):
+    """Run ``func`` on a reserved worker, in a copy of this context so it sees the request deadline."""
+    future = _get_executor().submit(contextvars.copy_context().run, func)
+    slots = _slots
+    future.add_done_callback(lambda _: slots.release())
+    return future
+
+
+class Hedger:
+    """
+    Hedged upstream calls for one endpoint.
+
+    The latencies of successful calls are kept in a rolling window. Once it
+    holds ``HEDGE_MIN_SAMPLES`` of them, a call that has not answered by the
+    ``HEDGE_PERCENTILE`` latency gets a second, hedge call; whichever
+    succeeds first wins and the other is cancelled (async) or discarded when
+    it finishes (threads cannot be interrupted). Hedges are paid for from a
+    token bucket that every primary call tops up by ``HEDGE_BUDGET_RATIO``,
+    so extra upstream load stays within that fraction of traffic.
+    Synchronous calls run on a pool of ``HEDGE_MAX_WORKERS`` threads; when
+    it has no room for both calls, the primary runs unhedged on the
+    caller's thread rather than queueing.
+    Hedging is off unless ``HEDGE_ENABLED`` is set.
+    """
+
+    def __init__(self, name, enabled=None, percentile=None, min_samples=None, window=None, budget_ratio=None):
+        self.name = name
+        self._enabled = enabled
+        self._percentile = percentile
+        self._min_samples = min_samples
+        self._budget_ratio = budget_ratio
+        self._latencies = deque(maxlen=window or getattr(settings, 'HEDGE_WINDOW', 200))
+        self._tokens = 0.0
+        self._lock = threading.Lock()
+        self._counters = {'calls': 0, 'hedged': 0, 'hedge_wins': 0, 'budget_exhausted': 0, 'pool_full': 0}
+
+    def _setting(self, value, name, default):
+        if value is not None:
+            return value
+        return getattr(settings, name, default)
+
+    @property
+    def enabled(self):
+        return self._setting(self._enabled, 'HEDGE_ENABLED', False)
+
+    @property
+    def percentile(self):
+        return self._setting(self._percentile, 'HEDGE_PERCENTILE', 95)
+
+    @property
+    def min_samples(self):
+        return self._setting(self._min_samples, 'HEDGE_MIN_SAMPLES', 20)
+
+    @property
+    def budget_ratio(self):
+        return self._setting(self._budget_ratio, 'HEDGE_BUDGET_RATIO', 0.1)
+
+    def delay(self):
+        """Seconds to wait before hedging, or None while hedging is off or there is too little data."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            if len(self._latencies) < max(self.min_samples, 1):
+                return None
+            ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return ordered[index]
+
+    def observe(self, latency):
+        with self._lock:
+            self._latencies.append(latency)
+
+    def _start(self):
+        # Each primary call earns a fraction of a hedge; a few can be banked for bursts
+        ratio = self.budget_ratio
+        with self._lock:
+            self._counters['calls'] += 1
+            self._tokens = min(self._tokens + ratio, max(1.0, ratio * 100))
+
+    def _spend(self):
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                self._counters['hedged'] += 1
+                return True
+            self._counters['budget_exhausted'] += 1
+            return False
+
+    def _won(self, hedge):
+        if hedge:
+            with self._lock:
+                self._counters['hedge_wins'] += 1
+            logger.info(f"Hedged {self.name} call answered first")
+
+    def _timed(self, func):
+        started = time.monotonic()
+        result = func()
+        self.observe(time.monotonic() - started)
+        return result
+
+    async def _atimed(self, func):
+        started = time.monotonic()
+        result = await func()
+        self.observe(time.monotonic() - started)
+        return result
+
+    def call(self, primary, hedge):
+        """
+        Run ``primary()``, hedging with ``hedge()`` once it is slower than the percentile.
+
+        Returns the first successful result; if both fail, the primary's
+        exception is raised. A loser that has not started is cancelled, a
+        running one is left to finish and its result dropped.
+        """
+        self._start()
+        delay = self.delay()
+        if delay is None:
+            return self._timed(primary)
+
+        # A primary queued behind other requests would look slow and draw a
+        # needless hedge, so workers for both calls are taken before starting
+        if not _reserve(2):
+            with self._lock:
+                self._counters['pool_full'] += 1
+            return self._timed(primary)
+
+        first = _submit(lambda: self._timed(primary))
+        done, _ = wait([first], timeout=delay)
+        if done or not self._spend():
+            _slots.release()
+            return first.result()
+
+        second = _submit(lambda: self._timed(hedge))
+        pending = {first, second}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for loser in pending:
+                        loser.cancel()
+                    self._won(future is second)
+                    return future.result()
+        return first.result()
+
+    async def acall(self, primary, hedge):
+        """Async call(); ``primary`` and ``hedge`` are coroutine functions and the loser is cancelled."""
+        self._start()
+        delay = self.delay()
+        if delay is None:
+            return await self._atimed(primary)
+
+        tasks = [asyncio.ensure_future(self._atimed(primary))]
+        first = tasks[0]
+        try:
+            done, _ = await asyncio.wait({first}, timeout=delay)
+            if done or not self._spend():
+                return await first
+
+            second = asyncio.ensure_future(self._atimed(hedge))
+            tasks.append(second)
+            pending = {first, second}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self._won(task is second)
+                        return task.result()
+            return first.result()
+        finally:
+            # Cancels the losing call, or both if this request itself was cancelled
+            for task in tasks:
+                task.cancel()
+
+    def stats(self):
+        delay = self.delay()
+        with self._lock:
+            stats = dict(self._counters)
+            stats['samples'] = len(self._latencies)
+            stats['budget'] = self._tokens
+        stats['delay'] = delay
+        return stats
+
+
+chat_hedger = Hedger('chat')
+roadmap_hedger = Hedger('roadmap')
@@ -0,0 +1,129 @@
+import logging
+import threading
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from .deadlines import DeadlineExceeded, upstream_timeout
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamClient:
+    """
+    Shared HTTP client for calls to upstream AI providers.
+
+    One ``requests.Session`` with a bounded, blocking connection pool is
+    created lazily and reused by every thread, so connections are kept alive
+    between calls instead of paying a new TCP+TLS handshake each time. Every
+    call gets a connect and read timeout, falling back to the configured
+    defaults when the caller does not pass one.
+    """
+
+    def __init__(self, pool_connections=None, pool_maxsize=None, connect_timeout=None, read_timeout=None):
+        self._pool_connections = pool_connections
+        self._pool_maxsize = pool_maxsize
+        self._connect_timeout = connect_timeout
+        self._read_timeout = read_timeout
+        self._session = None
+        self._adapter = None
+        self._lock = threading.Lock()
+        self._counters = {'requests': 0, 'errors': 0, 'timeouts': 0, 'in_flight': 0}
+
+    def _setting(self, value, name, default):
+        if value is not None:
+            return value
+        return getattr(settings, name, default)
+
+    @property
+    def connect_timeout(self):
+        return self._setting(self._connect_timeout, 'UPSTREAM_CONNECT_TIMEOUT', 5.0)
+
+    @property
+    def read_timeout(self):
+        return self._setting(self._read_timeout, 'UPSTREAM_READ_TIMEOUT', 60.0)
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    pool_maxsize = self._setting(self._pool_maxsize, 'UPSTREAM_POOL_MAXSIZE', 10)
+                    adapter = HTTPAdapter(
+                        pool_connections=self._setting(self._pool_connections, 'UPSTREAM_POOL_CONNECTIONS', 4),
+                        pool_maxsize=pool_maxsize,
+                        pool_block=True,
+                    )
+                    session = requests.Session()
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._adapter = adapter
+                    self._session = session
+        return self._session
+
+    def request(self, method, url, connect_timeout=None, read_timeout=None, **kwargs):
+        """
+        Send a request through the shared pool; raises requests exceptions unchanged.
+
+        Inside a request deadline both timeouts are shrunk to the time left,
+        and a timeout caused by that is raised as DeadlineExceeded.
+        """
+        connect_timeout, _ = upstream_timeout(connect_timeout if connect_timeout is not None else self.connect_timeout)
+        read_timeout, limited = upstream_timeout(read_timeout if read_timeout is not None else self.read_timeout)
+        session = self.session
+        self._count('requests')
+        self._count('in_flight')
+        try:
+            return session.request(method, url, timeout=(connect_timeout, read_timeout), **kwargs)
+        except requests.exceptions.Timeout as e:
+            self._count('timeouts')
+            self._count('errors')
+            if limited:
+                raise DeadlineExceeded() from e
+            raise
+        except requests.exceptions.RequestException:
+            self._count('errors')
+            raise
+        finally:
+            self._count('in_flight', -1)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def stats(self):
+        """Return request counters plus per-host connection pool usage."""
+        with self._lock:
+            stats = dict(self._counters)
+            adapter = self._adapter
+        pools = {}
+        if adapter is not None:
+            for key in list(adapter.poolmanager.pools.keys()):
+                pool = adapter.poolmanager.pools.get(key)
+                if pool is None:
+                    continue
+                pools[f"{key.key_scheme}://{key.key_host}:{key.key_port}"] = {
+                    'connections_opened': pool.num_connections,
+                    'requests_sent': pool.num_requests,
+                    'available_slots': pool.pool.qsize() if pool.pool is not None else 0,
+                    'maxsize': pool.pool.maxsize if pool.pool is not None else 0,
+                }
+        stats['pools'] = pools
+        return stats
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+            self._session = None
+            self._adapter = None
+
+
+upstream_client = UpstreamClient()
@@ -0,0 +1,256 @@
+import contextvars
+import functools
+import inspect
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+from django.http import HttpResponse
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Upper bounds in seconds; LLM calls routinely take tens of seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name} takes labels {self.labelnames}, got {tuple(labels)}')
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type_name}']
+        with self._lock:
+            items = sorted(self._values.items())
+            lines.extend(self._samples(items))
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, one series per label combination."""
+
+    type_name = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _samples(self, items):
+        for key, value in items:
+            yield f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket latency histogram, one series per label combination."""
+
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['counts'][i] += 1
+                    break
+            series['sum'] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe how long the enclosed block took, whether or not it raised."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - started, **labels)
+
+    def count(self, **labels):
+        with self._lock:
+            series = self._values.get(self._key(labels))
+            return sum(series['counts']) if series else 0
+
+    def _samples(self, items):
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series['counts']):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(bound))])
+                yield f'{self.name}_bucket{labels} {cumulative}'
+            labels = _format_labels(self.labelnames, key)
+            yield f'{self.name}_sum{labels} {_format_value(series["sum"])}'
+            yield f'{self.name}_count{labels} {cumulative}'
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        for metric in self._metrics:
+            metric.clear()
+
+
+registry = Registry()
+
+catalog_lookup_seconds = registry.register(Histogram(
+    'mindwell_catalog_lookup_seconds', 'Time spent getting the NVCF function catalog.', ['view']
+))
+upstream_seconds = registry.register(Histogram(
+    'mindwell_upstream_seconds', 'Time spent waiting on the model provider for one generation.', ['view', 'model']
+))
+parse_seconds = registry.register(Histogram(
+    'mindwell_parse_seconds', 'Time spent cleaning up and validating model JSON output.', ['view', 'model']
+))
+request_seconds = registry.register(Histogram(
+    'mindwell_request_seconds', 'Total time to produce a response, by view, model and status.',
+    ['view', 'model', 'status']
+))
+retries_total = registry.register(Counter(
+    'mindwell_retries_total', 'Upstream calls retried after a failure.', ['operation']
+))
+cache_requests_total = registry.register(Counter(
+    'mindwell_cache_requests_total',
+    'Roadmap lookups by outcome: library, hit, stored, shared, miss, or failed for a stream that broke after starting.',
+    ['view', 'result']
+))
+parse_failures_total = registry.register(Counter(
+    'mindwell_parse_failures_total', 'Model outputs that could not be turned into a valid response.', ['view', 'model']
+))
+admission_rejections_total = registry.register(Counter(
+    'mindwell_admission_rejections_total', 'Upstream calls refused by admission control.', ['provider', 'reason']
+))
+tokens_total = registry.register(Counter(
+    'mindwell_tokens_total', 'Tokens reported in the usage of upstream responses.', ['view', 'model', 'type']
+))
+
+# Labels of the request being handled; views fill in the model once it is known
+_request_labels = contextvars.ContextVar('metrics_request_labels', default=None)
+
+UNKNOWN_MODEL = 'none'
+
+
+def set_request_model(model):
+    """Record which model served the current request for ``mindwell_request_seconds``."""
+    labels = _request_labels.get()
+    if labels is not None:
+        labels['model'] = model
+
+
+def record_usage(view, model, usage):
+    """Add the numeric fields of an upstream ``usage`` dict to ``mindwell_tokens_total``."""
+    if not isinstance(usage, dict):
+        return
+    for name, value in usage.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            tokens_total.inc(value, view=view, model=model, type=name.replace('_tokens', ''))
+
+
+def _status_code(response):
+    return getattr(response, 'status_code', 500)
+
+
+def observe_request(view_method):
+    """
+    Time a view's handler into ``mindwell_request_seconds``.
+
+    The view is labelled with its class name and the model with whatever
+    the handler passed to set_request_model. For streamed responses this is
+    the time to the start of the stream, not to its end.
+    """
+    if inspect.iscoroutinefunction(view_method):
+        @functools.wraps(view_method)
+        async def wrapper(self, request, *args, **kwargs):
+            labels = {'model': UNKNOWN_MODEL}
+            token = _request_labels.set(labels)
+            started = time.monotonic()
+            status = 500
+            try:
+                response = await view_method(self, request, *args, **kwargs)
+                status = _status_code(response)
+                return response
+            finally:
+                _request_labels.reset(token)
+                request_seconds.observe(
+                    time.monotonic() - started, view=type(self).__name__, model=labels['model'], status=status
+                )
+    else:
+        @functools.wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            labels = {'model': UNKNOWN_MODEL}
+            token = _request_labels.set(labels)
+            started = time.monotonic()
+            status = 500
+            try:
+                response = view_method(self, request, *args, **kwargs)
+                status = _status_code(response)
+                return response
+            finally:
+                _request_labels.reset(token)
+                request_seconds.observe(
+                    time.monotonic() - started, view=type(self).__name__, model=labels['model'], status=status
+                )
+    return wrapper
+
+
+def count_retry(retry_state):
+    """Tenacity ``before_sleep`` hook counting each retry by the function being retried."""
+    retries_total.inc(operation=getattr(retry_state.fn, '__qualname__', 'unknown'))
+
+
+def metrics_view(request):
+    """Prometheus text exposition of this process's metrics."""
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
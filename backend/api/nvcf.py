@@ -0,0 +1,245 @@
+import logging
+import threading
+import time
+
+import requests
+from django.conf import settings
+
+from .exceptions import UpstreamError
+from .http_client import upstream_client
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NVCF_API_BASE = 'https://api.nvcf.nvidia.com/v2/nvcf'
+
+
+def api_base():
+    return getattr(settings, 'NVCF_API_BASE', DEFAULT_NVCF_API_BASE).rstrip('/')
+
+
+def functions_url():
+    return f"{api_base()}/functions"
+
+
+def pexec_url(function_id, version_id):
+    return f"{api_base()}/pexec/functions/{function_id}/versions/{version_id}"
+
+
+# Substrings that mark a function as usable for text generation
+TEXT_GENERATION_KEYWORDS = ('gpt', 'mistral', 'llama', 'chat')
+
+# Map function names to their correct model identifiers
+MODEL_MAPPING = {
+    'ai-llama-3_1-nemoguard-8b-topic-control': 'meta-llama/llama-2-7b-chat-hf',
+    'ai-granite-guardian-3_0-8b': 'ibm/granite-3b-chat',
+    'ai-solar-10_7b-instruct': 'upstage/solar-10.7b-instruct-v1.0',
+    'ai-deepseek-r1-distill-llama-8b': 'deepseek-ai/deepseek-llm-7b-chat',
+    'ai-qwen2_5-7b-instruct': 'qwen/qwen-7b-instruct',
+    'ai-qwen2_5-coder-32b-instruct': 'qwen/qwen-32b-instruct',
+    'ai-mistral-nemo-12b-instruct': 'mistralai/mistral-12b-instruct',
+    'ai-baichuan2-13b-chat': 'baichuan-inc/baichuan2-13b-chat'
+}
+
+# Fallback organisation prefixes for functions missing from MODEL_MAPPING
+ORG_MAPPING = {
+    'mistral': 'mistralai',
+    'llama': 'meta-llama',
+    'granite': 'ibm',
+    'solar': 'upstage',
+    'deepseek': 'deepseek-ai',
+    'qwen': 'qwen',
+    'baichuan': 'baichuan-inc'
+}
+
+
+class CatalogError(UpstreamError):
+    """Raised when the NVCF function catalog cannot provide a usable function."""
+
+
+def resolve_model_name(function_name):
+    """Return the model identifier to send in the payload for an NVCF function."""
+    model_name = MODEL_MAPPING.get(function_name)
+    if model_name:
+        return model_name
+
+    base_name = function_name.replace('ai-', '')
+    org = None
+    for key, value in ORG_MAPPING.items():
+        if key in base_name.lower():
+            org = value
+            break
+
+    model_name = f"{org}/{base_name}" if org else base_name
+    logger.info(f"Using constructed model name: {model_name}")
+    return model_name
+
+
+def text_generation_functions(functions):
+    """Filter a catalog payload down to the active text-generation functions, sorted by name."""
+    eligible = [
+        func for func in functions.get('functions', [])
+        if any(keyword in func.get('name', '').lower() for keyword in TEXT_GENERATION_KEYWORDS) and
+        func.get('status') == 'ACTIVE'
+    ]
+    # Sort functions by name to ensure consistent selection
+    eligible.sort(key=lambda x: x.get('name', ''))
+    return eligible
+
+
+def describe_function(func):
+    """Reduce a catalog entry to the fields needed to call it."""
+    return {
+        'name': func['name'],
+        'function_id': func['id'],
+        'version_id': func['versionId'],
+        'model_name': resolve_model_name(func['name']),
+    }
+
+
+def fetch_text_generation_functions(api_key):
+    """Query the NVCF catalog and return every eligible text-generation function, described."""
+    headers = chat_headers(api_key)
+
+    logger.info("Fetching available functions...")
+    try:
+        functions_response = upstream_client.get(functions_url(), headers=headers)
+    except requests.exceptions.Timeout:
+        logger.error("Timed out fetching NVCF functions")
+        raise CatalogError('AI service timed out. Please try again later.', 504)
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Failed to get functions: {str(e)}")
+        raise CatalogError('Failed to connect to AI service. Please try again later.', 500)
+    logger.info(f"Functions response status: {functions_response.status_code}")
+
+    if functions_response.status_code == 401:
+        logger.error("Authentication failed. Please check your API key.")
+        raise CatalogError('Authentication failed. Please check your API configuration.', 401)
+
+    if functions_response.status_code != 200:
+        logger.error(f"Failed to get functions: {functions_response.text}")
+        raise CatalogError('Failed to connect to AI service. Please try again later.', 500)
+
+    eligible = text_generation_functions(functions_response.json())
+    if not eligible:
+        logger.error("No suitable text generation functions available")
+        raise CatalogError('No suitable AI models available. Please try again later.', 503)
+
+    return [describe_function(func) for func in eligible]
+
+
+def chat_headers(api_key, stream=False):
+    headers = {
+        'Authorization': f'Bearer {api_key}',
+        'Content-Type': 'application/json'
+    }
+    if stream:
+        headers['Accept'] = 'text/event-stream'
+    return headers
+
+
+def chat_completion_result(response):
+    """
+    Turn a non-streaming pexec response into the chat view's JSON body.
+
+    Works with both ``requests`` and ``httpx`` responses and raises
+    UpstreamError for error statuses or an unexpected payload shape.
+    """
+    if response.status_code != 200:
+        logger.error(f"API error response: {response.text}")
+        raise UpstreamError('Failed to generate response. Please try again later.', 500)
+
+    response_data = response.json()
+    if 'choices' in response_data and len(response_data['choices']) > 0:
+        return {
+            'generated_text': response_data['choices'][0]['message']['content'],
+            'model': response_data.get('model', ''),
+            'usage': response_data.get('usage', {})
+        }
+
+    logger.error(f"Unexpected response format: {response_data}")
+    raise UpstreamError('Received unexpected response format from AI service.', 500)
+
+
+class FunctionCatalog:
+    """
+    Process-wide cache of the eligible NVCF text-generation functions.
+
+    Only the very first lookup for an API key waits on the catalog. Once an
+    entry exists it is always served immediately; when it is older than the
+    TTL a single background thread refreshes it and the stale entry keeps
+    being served until the refresh lands. A failed refresh keeps the old entry.
+    """
+
+    def __init__(self, ttl=None, fetch=fetch_text_generation_functions):
+        self._ttl = ttl
+        self._fetch = fetch
+        self._entries = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._cold_lock = threading.Lock()
+
+    @property
+    def ttl(self):
+        if self._ttl is not None:
+            return self._ttl
+        return getattr(settings, 'NVCF_CATALOG_TTL', 300)
+
+    def cached(self, api_key):
+        """Return the cached functions without ever blocking, or None before the first fetch."""
+        with self._lock:
+            entry = self._entries.get(api_key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry['fetched_at'] >= self.ttl:
+                self._start_refresh(api_key)
+            return entry['functions']
+
+    def get(self, api_key):
+        """Return the functions for ``api_key``, raising CatalogError on a cold failure."""
+        functions = self.cached(api_key)
+        if functions is not None:
+            return functions
+
+        # Cold start: let one request fetch while concurrent ones wait for it
+        with self._cold_lock:
+            with self._lock:
+                entry = self._entries.get(api_key)
+            if entry is not None:
+                return entry['functions']
+            functions = self._fetch(api_key)
+            self._store(api_key, functions)
+            return functions
+
+    def invalidate(self, api_key=None):
+        with self._lock:
+            if api_key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(api_key, None)
+
+    def _store(self, api_key, functions):
+        with self._lock:
+            self._entries[api_key] = {'functions': functions, 'fetched_at': time.monotonic()}
+
+    def _start_refresh(self, api_key):
+        # Caller holds self._lock
+        if api_key in self._refreshing:
+            return
+        self._refreshing.add(api_key)
+        thread = threading.Thread(
+            target=self._refresh, args=(api_key,), name='nvcf-catalog-refresh', daemon=True
+        )
+        thread.start()
+
+    def _refresh(self, api_key):
+        try:
+            self._store(api_key, self._fetch(api_key))
+            logger.info("Refreshed NVCF function catalog")
+        except Exception as e:
+            logger.warning(f"NVCF catalog refresh failed, serving stale entry: {str(e)}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(api_key)
+
+
+function_catalog = FunctionCatalog()
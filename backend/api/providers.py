@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import os
+import threading
+
+from django.conf import settings
+
+from .prompts import (
+    ROADMAP_GENERATION_CONFIG,
+    ROADMAP_MODEL_NAME,
+    build_roadmap_contents,
+)
+from .deadlines import DeadlineExceeded, upstream_timeout
+from .exceptions import UpstreamError
+from .http_client import upstream_client
+from .admission import admission_priority, gemini_limiter
+from .resilience import gemini_breaker
+from .streaming import iter_chat_chunks
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GEMINI_API_ENDPOINT = 'https://generativelanguage.googleapis.com'
+
+# Gemini's usageMetadata counts, by the usage names the NVCF completions use
+USAGE_FIELDS = {
+    'promptTokenCount': 'prompt_tokens',
+    'candidatesTokenCount': 'completion_tokens',
+    'totalTokenCount': 'total_tokens',
+}
+
+
+def _camel_case(name):
+    first, *rest = name.split('_')
+    return first + ''.join(word.title() for word in rest)
+
+
+class GeminiRoadmapProvider:
+    """
+    Process-wide Gemini model for roadmap generation.
+
+    ``google.generativeai`` is imported and configured the first time a
+    roadmap is generated rather than when the views module is imported, so
+    management commands never pay for it. The configured
+    ``GenerativeModel`` is built once under a lock and then shared by every
+    request and thread. Every call goes through the provider's circuit
+    breaker, so an outage fails fast with CircuitOpenError, and is bounded
+    by ``UPSTREAM_READ_TIMEOUT`` or the time left on the request deadline.
+    Calls first wait for a slot from the provider's concurrency limiter.
+    Setting ``GEMINI_API_ENDPOINT`` sends the calls to another host over REST.
+    """
+
+    def __init__(self, model_name=ROADMAP_MODEL_NAME, generation_config=ROADMAP_GENERATION_CONFIG,
+                 breaker=gemini_breaker, limiter=gemini_limiter):
+        self.model_name = model_name
+        self.generation_config = generation_config
+        self.breaker = breaker
+        self.limiter = limiter
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _ensure_model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    import google.generativeai as genai
+
+                    options = {}
+                    endpoint = getattr(settings, 'GEMINI_API_ENDPOINT', '')
+                    if endpoint:
+                        # e.g. a local stand-in server; only the REST transport accepts http:// hosts
+                        options = {'transport': 'rest', 'client_options': {'api_endpoint': endpoint}}
+                    genai.configure(api_key=os.getenv('GEMINI_API_KEY'), **options)
+                    self._model = genai.GenerativeModel(
+                        self.model_name,
+                        generation_config=self.generation_config
+                    )
+                    logger.info(f"Initialized Gemini model {self.model_name}")
+        return self._model
+
+    @property
+    def model(self):
+        return self._ensure_model()
+
+    @property
+    def timeout(self):
+        return getattr(settings, 'UPSTREAM_READ_TIMEOUT', 60.0)
+
+    def generate(self, prompt):
+        with self.limiter.slot(admission_priority(prompt)):
+            return self.breaker.call(lambda: self._generate(build_roadmap_contents(prompt)))
+
+    async def generate_async(self, prompt):
+        async with self.limiter.aslot(admission_priority(prompt)):
+            return await self.breaker.acall(lambda: self._generate_async(build_roadmap_contents(prompt)))
+
+    def stream_url(self):
+        endpoint = getattr(settings, 'GEMINI_API_ENDPOINT', '') or DEFAULT_GEMINI_API_ENDPOINT
+        return f"{endpoint.rstrip('/')}/v1beta/models/{self.model_name}:streamGenerateContent?alt=sse"
+
+    def stream_payload(self, prompt):
+        return {
+            'contents': [{'role': 'user', 'parts': [{'text': text} for text in build_roadmap_contents(prompt)]}],
+            'generationConfig': {_camel_case(key): value for key, value in self.generation_config.items()},
+        }
+
+    def stream(self, prompt):
+        """
+        Yield the roadmap text in pieces as Gemini generates it.
+
+        The SDK's REST transport buffers whole streaming responses, so this
+        reads the ``streamGenerateContent`` SSE endpoint over the shared
+        upstream pool instead. The admission slot is held until the stream
+        is done. Views that must answer with a proper status code when the
+        call cannot start use open_stream() and stream_text() directly.
+        """
+        with self.limiter.slot(admission_priority(prompt)):
+            self.breaker.before_call()
+            yield from self.stream_text(self.open_stream(prompt))
+
+    def open_stream(self, prompt):
+        """
+        Start a ``streamGenerateContent`` call and return the open response.
+
+        The caller holds an admission slot and has passed the breaker's
+        before_call(). A connection error or error status is reported to
+        the breaker and raised (an error status as UpstreamError) before
+        any text is read.
+        """
+        try:
+            response = upstream_client.post(
+                self.stream_url(),
+                headers={'x-goog-api-key': os.getenv('GEMINI_API_KEY', ''), 'Content-Type': 'application/json'},
+                json=self.stream_payload(prompt),
+                stream=True
+            )
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            self.breaker.record_exception(e)
+            raise
+        if response.status_code != 200:
+            logger.error(f"Gemini stream error response: {response.status_code} {response.text[:200]}")
+            response.close()
+            error = UpstreamError('Failed to generate roadmap. Please try again later.', 500,
+                                  upstream_status=response.status_code)
+            self.breaker.record_exception(error)
+            raise error
+        return response
+
+    def stream_text(self, response, usage=None):
+        """
+        Yield the text of an open_stream() response and close it.
+
+        The token counts Gemini reports are copied into the ``usage`` dict,
+        if given, under the same names as NVCF's. The breaker is told the
+        outcome once the stream is done; a stream closed early counts as
+        neither success nor failure.
+        """
+        try:
+            # Gemini's SSE frames are the same ``data: {...}`` lines as the chat completions
+            for chunk in iter_chat_chunks(response):
+                if usage is not None:
+                    metadata = chunk.get('usageMetadata') or {}
+                    usage.update((name, metadata[key]) for key, name in USAGE_FIELDS.items() if key in metadata)
+                for candidate in chunk.get('candidates', [])[:1]:
+                    text = ''.join(part.get('text', '') for part in candidate.get('content', {}).get('parts', []))
+                    if text:
+                        yield text
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            self.breaker.record_exception(e)
+            raise
+        else:
+            self.breaker.record_success()
+        finally:
+            response.close()
+
+    def _generate(self, contents):
+        from google.api_core.exceptions import DeadlineExceeded as GoogleDeadlineExceeded
+        from google.generativeai import client
+        from google.generativeai.types import generation_types
+
+        timeout, limited = upstream_timeout(self.timeout)
+        model = self.model
+        # GenerativeModel.generate_content() in google-generativeai 0.3 takes no
+        # timeout, so send the request it would build through its client directly
+        request = model._prepare_request(contents=contents)
+        if model._client is None:
+            model._client = client.get_default_generative_client()
+        try:
+            response = model._client.generate_content(request, timeout=timeout)
+        except GoogleDeadlineExceeded as e:
+            if limited:
+                raise DeadlineExceeded() from e
+            raise
+        return generation_types.GenerateContentResponse.from_response(response)
+
+    async def _generate_async(self, contents):
+        timeout, limited = upstream_timeout(self.timeout)
+        try:
+            return await asyncio.wait_for(self.model.generate_content_async(contents), timeout)
+        except asyncio.TimeoutError as e:
+            if limited:
+                raise DeadlineExceeded() from e
+            raise
+
+    def reset(self):
+        """Drop the cached model so the next call reconfigures it (e.g. after a key change)."""
+        with self._lock:
+            self._model = None
+
+
+gemini_provider = GeminiRoadmapProvider()
@@ -0,0 +1,78 @@
+import importlib
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderRegistry:
+    """
+    Upstream providers by name, each imported and configured on first use.
+
+    A provider is registered as a ``'module:attribute'`` path, so merely
+    importing the views (as every worker and ``manage.py`` command does)
+    loads none of the provider modules or the client libraries behind them.
+    The first get() imports the module under a lock and keeps the object;
+    how long that took is kept for stats().
+    """
+
+    def __init__(self):
+        self._targets = {}
+        self._providers = {}
+        self._load_seconds = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, target):
+        with self._lock:
+            self._targets[name] = target
+            self._providers.pop(name, None)
+
+    def get(self, name):
+        provider = self._providers.get(name)
+        if provider is not None:
+            return provider
+        with self._lock:
+            provider = self._providers.get(name)
+            if provider is None:
+                if name not in self._targets:
+                    raise KeyError(f'Unknown provider: {name}')
+                module_name, _, attribute = self._targets[name].partition(':')
+                started = time.perf_counter()
+                provider = getattr(importlib.import_module(module_name), attribute)
+                self._load_seconds[name] = time.perf_counter() - started
+                self._providers[name] = provider
+                logger.info(f"Loaded provider {name} in {self._load_seconds[name] * 1000:.1f}ms")
+        return provider
+
+    def proxy(self, name):
+        """A stand-in for the provider that loads it on first attribute access."""
+        return LazyProvider(self, name)
+
+    def loaded(self, name):
+        return name in self._providers
+
+    def stats(self):
+        with self._lock:
+            return {name: {'loaded': name in self._providers, 'load_seconds': self._load_seconds.get(name)}
+                    for name in self._targets}
+
+
+class LazyProvider:
+    __slots__ = ('_registry', '_name')
+
+    def __init__(self, registry, name):
+        self._registry = registry
+        self._name = name
+
+    def __getattr__(self, attribute):
+        return getattr(self._registry.get(self._name), attribute)
+
+    def __repr__(self):
+        return f'<LazyProvider {self._name}>'
+
+
+providers = ProviderRegistry()
+# google.generativeai and httpx are only loaded once a roadmap or an async chat request needs them
+providers.register('gemini', 'api.providers:gemini_provider')
+providers.register('nvcf_async', 'api.async_http_client:async_upstream_client')
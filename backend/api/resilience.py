@@ -0,0 +1,279 @@
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from tenacity import retry, retry_base, stop_after_attempt, wait_random_exponential
+
+from .deadlines import DeadlineExceeded, current_deadline
+from .exceptions import UpstreamError
+from .metrics import count_retry
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(UpstreamError):
+    """The provider's circuit is open; the request is refused without calling it."""
+
+    def __init__(self, provider, retry_after):
+        super().__init__(f'{provider} is temporarily unavailable. Please try again later.', 503)
+        self.retry_after = retry_after
+
+
+def is_provider_failure(exception):
+    """
+    Whether an exception from a provider call counts against its circuit.
+
+    As for NVCF responses, client errors other than rate limiting (4xx but
+    429) come from the request rather than the provider, so a run of bad or
+    over-long prompts cannot open the circuit for everyone. UpstreamError is
+    judged by the provider's status, SDK errors by their HTTP ``code``.
+    """
+    if isinstance(exception, UpstreamError):
+        status = exception.upstream_status or exception.status_code
+    else:
+        status = getattr(exception, 'code', None)
+    return not (isinstance(status, int) and 400 <= status < 500 and status != 429)
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker.
+
+    After ``CIRCUIT_FAILURE_THRESHOLD`` consecutive failures the circuit
+    opens and every call fails fast with CircuitOpenError (503 with
+    Retry-After) instead of tying up a worker on a provider that is down.
+    Once ``CIRCUIT_RESET_TIMEOUT`` seconds have passed the circuit is
+    half-open: a single probe call is let through, and its outcome either
+    closes the circuit or opens it for another timeout. A probe that never
+    reports back is replaced by a new one after another timeout.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold=None, reset_timeout=None):
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started = None
+        self._lock = threading.Lock()
+        self._counters = {'opened': 0, 'rejected': 0}
+
+    @property
+    def failure_threshold(self):
+        if self._failure_threshold is not None:
+            return self._failure_threshold
+        return getattr(settings, 'CIRCUIT_FAILURE_THRESHOLD', 5)
+
+    @property
+    def reset_timeout(self):
+        if self._reset_timeout is not None:
+            return self._reset_timeout
+        return getattr(settings, 'CIRCUIT_RESET_TIMEOUT', 30)
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go upstream now."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+            now = time.monotonic()
+            reset_timeout = self.reset_timeout
+            remaining = self._opened_at + reset_timeout - now
+            if self._state == self.OPEN and remaining <= 0:
+                self._state = self.HALF_OPEN
+            if self._state == self.HALF_OPEN:
+                if self._probe_started is None or now - self._probe_started >= reset_timeout:
+                    self._probe_started = now
+                    logger.info(f"Circuit for {self.name} half-open, sending a probe")
+                    return
+                remaining = self._probe_started + reset_timeout - now
+            self._counters['rejected'] += 1
+            retry_after = max(1, math.ceil(remaining))
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record(self, ok):
+        if ok:
+            self.record_success()
+        else:
+            self.record_failure()
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"Circuit for {self.name} closed")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._counters['opened'] += 1
+                    logger.warning(f"Circuit for {self.name} opened after {self._failures} failures")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_started = None
+
+    def record_exception(self, exception):
+        """Report a failed call; only provider failures (see is_provider_failure()) count against the circuit."""
+        self.record(not is_provider_failure(exception))
+
+    def call(self, func):
+        """Run ``func()`` through the breaker; exceptions other than DeadlineExceeded go to record_exception()."""
+        self.before_call()
+        try:
+            result = func()
+        except DeadlineExceeded:
+            # The caller ran out of time; that says nothing about the provider
+            raise
+        except Exception as e:
+            self.record_exception(e)
+            raise
+        self.record_success()
+        return result
+
+    async def acall(self, func):
+        """Async call(); ``func`` is a coroutine function."""
+        self.before_call()
+        try:
+            result = await func()
+        except DeadlineExceeded:
+            # The caller ran out of time; that says nothing about the provider
+            raise
+        except Exception as e:
+            self.record_exception(e)
+            raise
+        self.record_success()
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_started = None
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats['state'] = self._state
+            stats['failures'] = self._failures
+        return stats
+
+
+class RetryBudget:
+    """
+    Process-wide token bucket that bounds retries to a fraction of requests.
+
+    Every first attempt deposits ``RETRY_BUDGET_RATIO`` tokens (up to
+    ``RETRY_BUDGET_CAP``) and every retry spends one, so during an incident
+    retries cannot multiply the load on a provider that is already failing.
+    """
+
+    def __init__(self, ratio=None, cap=None):
+        self._ratio = ratio
+        self._cap = cap
+        self._tokens = None
+        self._lock = threading.Lock()
+        self._counters = {'retries': 0, 'denied': 0}
+
+    @property
+    def ratio(self):
+        if self._ratio is not None:
+            return self._ratio
+        return getattr(settings, 'RETRY_BUDGET_RATIO', 0.2)
+
+    @property
+    def cap(self):
+        if self._cap is not None:
+            return self._cap
+        return getattr(settings, 'RETRY_BUDGET_CAP', 10)
+
+    def _balance(self):
+        # Caller holds self._lock; the bucket starts full
+        if self._tokens is None:
+            self._tokens = float(self.cap)
+        return self._tokens
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self._balance() + self.ratio, float(self.cap))
+
+    def withdraw(self):
+        """Take one retry from the budget; False when it is exhausted."""
+        with self._lock:
+            if self._balance() >= 1.0:
+                self._tokens -= 1.0
+                self._counters['retries'] += 1
+                return True
+            self._counters['denied'] += 1
+            return False
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats['tokens'] = self._balance()
+        return stats
+
+
+retry_budget = RetryBudget()
+gemini_breaker = CircuitBreaker('Gemini')
+nvcf_breaker = CircuitBreaker('NVCF')
+
+
+class retry_if_budget_allows(retry_base):
+    """Retry on the given exception types while attempts remain and the global retry budget has tokens."""
+
+    def __init__(self, exception_types, attempts):
+        self.exception_types = exception_types
+        self.attempts = attempts
+
+    def __call__(self, retry_state):
+        outcome = retry_state.outcome
+        exception = outcome.exception() if outcome.failed else None
+        if not isinstance(exception, self.exception_types) or isinstance(exception, CircuitOpenError):
+            return False
+        # Checked before the budget so the last attempt does not spend a token
+        if retry_state.attempt_number >= self.attempts:
+            return False
+        # Skip a retry that would not finish before the request deadline, judging by the attempts so far
+        deadline = current_deadline()
+        if deadline is not None and deadline.remaining() < retry_state.seconds_since_start / retry_state.attempt_number:
+            logger.info("Not retrying: the request deadline would pass first")
+            return False
+        return retry_budget.withdraw()
+
+
+def _deposit_on_first_attempt(retry_state):
+    if retry_state.attempt_number == 1:
+        retry_budget.deposit()
+
+
+def budgeted_retry(exception_types, attempts=3):
+    """
+    Tenacity retry for upstream calls: short jittered waits, paid for from retry_budget.
+
+    CircuitOpenError is never retried, so an open circuit fails the request
+    immediately, and neither is an attempt that could not finish before
+    the request deadline. Each retry is counted in ``mindwell_retries_total``.
+    """
+    return retry(
+        stop=stop_after_attempt(attempts),
+        wait=wait_random_exponential(multiplier=0.5, max=2),
+        retry=retry_if_budget_allows(exception_types, attempts),
+        before=_deposit_on_first_attempt,
+        before_sleep=count_retry,
+        reraise=True,
+    )
@@ -0,0 +1,208 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .cache import normalize_prompt
+from .prompts import ROADMAP_GENERATION_CONFIG, ROADMAP_MODEL_NAME, build_chat_payload, build_roadmap_contents
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    body TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+# Seconds between access-time updates of one entry, so hot entries do not cost a write on every hit
+TOUCH_INTERVAL = 60
+
+
+def _digest(value):
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode()).hexdigest()
+
+
+def store_key(provider, model, prompt, config):
+    """Key for one generation: provider, model, a hash of the full prompt and the generation config."""
+    return _digest({'provider': provider, 'model': model, 'prompt': _digest(prompt), 'config': config})
+
+
+def roadmap_store_key(prompt):
+    # The system prompt is part of the hash, so editing it retires every stored roadmap
+    return store_key('gemini', ROADMAP_MODEL_NAME, build_roadmap_contents(normalize_prompt(prompt)),
+                     ROADMAP_GENERATION_CONFIG)
+
+
+def chat_store_key(model_name, prompt):
+    """Key for a chat completion, or None when ``RESPONSE_STORE_CHAT_ENABLED`` is off."""
+    if not getattr(settings, 'RESPONSE_STORE_CHAT_ENABLED', False):
+        return None
+    payload = build_chat_payload(model_name, normalize_prompt(prompt))
+    messages = payload.pop('messages')
+    return store_key('nvcf', model_name, messages, payload)
+
+
+class ResponseStore:
+    """
+    Upstream responses persisted in a SQLite file that outlives restarts.
+
+    Every worker process opens the same file (in WAL mode, so readers do
+    not wait on writers) and therefore shares one store. Entries expire
+    ``ttl`` seconds after they were written; once there are more than
+    ``max_entries`` the least recently read ones are deleted on the next
+    write. An empty ``path`` turns the store off. The store only ever
+    saves work: if the file cannot be read or written the error is logged
+    and the lookup counts as a miss.
+    """
+
+    def __init__(self, path=None, max_entries=None, ttl=None):
+        self._path = path
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0, 'expirations': 0, 'errors': 0}
+
+    def _setting(self, value, name, default):
+        if value is not None:
+            return value
+        return getattr(settings, name, default)
+
+    @property
+    def path(self):
+        return str(self._setting(self._path, 'RESPONSE_STORE_PATH', ''))
+
+    @property
+    def max_entries(self):
+        return self._setting(self._max_entries, 'RESPONSE_STORE_MAX_ENTRIES', 5000)
+
+    @property
+    def ttl(self):
+        return self._setting(self._ttl, 'RESPONSE_STORE_TTL', 7 * 24 * 3600)
+
+    @property
+    def enabled(self):
+        return bool(self.path)
+
+    def _connection(self):
+        # One connection per thread and file; sqlite3 connections cannot be shared between threads
+        path = self.path
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.path != path:
+            connection = sqlite3.connect(path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+            self._local.path = path
+        return connection
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def get(self, key):
+        """Return the stored body or None, counting the hit or miss; a None key is always a miss."""
+        if key is None or not self.enabled:
+            return None
+        now = time.time()
+        try:
+            connection = self._connection()
+            row = connection.execute(
+                'SELECT body, created_at, accessed_at FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is not None and now - row[1] >= self.ttl:
+                connection.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self._count('expirations')
+                row = None
+            if row is not None and now - row[2] >= TOUCH_INTERVAL:
+                connection.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+        except sqlite3.Error as e:
+            logger.warning(f"Response store lookup failed: {str(e)}")
+            self._count('errors')
+            row = None
+        if row is None:
+            self._count('misses')
+            return None
+        self._count('hits')
+        return json.loads(row[0])
+
+    def set(self, key, body, provider, model):
+        """Store ``body`` under ``key``, then trim expired and least recently read entries."""
+        if key is None or not self.enabled:
+            return
+        now = time.time()
+        try:
+            connection = self._connection()
+            # One write transaction for the insert and the trimming
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                connection.execute(
+                    'INSERT OR REPLACE INTO responses (key, provider, model, body, created_at, accessed_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (key, provider, model, json.dumps(body), now, now)
+                )
+                expired = connection.execute(
+                    'DELETE FROM responses WHERE created_at <= ?', (now - self.ttl,)
+                ).rowcount
+                excess = connection.execute('SELECT COUNT(*) FROM responses').fetchone()[0] - self.max_entries
+                evicted = 0
+                if excess > 0:
+                    evicted = connection.execute(
+                        'DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed_at LIMIT ?)',
+                        (excess,)
+                    ).rowcount
+                connection.execute('COMMIT')
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+        except sqlite3.Error as e:
+            logger.warning(f"Response store write failed: {str(e)}")
+            self._count('errors')
+            return
+        with self._lock:
+            self._counters['writes'] += 1
+            self._counters['expirations'] += expired
+            self._counters['evictions'] += evicted
+
+    async def aget(self, key):
+        if key is None or not self.enabled:
+            return None
+        return await sync_to_async(self.get, thread_sensitive=False)(key)
+
+    async def aset(self, key, body, provider, model):
+        if key is None or not self.enabled:
+            return
+        await sync_to_async(self.set, thread_sensitive=False)(key, body, provider, model)
+
+    def clear(self):
+        if self.enabled:
+            self._connection().execute('DELETE FROM responses')
+
+    def __len__(self):
+        if not self.enabled:
+            return 0
+        return self._connection().execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['max_entries'] = self.max_entries
+        return stats
+
+
+# Validated roadmaps and chat completions, shared by every worker and kept across restarts
+response_store = ResponseStore()
@@ -0,0 +1,267 @@
+import json
+import logging
+import re
+
+from .exceptions import UpstreamError
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_FIELDS = ['title', 'description', 'timeline', 'steps', 'tips', 'milestones']
+STEP_FIELDS = ['step', 'title', 'description', 'actions', 'resources']
+
+
+class RoadmapError(UpstreamError):
+    """The model answered, but not with a usable roadmap."""
+
+
+# Characters the repair scan has to stop at, per context; everything between them is copied as-is
+_STOPS_OUTSIDE = re.compile(r'["\'{}\[\]]')
+_STOPS_IN_STRING = {
+    '"': re.compile(r'["\\\x00-\x1f]'),
+    "'": re.compile(r'["\'\\\x00-\x1f]'),
+}
+_CLOSERS = {'{': '}', '[': ']'}
+_CONTROL_ESCAPES = {'\n': '\\n', '\r': '\\r', '\t': '\\t', '\b': '\\b', '\f': '\\f'}
+_decoder = json.JSONDecoder()
+
+
+def _closes_string(text, index):
+    """A quote only ends a string if the next significant character could follow a string."""
+    n = len(text)
+    while index < n and text[index] in ' \t\r\n':
+        index += 1
+    return index >= n or text[index] in ',:}]'
+
+
+def _drop_trailing_comma(out):
+    index = len(out) - 1
+    while index >= 0 and not out[index].strip():
+        index -= 1
+    if index >= 0:
+        fragment = out[index].rstrip()
+        if fragment.endswith(','):
+            out[index] = fragment[:-1]
+
+
+def repair_json_object(text, start):
+    """
+    Rewrite the balanced object starting at ``text[start]`` as valid JSON.
+
+    One left-to-right scan that only stops on quotes and brackets outside
+    strings, and on quotes, backslashes and control characters inside them.
+    In passing it:
+
+    - converts single-quoted strings to double-quoted ones, leaving
+      apostrophes inside words (``don't``) alone
+    - escapes stray double quotes and raw control characters inside strings
+    - drops trailing commas before ``}`` and ``]``
+    - stops at the brace that closes the first object, ignoring any trailing text
+    """
+    out = []
+    closers = []
+    quote = None
+    position = start
+    n = len(text)
+    while position < n:
+        stops = _STOPS_IN_STRING[quote] if quote else _STOPS_OUTSIDE
+        match = stops.search(text, position)
+        if match is None:
+            break
+        index = match.start()
+        if index > position:
+            out.append(text[position:index])
+        char = text[index]
+        position = index + 1
+
+        if quote:
+            if char == '\\':
+                out.append(text[index:index + 2])
+                position = index + 2
+            elif char == quote:
+                if _closes_string(text, position):
+                    out.append('"')
+                    quote = None
+                else:
+                    out.append('\\"' if char == '"' else char)
+            elif char == '"':
+                out.append('\\"')
+            else:
+                out.append(_CONTROL_ESCAPES.get(char, f'\\u{ord(char):04x}'))
+        elif char in '"\'':
+            quote = char
+            out.append('"')
+        elif char in '{[':
+            closers.append(_CLOSERS[char])
+            out.append(char)
+        elif char in '}]':
+            if not closers or closers[-1] != char:
+                raise RoadmapError('Invalid response format. Response must be a JSON object.')
+            _drop_trailing_comma(out)
+            closers.pop()
+            out.append(char)
+            if not closers:
+                return ''.join(out)
+
+    raise RoadmapError('Generated roadmap was cut off before the JSON object was closed. Please try again.')
+
+
+def extract_json_object(content):
+    """
+    Return the first JSON object embedded in model output.
+
+    Markdown fences, preambles and trailing chatter need no stripping:
+    decoding starts at the first ``{`` and stops where that object ends.
+    Well-formed output is decoded by the C decoder in one go; only when
+    that fails is the object re-read by repair_json_object and decoded again.
+    """
+    start = content.find('{')
+    if start == -1:
+        logger.error(f"Response does not contain a JSON object. Content: {content[:100]}...")
+        raise RoadmapError('Invalid response format. Response must be a JSON object.')
+
+    try:
+        return _decoder.raw_decode(content, start)[0]
+    except json.JSONDecodeError:
+        pass
+
+    repaired = repair_json_object(content, start)
+    try:
+        return json.loads(repaired)
+    except json.JSONDecodeError as e:
+        logger.error(f"Failed to parse roadmap JSON: {e}")
+        logger.debug(f"Repaired content that failed to parse: {repaired}")
+        raise RoadmapError(f'Failed to generate valid roadmap format: {str(e)}')
+
+
+def validate_roadmap(roadmap_data):
+    """Raise RoadmapError unless the roadmap has every required field and step field."""
+    missing_fields = [field for field in REQUIRED_FIELDS if field not in roadmap_data]
+    if missing_fields:
+        logger.error(f"Missing required fields in roadmap: {missing_fields}")
+        raise RoadmapError(f'Generated roadmap is missing required fields: {", ".join(missing_fields)}')
+
+    # Validate steps structure
+    if not isinstance(roadmap_data['steps'], list) or len(roadmap_data['steps']) < 1:
+        logger.error("Invalid steps structure in roadmap")
+        raise RoadmapError('Generated roadmap has invalid steps structure. Please try again.')
+
+    # Validate each step has required fields
+    for i, step in enumerate(roadmap_data['steps']):
+        if not isinstance(step, dict):
+            logger.error(f"Step {i+1} is not an object")
+            raise RoadmapError(f'Step {i+1} is missing required fields: {", ".join(STEP_FIELDS)}')
+        missing_step_fields = [field for field in STEP_FIELDS if field not in step]
+        if missing_step_fields:
+            logger.error(f"Step {i+1} is missing required fields: {missing_step_fields}")
+            raise RoadmapError(f'Step {i+1} is missing required fields: {", ".join(missing_step_fields)}')
+
+
+def parse_roadmap(content):
+    """Turn raw model output into a validated roadmap dict, raising RoadmapError otherwise."""
+    logger.debug(f"Raw AI response: {content}")
+
+    # Check if content is empty
+    if not content or not content.strip():
+        logger.error("Empty response from AI model")
+        raise RoadmapError('Received empty response from AI model. Please try again.')
+
+    roadmap_data = extract_json_object(content)
+    if not isinstance(roadmap_data, dict):
+        raise RoadmapError('Invalid response format. Response must be a JSON object.')
+
+    validate_roadmap(roadmap_data)
+    return roadmap_data
+
+
+HEADER_FIELDS = ['title', 'description', 'timeline']
+
+
+class RoadmapStreamParser:
+    """
+    Follow roadmap JSON as the model writes it and report what each chunk completes.
+
+    feed() returns ``(event, data)`` pairs: ``('roadmap', header)`` with the
+    title, description and timeline once all three are known or the steps
+    begin, then ``('step', step)`` for each step object as soon as its
+    closing brace arrives. The scan only tracks double-quoted JSON, so the
+    events are a preview; parse_roadmap() on ``text`` once the stream ends
+    stays the authority on whether the roadmap is valid.
+    """
+
+    def __init__(self):
+        self.text = ''
+        self._position = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_start = None
+        self._pending_key = None
+        self._key = None
+        self._in_steps = False
+        self._step_start = None
+        self._header = {}
+        self._header_sent = False
+
+    def feed(self, chunk):
+        self.text += chunk
+        text = self.text
+        events = []
+        for index in range(self._position, len(text)):
+            char = text[index]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._string_closed(text[self._string_start:index + 1], events)
+            elif char == '"':
+                self._in_string = True
+                self._string_start = index
+            elif char == ':' and self._depth == 1:
+                self._key, self._pending_key = self._pending_key, None
+            elif char == ',' and self._depth == 1:
+                self._key = None
+            elif char in '{[':
+                self._depth += 1
+                if char == '[' and self._depth == 2 and self._key == 'steps':
+                    self._in_steps = True
+                    self._send_header(events)
+                elif char == '{' and self._depth == 3 and self._in_steps:
+                    self._step_start = index
+            elif char in '}]':
+                if char == '}' and self._depth == 3 and self._step_start is not None:
+                    self._step_closed(text[self._step_start:index + 1], events)
+                    self._step_start = None
+                elif char == ']' and self._depth == 2:
+                    self._in_steps = False
+                self._depth = max(self._depth - 1, 0)
+        self._position = len(text)
+        return events
+
+    def _string_closed(self, raw, events):
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            return
+        if self._key is None:
+            self._pending_key = value
+        elif self._key in HEADER_FIELDS:
+            self._header[self._key] = value
+            if all(field in self._header for field in HEADER_FIELDS):
+                self._send_header(events)
+
+    def _send_header(self, events):
+        if not self._header_sent:
+            self._header_sent = True
+            events.append(('roadmap', {field: self._header.get(field, '') for field in HEADER_FIELDS}))
+
+    def _step_closed(self, raw, events):
+        try:
+            step = extract_json_object(raw)
+        except RoadmapError:
+            return
+        if all(field in step for field in STEP_FIELDS):
+            events.append(('step', step))
@@ -0,0 +1,173 @@
+import copy
+import json
+import logging
+import os
+import threading
+
+from django.conf import settings
+
+from .admission import is_crisis_prompt
+from .cache import normalize_prompt
+from .roadmap import validate_roadmap
+
+logger = logging.getLogger(__name__)
+
+LIBRARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'roadmap_library.json')
+
+# Reported as the model of roadmaps served from the library
+LIBRARY_MODEL_NAME = 'roadmap-library'
+
+# Words that carry no topic: filler, and the ways people ask for a plan
+_STOPWORDS = '''
+a about after again all also always am an and any are around as at be because been before being but by
+can cant could day days did do does dont during each even ever every for from get getting go going got
+had has have having help helping how i im ive if in into is issue it its just keep know lately like lot
+lots make manage managing me more most much my myself need new no not now of off on one only or other
+our out over please plan problem really recently roadmap so some still struggle struggling such t than
+that the their them then there these they thing things this time tip to too trouble very want way ways
+what when where which while who why will with without would you your deal dealing cope coping handle
+handling improve improving better feel feeling feelings overcome reduce reducing guide steps step s
+week weeks month months year years since past last bit quite was were recover recovery recovering
+'''
+
+
+def fold(token):
+    """Fold simple plurals so ``thoughts`` and ``thought`` index the same."""
+    if len(token) > 4 and token.endswith('ies'):
+        return token[:-3] + 'y'
+    if len(token) > 3 and token.endswith('s') and not token.endswith(('ss', 'us', 'is')):
+        return token[:-1]
+    return token
+
+
+STOPWORDS = frozenset(fold(word) for word in _STOPWORDS.split())
+
+
+def tokenize(prompt):
+    return [fold(token) for token in normalize_prompt(prompt).split()]
+
+
+class LibraryMatch:
+    __slots__ = ('template_id', 'confidence', 'roadmap')
+
+    def __init__(self, template_id, confidence, roadmap):
+        self.template_id = template_id
+        self.confidence = confidence
+        self.roadmap = roadmap
+
+
+class RoadmapLibrary:
+    """
+    Curated, pre-validated roadmaps for the themes most prompts are about.
+
+    Each template lists weighted keywords (single words or two-word
+    phrases) that go into one inverted index. A prompt is matched by
+    looking its words and word pairs up in the index; the best template is
+    served only when the prompt's topic words are covered by known keywords
+    and that template clearly dominates the others. ``confidence`` is the
+    share of topic words covered times the best template's share of the
+    total score, so "anxiety" alone is a confident match while "anxiety and
+    sleep" or "anxiety about my exam results" fall through to the model.
+    Prompts that mention self-harm never match.
+    """
+
+    def __init__(self, templates, min_confidence=None):
+        self._min_confidence = min_confidence
+        self._ids = []
+        self._roadmaps = []
+        self._index = {}
+        for template in templates:
+            validate_roadmap(template['roadmap'])
+            position = len(self._ids)
+            self._ids.append(template['id'])
+            self._roadmaps.append(template['roadmap'])
+            for keyword, weight in template['keywords'].items():
+                term = ' '.join(tokenize(keyword))
+                self._index.setdefault(term, []).append((position, weight))
+        self._lock = threading.Lock()
+        self._counters = {'lookups': 0, 'matched': 0}
+        self._template_hits = dict.fromkeys(self._ids, 0)
+
+    @classmethod
+    def load(cls, path=LIBRARY_PATH, **kwargs):
+        with open(path) as f:
+            return cls(json.load(f), **kwargs)
+
+    @property
+    def min_confidence(self):
+        if self._min_confidence is not None:
+            return self._min_confidence
+        return getattr(settings, 'ROADMAP_LIBRARY_MIN_CONFIDENCE', 0.6)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def score(self, prompt):
+        """Return ``(template position, confidence)`` for the best template, or ``(None, 0.0)``."""
+        tokens = tokenize(prompt)
+        topic = [i for i, token in enumerate(tokens) if token not in STOPWORDS]
+        if not topic:
+            return None, 0.0
+
+        scores = [0] * len(self._ids)
+        covered = set()
+        for i, token in enumerate(tokens):
+            terms = [(token, (i,))]
+            if i + 1 < len(tokens):
+                terms.append((f'{token} {tokens[i + 1]}', (i, i + 1)))
+            for term, span in terms:
+                postings = self._index.get(term)
+                if postings:
+                    covered.update(span)
+                    for position, weight in postings:
+                        scores[position] += weight
+
+        total = sum(scores)
+        if not total:
+            return None, 0.0
+        best = max(range(len(scores)), key=scores.__getitem__)
+        coverage = sum(1 for i in topic if i in covered) / len(topic)
+        return best, coverage * scores[best] / total
+
+    def match(self, prompt):
+        """Return a LibraryMatch for a confident match, else None; every call is counted."""
+        if is_crisis_prompt(prompt):
+            best, confidence = None, 0.0
+        else:
+            best, confidence = self.score(prompt)
+        matched = best is not None and confidence >= self.min_confidence
+        with self._lock:
+            self._counters['lookups'] += 1
+            if matched:
+                self._counters['matched'] += 1
+                self._template_hits[self._ids[best]] += 1
+        if not matched:
+            return None
+        # Callers get their own copy so the curated roadmap cannot be changed in place
+        return LibraryMatch(self._ids[best], confidence, copy.deepcopy(self._roadmaps[best]))
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats['templates'] = dict(self._template_hits)
+        stats['absorbed_rate'] = stats['matched'] / stats['lookups'] if stats['lookups'] else 0.0
+        return stats
+
+
+def library_roadmap(prompt):
+    """
+    The response body for ``prompt`` from the curated library, or None.
+
+    None when ``ROADMAP_LIBRARY_ENABLED`` is off or no template is a
+    confident match, in which case the roadmap should be generated.
+    """
+    if not getattr(settings, 'ROADMAP_LIBRARY_ENABLED', False):
+        return None
+    match = roadmap_library.match(prompt)
+    if match is None:
+        return None
+    logger.info(f"Serving the '{match.template_id}' library roadmap (confidence {match.confidence:.2f})")
+    return {'roadmap': match.roadmap, 'model': LIBRARY_MODEL_NAME, 'usage': {}}
+
+
+roadmap_library = RoadmapLibrary.load()
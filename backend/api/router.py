@@ -0,0 +1,137 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class _FunctionState:
+    __slots__ = ('name', 'latency', 'error_rate', 'samples', 'last_attempt')
+
+    def __init__(self, name):
+        self.name = name
+        self.latency = None
+        self.error_rate = 0.0
+        self.samples = 0
+        self.last_attempt = None
+
+    def rank(self):
+        # Untried functions rank first so each gets a request; tried ones with no success rank last
+        if self.latency is not None:
+            return self.latency
+        return float('inf') if self.samples else 0.0
+
+
+class ModelRouter:
+    """
+    Picks which NVCF text-generation function serves the next request.
+
+    Every call reports its latency and outcome through record(), which
+    keeps an exponentially weighted moving average of latency (successful
+    calls only) and error rate per function. choose() sends traffic to the
+    fastest function whose error rate is under the threshold; functions
+    that have never been tried count as fastest, so each gets a first
+    request. Any other function that has not been tried for a probe
+    interval gets the next request instead, which lets a slow or failing
+    function show that it has recovered. With no observations the choice
+    is the catalog's first function by name, as before.
+    """
+
+    def __init__(self, alpha=None, max_error_rate=None, probe_interval=None):
+        self._alpha = alpha
+        self._max_error_rate = max_error_rate
+        self._probe_interval = probe_interval
+        self._states = {}
+        self._lock = threading.Lock()
+        self._counters = {'choices': 0, 'probes': 0}
+
+    def _setting(self, value, name, default):
+        if value is not None:
+            return value
+        return getattr(settings, name, default)
+
+    @property
+    def alpha(self):
+        return self._setting(self._alpha, 'NVCF_ROUTER_ALPHA', 0.3)
+
+    @property
+    def max_error_rate(self):
+        return self._setting(self._max_error_rate, 'NVCF_ROUTER_MAX_ERROR_RATE', 0.5)
+
+    @property
+    def probe_interval(self):
+        return self._setting(self._probe_interval, 'NVCF_ROUTER_PROBE_INTERVAL', 30)
+
+    def _state(self, function):
+        # Caller holds self._lock
+        state = self._states.get(function['function_id'])
+        if state is None:
+            state = self._states[function['function_id']] = _FunctionState(function['name'])
+        return state
+
+    def choose(self, functions):
+        """Return the function from ``functions`` (catalog order) that should take the next request."""
+        now = time.monotonic()
+        max_error_rate = self.max_error_rate
+        probe_interval = self.probe_interval
+        with self._lock:
+            states = [self._state(function) for function in functions]
+            healthy = [i for i, state in enumerate(states) if state.error_rate < max_error_rate]
+            # min() keeps catalog order on ties
+            best = min(healthy or range(len(states)), key=lambda i: states[i].rank())
+
+            due = [
+                i for i, state in enumerate(states)
+                if i != best and state.last_attempt is not None and now - state.last_attempt >= probe_interval
+            ]
+            chosen = min(due, key=lambda i: states[i].last_attempt) if due else best
+
+            states[chosen].last_attempt = now
+            self._counters['choices'] += 1
+            if chosen != best:
+                self._counters['probes'] += 1
+        if chosen != best:
+            logger.info(f"Probing NVCF function {functions[chosen]['name']}")
+        return functions[chosen]
+
+    def alternate(self, functions, excluded):
+        """Choose among ``functions`` other than ``excluded``, falling back to it when it is the only one."""
+        others = [function for function in functions if function['function_id'] != excluded['function_id']]
+        return self.choose(others) if others else excluded
+
+    def record(self, function_id, latency, ok):
+        """Fold one call's latency in seconds and outcome into the function's averages."""
+        alpha = self.alpha
+        with self._lock:
+            state = self._states.get(function_id)
+            if state is None:
+                return
+            state.samples += 1
+            state.error_rate = alpha * (0.0 if ok else 1.0) + (1 - alpha) * state.error_rate
+            if ok:
+                state.latency = latency if state.latency is None else alpha * latency + (1 - alpha) * state.latency
+
+    def reset(self):
+        with self._lock:
+            self._states.clear()
+
+    def stats(self):
+        max_error_rate = self.max_error_rate
+        with self._lock:
+            stats = dict(self._counters)
+            stats['functions'] = {
+                function_id: {
+                    'name': state.name,
+                    'latency': state.latency,
+                    'error_rate': state.error_rate,
+                    'samples': state.samples,
+                    'healthy': state.error_rate < max_error_rate,
+                }
+                for function_id, state in self._states.items()
+            }
+        return stats
+
+
+model_router = ModelRouter()
@@ -0,0 +1,214 @@
+import json
+import logging
+import time
+from contextlib import nullcontext
+
+from django.http import StreamingHttpResponse
+
+from .exceptions import UpstreamError
+from .metrics import cache_requests_total, parse_failures_total, parse_seconds, record_usage, upstream_seconds
+from .roadmap import HEADER_FIELDS, RoadmapError, RoadmapStreamParser, parse_roadmap
+
+logger = logging.getLogger(__name__)
+
+
+def wants_stream(request, data):
+    """True when the client opted into Server-Sent Events via the body, query string or Accept header."""
+    flag = data.get('stream', request.GET.get('stream'))
+    if isinstance(flag, str):
+        flag = flag.lower() in ('1', 'true', 'yes')
+    if flag:
+        return True
+    return 'text/event-stream' in request.headers.get('Accept', '')
+
+
+def sse_event(data, event=None):
+    """Encode one Server-Sent Event frame with a JSON payload."""
+    frame = f"event: {event}\n" if event else ''
+    return f"{frame}data: {json.dumps(data)}\n\n"
+
+
+def sse_response(events):
+    """Wrap an iterator of SSE frames in an unbuffered streaming response."""
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx and similar proxies from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+_STREAM_DONE = object()
+
+
+def _parse_chunk_line(line):
+    """Decode one upstream stream line: a chunk dict, _STREAM_DONE, or None to skip it."""
+    if not line or not line.startswith('data:'):
+        return None
+    data = line[len('data:'):].strip()
+    if data == '[DONE]':
+        return _STREAM_DONE
+    try:
+        return json.loads(data)
+    except json.JSONDecodeError:
+        logger.warning(f"Skipping malformed stream chunk: {data[:100]}")
+        return None
+
+
+def iter_chat_chunks(upstream_response):
+    """
+    Parse an OpenAI-style streaming completion into decoded chunk dicts.
+
+    Upstream sends ``data: {...}`` lines separated by blank lines and finishes
+    with ``data: [DONE]``; anything else (comments, keep-alives) is skipped.
+    """
+    for line in upstream_response.iter_lines(decode_unicode=True):
+        chunk = _parse_chunk_line(line)
+        if chunk is _STREAM_DONE:
+            return
+        if chunk is not None:
+            yield chunk
+
+
+class _CompletionState:
+    """Tracks the model and usage seen so far and turns chunks into SSE frames."""
+
+    def __init__(self, model_name):
+        self.model = model_name
+        self.usage = {}
+
+    def frames(self, chunk):
+        self.model = chunk.get('model') or self.model
+        self.usage = chunk.get('usage') or self.usage
+        for choice in chunk.get('choices', []):
+            token = (choice.get('delta') or {}).get('content')
+            if token:
+                yield sse_event({'token': token}, event='token')
+
+    def done(self):
+        return sse_event({'model': self.model, 'usage': self.usage}, event='done')
+
+
+STREAM_INTERRUPTED = 'The response stream was interrupted. Please try again.'
+STREAM_DEADLINE = 'The response took too long to complete. Please try again.'
+
+
+def stream_chat_completion(upstream_response, model_name, deadline=None):
+    """
+    Forward upstream tokens as SSE frames.
+
+    Emits a ``token`` frame per content delta, then a final ``done`` frame
+    with the model and usage, or an ``error`` frame if the upstream stream
+    breaks part-way through or the request ``deadline`` passes. A client
+    that disconnects closes the generator, which closes the upstream stream.
+    """
+    state = _CompletionState(model_name)
+    try:
+        for chunk in iter_chat_chunks(upstream_response):
+            if deadline is not None and deadline.expired():
+                yield sse_event({'error': STREAM_DEADLINE}, event='error')
+                return
+            yield from state.frames(chunk)
+        yield state.done()
+    except Exception:
+        logger.exception("Upstream stream failed")
+        yield sse_event({'error': STREAM_INTERRUPTED}, event='error')
+    finally:
+        upstream_response.close()
+
+
+async def astream_chat_completion(upstream_response, model_name, deadline=None):
+    """Async variant of stream_chat_completion for an ``httpx`` streaming response."""
+    state = _CompletionState(model_name)
+    try:
+        async for line in upstream_response.aiter_lines():
+            chunk = _parse_chunk_line(line)
+            if chunk is _STREAM_DONE:
+                break
+            if deadline is not None and deadline.expired():
+                yield sse_event({'error': STREAM_DEADLINE}, event='error')
+                return
+            if chunk is not None:
+                for frame in state.frames(chunk):
+                    yield frame
+        yield state.done()
+    except Exception:
+        logger.exception("Upstream stream failed")
+        yield sse_event({'error': STREAM_INTERRUPTED}, event='error')
+    finally:
+        await upstream_response.aclose()
+
+
+def roadmap_events(body):
+    """SSE frames for a roadmap that is already complete, e.g. one served from the cache."""
+    roadmap = body['roadmap']
+    yield sse_event({field: roadmap.get(field, '') for field in HEADER_FIELDS}, event='roadmap')
+    for step in roadmap.get('steps', []):
+        yield sse_event(step, event='step')
+    yield sse_event(body, event='done')
+
+
+def stream_roadmap(chunks, model_name, on_complete=None, deadline=None, view=None, started=None, usage=None):
+    """
+    Turn streamed model text into roadmap SSE frames.
+
+    Emits a ``roadmap`` frame with the title, description and timeline as
+    soon as they are known, a ``step`` frame per step as it closes, and
+    finally a ``done`` frame with the validated roadmap, which is also
+    passed to ``on_complete``. If the text is not a valid roadmap, the
+    upstream call fails or the ``deadline`` passes, the stream ends with an
+    ``error`` frame instead of ``done``.
+
+    With a ``view`` label the stream is measured like a buffered roadmap:
+    upstream time (from ``started``, when the call was made), parse time,
+    parse failures and the token ``usage`` the chunks filled in. It is
+    counted as a cache ``miss`` once done, or as ``failed``, since its
+    200 has already been sent. A stream the client abandons is not counted.
+    """
+    parser = RoadmapStreamParser()
+    usage = {} if usage is None else usage
+    if started is None:
+        started = time.monotonic()
+    outcome = 'failed'
+    try:
+        try:
+            for chunk in chunks:
+                if deadline is not None and deadline.expired():
+                    yield sse_event({'error': STREAM_DEADLINE}, event='error')
+                    return
+                for event, data in parser.feed(chunk):
+                    yield sse_event(data, event=event)
+        finally:
+            if view is not None:
+                upstream_seconds.observe(time.monotonic() - started, view=view, model=model_name)
+        try:
+            with parse_seconds.time(view=view, model=model_name) if view is not None else nullcontext():
+                roadmap = parse_roadmap(parser.text)
+        except RoadmapError:
+            if view is not None:
+                parse_failures_total.inc(view=view, model=model_name)
+            raise
+    except UpstreamError as e:
+        yield sse_event({'error': e.message}, event='error')
+        return
+    except GeneratorExit:
+        outcome = None
+        raise
+    except Exception:
+        logger.exception("Roadmap stream failed")
+        yield sse_event({'error': STREAM_INTERRUPTED}, event='error')
+        return
+    else:
+        outcome = 'miss'
+    finally:
+        if view is not None and outcome is not None:
+            cache_requests_total.inc(view=view, result=outcome)
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+    body = {'roadmap': roadmap, 'model': model_name, 'usage': dict(usage)}
+    if view is not None:
+        record_usage(view, model_name, body['usage'])
+    if on_complete is not None:
+        on_complete(body)
+    yield sse_event(body, event='done')
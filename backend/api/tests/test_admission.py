@@ -0,0 +1,181 @@
+import asyncio
+import threading
+from unittest import TestCase, mock
+
+from asgiref.sync import sync_to_async
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIRequestFactory
+
+from ..admission import (
+    AdmissionRejected, ConcurrencyLimiter, arelease_after, is_crisis_prompt, nvcf_limiter, release_after
+)
+from ..deadlines import DeadlineExceeded, request_deadline
+from ..views import MentalHealthManagementView
+
+FUNCTIONS = [{'name': 'ai-chat', 'function_id': 'fn', 'version_id': 'v1', 'model_name': 'chat-model'}]
+
+
+def wait_for_waiters(limiter, count):
+    for _ in range(200):
+        if limiter.stats()['waiting'] >= count:
+            return
+        threading.Event().wait(0.005)
+    raise AssertionError(f'{count} waiters never queued')
+
+
+class TestConcurrencyLimiter(TestCase):
+    def _limiter(self, **kwargs):
+        options = {'max_concurrency': 1, 'queue_size': 2, 'queue_timeout': 5}
+        options.update(kwargs)
+        return ConcurrencyLimiter('Test', 'TEST_MAX_CONCURRENCY', **options)
+
+    def _wait_in_thread(self, limiter, priority, order):
+        def run():
+            slot = limiter.acquire(priority)
+            order.append(priority)
+            slot.release()
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        return thread
+
+    def test_full_queue_is_rejected_with_retry_after(self):
+        limiter = self._limiter(queue_size=1)
+        slot = limiter.acquire()
+        order = []
+        thread = self._wait_in_thread(limiter, False, order)
+        wait_for_waiters(limiter, 1)
+
+        with self.assertRaises(AdmissionRejected) as raised:
+            limiter.acquire()
+        self.assertEqual(raised.exception.status_code, 429)
+        self.assertGreaterEqual(raised.exception.retry_after, 1)
+
+        slot.release()
+        thread.join(1)
+        self.assertEqual(order, [False])
+        self.assertEqual(limiter.stats()['in_flight'], 0)
+        self.assertEqual(limiter.stats()['rejected'], 1)
+
+    def test_priority_waiters_go_first(self):
+        limiter = self._limiter()
+        slot = limiter.acquire()
+        order = []
+        ordinary = self._wait_in_thread(limiter, False, order)
+        wait_for_waiters(limiter, 1)
+        priority = self._wait_in_thread(limiter, True, order)
+        wait_for_waiters(limiter, 2)
+
+        slot.release()
+        ordinary.join(1)
+        priority.join(1)
+        self.assertEqual(order, [True, False])
+
+    def test_waiting_is_bounded_by_the_queue_timeout(self):
+        limiter = self._limiter(queue_timeout=0.01)
+        limiter.acquire()
+        with self.assertRaises(AdmissionRejected):
+            limiter.acquire()
+        self.assertEqual(limiter.stats()['waiting'], 0)
+
+    def test_waiting_is_bounded_by_the_request_deadline(self):
+        limiter = self._limiter()
+        limiter.acquire()
+        with request_deadline(0.01):
+            with self.assertRaises(DeadlineExceeded):
+                limiter.acquire()
+
+    def test_zero_limit_admits_everything(self):
+        limiter = self._limiter(max_concurrency=0)
+        slots = [limiter.acquire() for _ in range(5)]
+        self.assertEqual(limiter.stats()['in_flight'], 5)
+        for slot in slots:
+            slot.release()
+            slot.release()
+        self.assertEqual(limiter.stats()['in_flight'], 0)
+
+    def test_async_waiter_gets_the_released_slot(self):
+        limiter = self._limiter()
+
+        async def main():
+            slot = await limiter.aacquire()
+            waiter = asyncio.ensure_future(limiter.aacquire())
+            await asyncio.sleep(0)
+            self.assertEqual(limiter.stats()['waiting'], 1)
+            slot.release()
+            (await asyncio.wait_for(waiter, 1)).release()
+
+        asyncio.run(main())
+        self.assertEqual(limiter.stats()['in_flight'], 0)
+
+    def test_stream_that_is_never_iterated_still_releases(self):
+        limiter = self._limiter()
+        stream = release_after(iter(['a', 'b']), limiter.acquire())
+        stream.close()
+        self.assertEqual(limiter.stats()['in_flight'], 0)
+
+        stream = release_after(iter(['a', 'b']), limiter.acquire())
+        self.assertEqual(list(stream), ['a', 'b'])
+        self.assertEqual(limiter.stats()['in_flight'], 0)
+
+    def test_async_stream_closed_by_django_closes_the_upstream(self):
+        limiter = self._limiter()
+        upstream = mock.AsyncMock()
+        closed = []
+
+        async def chunks():
+            try:
+                yield 'a'
+                yield 'b'
+            finally:
+                closed.append(True)
+
+        async def main():
+            # Django closes the response from a worker thread once it stops iterating it
+            started = arelease_after(chunks(), limiter.acquire(), upstream=upstream)
+            self.assertEqual(await started.__aiter__().__anext__(), 'a')
+            await sync_to_async(started.close)()
+            never_iterated = arelease_after(chunks(), limiter.acquire(), upstream=upstream)
+            await sync_to_async(never_iterated.close)()
+
+        asyncio.run(main())
+        self.assertEqual(closed, [True])
+        self.assertEqual(upstream.aclose.await_count, 2)
+        self.assertEqual(limiter.stats()['in_flight'], 0)
+
+
+class TestCrisisPrompt(TestCase):
+    def test_detects_crisis_language(self):
+        self.assertTrue(is_crisis_prompt('Some days I think about ending my life'))
+        self.assertTrue(is_crisis_prompt('I have been self-harming again'))
+        self.assertFalse(is_crisis_prompt('Work is killing me, I need better sleep'))
+        self.assertFalse(is_crisis_prompt(None))
+
+
+@mock.patch.dict('os.environ', {'AI_API_KEY': 'key'})
+@override_settings(NVCF_MAX_CONCURRENCY=1, ADMISSION_QUEUE_SIZE=0)
+class TestChatAdmission(SimpleTestCase):
+    @mock.patch('api.views.function_catalog')
+    @mock.patch('requests.Session.request')
+    def test_busy_provider_returns_429_without_calling_upstream(self, request, catalog):
+        catalog.get.return_value = FUNCTIONS
+        slot = nvcf_limiter.acquire()
+        try:
+            response = MentalHealthManagementView.as_view()(
+                APIRequestFactory().post('/api/mental-health-support/', {'prompt': 'hi'}, format='json')
+            )
+        finally:
+            slot.release()
+
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+        request.assert_not_called()
+
+    @mock.patch('requests.Session.request')
+    def test_non_string_prompt_is_rejected_before_admission(self, request):
+        for prompt in (5, ['anxiety']):
+            response = MentalHealthManagementView.as_view()(
+                APIRequestFactory().post('/api/mental-health-support/', {'prompt': prompt}, format='json')
+            )
+            self.assertEqual(response.status_code, 400)
+        request.assert_not_called()
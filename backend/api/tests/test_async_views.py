@@ -0,0 +1,70 @@
+import json
+from unittest import mock
+
+import httpx
+from django.test import AsyncRequestFactory, SimpleTestCase
+
+from ..async_views import AsyncMentalHealthManagementView, AsyncWellbeingRoadmapView
+
+FUNCTION = {'name': 'ai-chat', 'function_id': 'fn', 'version_id': 'v1', 'model_name': 'chat-model'}
+
+
+class TestAsyncMentalHealthManagementView(SimpleTestCase):
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+        self.view = AsyncMentalHealthManagementView.as_view()
+
+    def _post(self, body):
+        return self.factory.post('/api/async/mental-health-support/', body, content_type='application/json')
+
+    @mock.patch.dict('os.environ', {'AI_API_KEY': 'key'})
+    @mock.patch('api.async_views.function_catalog')
+    @mock.patch('api.async_views.async_upstream_client')
+    async def test_returns_generated_text(self, client, catalog):
+        catalog.cached.return_value = [FUNCTION]
+        client.post = mock.AsyncMock(return_value=httpx.Response(200, json={
+            'model': 'chat-model',
+            'choices': [{'message': {'content': 'Take a deep breath.'}}],
+            'usage': {'total_tokens': 5},
+        }))
+
+        response = await self.view(self._post({'prompt': 'I feel anxious'}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['generated_text'], 'Take a deep breath.')
+        url = client.post.call_args.args[0]
+        self.assertTrue(url.endswith('/pexec/functions/fn/versions/v1'))
+
+    @mock.patch.dict('os.environ', {'AI_API_KEY': 'key'})
+    @mock.patch('api.async_views.function_catalog')
+    @mock.patch('api.async_views.async_upstream_client')
+    async def test_upstream_timeout_is_504(self, client, catalog):
+        catalog.cached.return_value = [FUNCTION]
+        client.post = mock.AsyncMock(side_effect=httpx.ReadTimeout('slow'))
+
+        response = await self.view(self._post({'prompt': 'hello'}))
+
+        self.assertEqual(response.status_code, 504)
+
+    async def test_prompt_is_required(self):
+        response = await self.view(self._post({}))
+        self.assertEqual(response.status_code, 400)
+
+    async def test_non_string_prompt_is_rejected(self):
+        for prompt in (5, ['anxiety']):
+            response = await self.view(self._post({'prompt': prompt}))
+            self.assertEqual(response.status_code, 400)
+
+
+class TestAsyncWellbeingRoadmapView(SimpleTestCase):
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+        self.view = AsyncWellbeingRoadmapView.as_view()
+
+    def _post(self, body):
+        return self.factory.post('/api/async/wellbeing/roadmap/', body, content_type='application/json')
+
+    async def test_non_string_prompt_is_rejected(self):
+        for prompt in (5, ['anxiety']):
+            response = await self.view(self._post({'prompt': prompt}))
+            self.assertEqual(response.status_code, 400)
@@ -0,0 +1,92 @@
+import json
+import threading
+import time
+from unittest import TestCase, mock
+
+from django.test import AsyncRequestFactory, SimpleTestCase, override_settings
+from rest_framework.test import APIRequestFactory
+
+from ..async_views import AsyncMentalHealthBatchView
+from ..exceptions import UpstreamError
+from ..views import MentalHealthBatchView
+
+FUNCTIONS = [{'name': 'ai-chat', 'function_id': 'fn', 'version_id': 'v1', 'model_name': 'chat-model'}]
+
+
+def fake_complete(self, api_key, function, prompt):
+    if prompt == 'fail':
+        raise UpstreamError('Failed to generate response. Please try again later.', 500)
+    return {'generated_text': prompt.upper(), 'model': function['model_name'], 'usage': {}}
+
+
+@mock.patch.dict('os.environ', {'AI_API_KEY': 'key'})
+@mock.patch('api.views.function_catalog')
+class TestMentalHealthBatchView(TestCase):
+    def _post(self, body):
+        request = APIRequestFactory().post('/api/mental-health-support/batch/', body, format='json')
+        return MentalHealthBatchView.as_view()(request)
+
+    def test_results_keep_prompt_order_with_per_item_errors(self, catalog):
+        catalog.get.return_value = FUNCTIONS
+        with mock.patch.object(MentalHealthBatchView, 'complete', fake_complete):
+            response = self._post({'prompts': ['a', 'fail', '', 'b']})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['model'], 'chat-model')
+        self.assertEqual(response.data['results'], [
+            {'generated_text': 'A', 'model': 'chat-model', 'usage': {}},
+            {'error': 'Failed to generate response. Please try again later.', 'status': 500},
+            {'error': 'Prompt is required', 'status': 400},
+            {'generated_text': 'B', 'model': 'chat-model', 'usage': {}},
+        ])
+        catalog.get.assert_called_once_with('key')
+
+    @override_settings(BATCH_MAX_CONCURRENCY=3)
+    def test_parallelism_is_bounded(self, catalog):
+        catalog.get.return_value = FUNCTIONS
+        lock = threading.Lock()
+        in_flight = []
+        peak = []
+
+        def slow_complete(self, api_key, function, prompt):
+            with lock:
+                in_flight.append(prompt)
+                peak.append(len(in_flight))
+            time.sleep(0.02)
+            with lock:
+                in_flight.remove(prompt)
+            return {'generated_text': prompt}
+
+        with mock.patch.object(MentalHealthBatchView, 'complete', slow_complete):
+            response = self._post({'prompts': [str(i) for i in range(9)]})
+
+        self.assertEqual([item['generated_text'] for item in response.data['results']], [str(i) for i in range(9)])
+        self.assertEqual(max(peak), 3)
+
+    @override_settings(BATCH_MAX_PROMPTS=2)
+    def test_rejects_invalid_batches(self, catalog):
+        self.assertEqual(self._post({'prompts': 'hello'}).status_code, 400)
+        self.assertEqual(self._post({'prompts': []}).status_code, 400)
+        self.assertEqual(self._post({'prompts': ['a', 'b', 'c']}).status_code, 400)
+        catalog.get.assert_not_called()
+
+
+@mock.patch.dict('os.environ', {'AI_API_KEY': 'key'})
+class TestAsyncMentalHealthBatchView(SimpleTestCase):
+    @mock.patch('api.async_views.function_catalog')
+    async def test_results_keep_prompt_order(self, catalog):
+        catalog.cached.return_value = FUNCTIONS
+
+        async def complete(self, api_key, function, prompt):
+            return fake_complete(self, api_key, function, prompt)
+
+        request = AsyncRequestFactory().post(
+            '/api/async/mental-health-support/batch/', {'prompts': ['a', 'fail', 'b']},
+            content_type='application/json'
+        )
+        with mock.patch.object(AsyncMentalHealthBatchView, 'complete', complete):
+            response = await AsyncMentalHealthBatchView.as_view()(request)
+
+        results = json.loads(response.content)['results']
+        self.assertEqual([item.get('generated_text') for item in results], ['A', None, 'B'])
+        self.assertEqual(results[1]['status'], 500)
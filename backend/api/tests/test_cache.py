@@ -0,0 +1,239 @@
+import asyncio
+import json
+import threading
+import time
+from unittest import TestCase, mock
+
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory
+
+from ..cache import LRUCache, SingleFlight, normalize_prompt, roadmap_cache, roadmap_flights
+from ..views import WellbeingRoadmapView
+from .test_roadmap import ROADMAP
+
+
+class TestNormalizePrompt(TestCase):
+    def test_folds_case_whitespace_and_punctuation(self):
+        self.assertEqual(normalize_prompt('  Anxiety,  and SLEEP issues!! '), 'anxiety and sleep issues')
+        self.assertEqual(normalize_prompt('anxiety and sleep issues'), normalize_prompt('Anxiety and sleep-issues.'))
+
+
+class TestLRUCache(TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+        stats = cache.stats()
+        self.assertEqual(stats['evictions'], 1)
+        self.assertEqual(stats['hits'], 3)
+        self.assertEqual(stats['misses'], 1)
+
+    def test_entries_expire(self):
+        cache = LRUCache(maxsize=2, ttl=10)
+        with mock.patch('api.cache.time.monotonic', return_value=100):
+            cache.set('a', 1)
+        with mock.patch('api.cache.time.monotonic', return_value=109):
+            self.assertEqual(cache.get('a'), 1)
+        with mock.patch('api.cache.time.monotonic', return_value=111):
+            self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['expirations'], 1)
+        self.assertEqual(len(cache), 0)
+
+
+def _wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError('condition not reached')
+        time.sleep(0.001)
+
+
+class TestSingleFlight(TestCase):
+    def _run_concurrently(self, flights, func, callers):
+        results = [None] * callers
+
+        def call(i):
+            try:
+                results[i] = flights.do('key', func)
+            except Exception as e:
+                results[i] = e
+
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(callers)]
+        for thread in threads:
+            thread.start()
+        return threads, results
+
+    def test_concurrent_callers_share_one_call(self):
+        flights = SingleFlight()
+        release = threading.Event()
+        func = mock.Mock(side_effect=lambda: release.wait() and 'roadmap')
+
+        threads, results = self._run_concurrently(flights, func, 5)
+        _wait_for(lambda: flights.stats()['shared'] == 4)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(func.call_count, 1)
+        self.assertEqual(sorted(shared for _, shared in results), [False, True, True, True, True])
+        self.assertTrue(all(result == 'roadmap' for result, _ in results))
+        stats = flights.stats()
+        self.assertEqual((stats['calls'], stats['in_flight']), (1, 0))
+        self.assertEqual(stats['saved_rate'], 0.8)
+
+    def test_error_is_raised_in_every_waiter(self):
+        flights = SingleFlight()
+        release = threading.Event()
+
+        def fail():
+            release.wait()
+            raise ValueError('upstream failed')
+
+        threads, results = self._run_concurrently(flights, fail, 3)
+        _wait_for(lambda: flights.stats()['shared'] == 2)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        self.assertEqual(flights.stats()['shared_errors'], 2)
+
+    def test_sequential_calls_are_not_shared(self):
+        flights = SingleFlight()
+        self.assertEqual(flights.do('key', lambda: 1), (1, False))
+        self.assertEqual(flights.do('key', lambda: 2), (2, False))
+        self.assertEqual(flights.stats()['calls'], 2)
+
+    def test_async_callers_share_one_task(self):
+        flights = SingleFlight()
+        calls = []
+
+        async def generate():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return 'roadmap'
+
+        async def main():
+            return await asyncio.gather(*(flights.do_async('key', generate) for _ in range(4)))
+
+        results = asyncio.run(main())
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [('roadmap', False)] + [('roadmap', True)] * 3)
+        self.assertEqual(flights.stats()['in_flight'], 0)
+
+    def test_cancelled_async_waiter_does_not_cancel_the_call(self):
+        flights = SingleFlight()
+
+        async def generate():
+            await asyncio.sleep(0.01)
+            return 'roadmap'
+
+        async def main():
+            leader = asyncio.ensure_future(flights.do_async('key', generate))
+            follower = asyncio.ensure_future(flights.do_async('key', generate))
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await follower
+
+        self.assertEqual(asyncio.run(main()), ('roadmap', True))
+
+
+@mock.patch.dict('os.environ', {'GEMINI_API_KEY': 'key'})
+class TestRoadmapViewCache(TestCase):
+    def setUp(self):
+        roadmap_cache.clear()
+        self.factory = APIRequestFactory()
+        self.view = WellbeingRoadmapView.as_view()
+        # These prompts would otherwise be answered from the curated library
+        library = override_settings(ROADMAP_LIBRARY_ENABLED=False)
+        library.enable()
+        self.addCleanup(library.disable)
+
+    def tearDown(self):
+        roadmap_cache.clear()
+
+    def _post(self, prompt):
+        return self.view(self.factory.post('/api/wellbeing/roadmap/', {'prompt': prompt}, format='json'))
+
+    def test_second_equivalent_prompt_is_served_from_cache(self):
+        generated = mock.Mock(text=json.dumps(ROADMAP), spec=['text'])
+        with mock.patch.object(WellbeingRoadmapView, 'generate_roadmap', return_value=generated) as generate:
+            first = self._post('Anxiety and sleep issues')
+            second = self._post('anxiety   and sleep issues!')
+
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.data['roadmap'], ROADMAP)
+
+    def test_invalid_roadmap_is_not_cached(self):
+        generated = mock.Mock(text='{"title": "incomplete"}', spec=['text'])
+        with mock.patch.object(WellbeingRoadmapView, 'generate_roadmap', return_value=generated) as generate:
+            self.assertEqual(self._post('stress').status_code, 500)
+            self.assertEqual(self._post('stress').status_code, 500)
+
+        self.assertEqual(generate.call_count, 2)
+        self.assertEqual(len(roadmap_cache), 0)
+
+    def test_non_string_prompt_is_rejected(self):
+        with mock.patch.object(WellbeingRoadmapView, 'generate_roadmap') as generate:
+            self.assertEqual(self._post(5).status_code, 400)
+            self.assertEqual(self._post(['anxiety']).status_code, 400)
+
+        generate.assert_not_called()
+
+    def test_streamed_roadmap_is_cached_and_replayed(self):
+        text = json.dumps(ROADMAP)
+        chunks = [text[i:i + 20] for i in range(0, len(text), 20)]
+
+        def post():
+            response = self.view(self.factory.post(
+                '/api/wellbeing/roadmap/', {'prompt': 'stress', 'stream': True}, format='json'
+            ))
+            body = ''.join(part.decode() for part in response.streaming_content)
+            return response, [line[len('event: '):] for line in body.split('\n') if line.startswith('event: ')]
+
+        with mock.patch('api.views.gemini_provider') as provider:
+            provider.stream_text.return_value = iter(chunks)
+            first, first_events = post()
+            second, second_events = post()
+
+        provider.open_stream.assert_called_once_with('stress')
+        provider.limiter.acquire.return_value.release.assert_called()
+        self.assertEqual(first['Content-Type'], 'text/event-stream')
+        self.assertEqual((first['X-Cache'], second['X-Cache']), ('MISS', 'HIT'))
+        self.assertEqual(first_events, ['roadmap', 'step', 'done'])
+        self.assertEqual(second_events, first_events)
+
+    def test_concurrent_identical_prompts_share_one_generation(self):
+        release = threading.Event()
+        generated = mock.Mock(text=json.dumps(ROADMAP), spec=['text'])
+        responses = []
+
+        def generate(prompt):
+            release.wait()
+            return generated
+
+        with mock.patch.object(WellbeingRoadmapView, 'generate_roadmap', side_effect=generate) as generate_roadmap:
+            before = roadmap_flights.stats()['shared']
+            threads = [
+                threading.Thread(target=lambda p=prompt: responses.append(self._post(p)))
+                for prompt in ('Exam stress', 'exam stress!', 'EXAM   stress')
+            ]
+            for thread in threads:
+                thread.start()
+            _wait_for(lambda: roadmap_flights.stats()['shared'] - before == 2)
+            release.set()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(generate_roadmap.call_count, 1)
+        self.assertEqual(sorted(r['X-Cache'] for r in responses), ['MISS', 'SHARED', 'SHARED'])
+        self.assertTrue(all(r.data['roadmap'] == ROADMAP for r in responses))
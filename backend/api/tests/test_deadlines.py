@@ -0,0 +1,77 @@
+import threading
+from unittest import TestCase, mock
+
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIRequestFactory
+
+from ..deadlines import DeadlineExceeded, current_deadline, deadline_seconds, request_deadline, upstream_timeout
+from ..resilience import RetryBudget, budgeted_retry
+from ..views import MentalHealthManagementView
+
+
+@override_settings(REQUEST_DEADLINE=30, REQUEST_DEADLINE_MAX=60)
+class TestDeadlineSeconds(SimpleTestCase):
+    def test_header_overrides_the_default(self):
+        self.assertEqual(deadline_seconds({}), 30)
+        self.assertEqual(deadline_seconds({'X-Request-Timeout': '12.5'}), 12.5)
+
+    def test_header_is_capped_and_validated(self):
+        self.assertEqual(deadline_seconds({'X-Request-Timeout': '600'}), 60)
+        self.assertEqual(deadline_seconds({'X-Request-Timeout': 'soon'}), 30)
+        self.assertEqual(deadline_seconds({'X-Request-Timeout': '-1'}), 30)
+
+
+class TestUpstreamTimeout(TestCase):
+    def test_without_deadline_the_timeout_is_unchanged(self):
+        self.assertIsNone(current_deadline())
+        self.assertEqual(upstream_timeout(60), (60, False))
+
+    def test_deadline_shrinks_the_timeout(self):
+        with request_deadline(5):
+            timeout, limited = upstream_timeout(60)
+            self.assertTrue(limited)
+            self.assertLessEqual(timeout, 5)
+            self.assertEqual(upstream_timeout(1), (1, False))
+        self.assertIsNone(current_deadline())
+
+    def test_expired_deadline_raises(self):
+        with request_deadline(0):
+            with self.assertRaises(DeadlineExceeded) as ctx:
+                upstream_timeout(60)
+        self.assertEqual(ctx.exception.status_code, 504)
+
+
+@mock.patch('tenacity.nap.time.sleep')
+class TestRetryWithinDeadline(TestCase):
+    def test_retry_that_cannot_finish_is_skipped(self, sleep):
+        def slow_failure():
+            threading.Event().wait(0.05)
+            raise ConnectionError('reset')
+
+        func = mock.Mock(side_effect=slow_failure)
+        with mock.patch('api.resilience.retry_budget', RetryBudget(ratio=0, cap=5)):
+            with request_deadline(0.08):
+                with self.assertRaises(ConnectionError):
+                    budgeted_retry((ConnectionError,))(func)()
+        self.assertEqual(func.call_count, 1)
+
+
+@mock.patch.dict('os.environ', {'AI_API_KEY': 'key'})
+class TestViewDeadline(TestCase):
+    @mock.patch('api.views.function_catalog')
+    @mock.patch('requests.Session.request')
+    def test_client_deadline_bounds_the_upstream_call(self, session_request, catalog):
+        catalog.get.return_value = [{'name': 'ai-chat', 'function_id': 'fn', 'version_id': 'v', 'model_name': 'm'}]
+        session_request.return_value = mock.Mock(status_code=200, json=lambda: {
+            'choices': [{'message': {'content': 'Breathe.'}}],
+        })
+        request = APIRequestFactory().post(
+            '/api/mental-health-support/', {'prompt': 'hi'}, format='json', HTTP_X_REQUEST_TIMEOUT='2'
+        )
+
+        response = MentalHealthManagementView.as_view()(request)
+
+        self.assertEqual(response.status_code, 200)
+        connect_timeout, read_timeout = session_request.call_args.kwargs['timeout']
+        self.assertLessEqual(read_timeout, 2)
+        self.assertIsNone(current_deadline())
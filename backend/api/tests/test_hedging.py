@@ -0,0 +1,116 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase, mock
+
+from ..hedging import Hedger
+
+
+def _hedger(**kwargs):
+    options = dict(enabled=True, percentile=50, min_samples=4, window=10, budget_ratio=1.0)
+    options.update(kwargs)
+    hedger = Hedger('test', **options)
+    for latency in (0.01, 0.01, 0.01, 0.01):
+        hedger.observe(latency)
+    return hedger
+
+
+class TestHedger(TestCase):
+    def test_disabled_runs_only_the_primary(self):
+        hedger = _hedger(enabled=False)
+        self.assertIsNone(hedger.delay())
+        self.assertEqual(hedger.call(lambda: 'primary', lambda: 'hedge'), 'primary')
+        self.assertEqual(hedger.stats()['hedged'], 0)
+
+    def test_fast_primary_is_not_hedged(self):
+        hedger = _hedger()
+        hedge_calls = []
+        self.assertEqual(hedger.call(lambda: 'primary', lambda: hedge_calls.append(1)), 'primary')
+        self.assertEqual(hedge_calls, [])
+
+    def test_slow_primary_loses_to_the_hedge(self):
+        hedger = _hedger()
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        result = hedger.call(lambda: release.wait(5) and 'primary', lambda: 'hedge')
+
+        self.assertEqual(result, 'hedge')
+        stats = hedger.stats()
+        self.assertEqual((stats['hedged'], stats['hedge_wins']), (1, 1))
+
+    def test_failed_hedge_falls_back_to_the_primary(self):
+        hedger = _hedger()
+
+        def slow():
+            threading.Event().wait(0.1)
+            return 'primary'
+
+        def fail():
+            raise ValueError('hedge failed')
+
+        self.assertEqual(hedger.call(slow, fail), 'primary')
+        self.assertEqual(hedger.stats()['hedge_wins'], 0)
+
+    def test_budget_caps_extra_calls(self):
+        hedger = _hedger(budget_ratio=0.5)
+        hedge_calls = []
+
+        def hedge():
+            hedge_calls.append(1)
+            return 'hedge'
+
+        for _ in range(4):
+            hedger.call(lambda: threading.Event().wait(0.05) and 'primary', hedge)
+
+        self.assertEqual(len(hedge_calls), 2)
+        self.assertEqual(hedger.stats()['budget_exhausted'], 2)
+
+    def test_callers_beyond_the_pool_are_not_queued_into_hedges(self):
+        hedger = _hedger(budget_ratio=1.0)
+        for _ in range(4):
+            hedger.observe(0.2)
+        pool = ThreadPoolExecutor(max_workers=2)
+        self.addCleanup(pool.shutdown)
+        callers = 10
+        start = threading.Barrier(callers)
+        results = []
+
+        def caller():
+            start.wait()
+            results.append(hedger.call(lambda: threading.Event().wait(0.05) or 'primary', lambda: 'hedge'))
+
+        with mock.patch.multiple('api.hedging', _executor=pool, _slots=threading.BoundedSemaphore(2)):
+            threads = [threading.Thread(target=caller) for _ in range(callers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(results, ['primary'] * callers)
+        stats = hedger.stats()
+        self.assertEqual(stats['hedged'], 0)
+        self.assertGreater(stats['pool_full'], 0)
+
+    def test_async_loser_is_cancelled(self):
+        hedger = _hedger()
+        cancelled = []
+
+        async def slow():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(1)
+                raise
+            return 'primary'
+
+        async def fast():
+            return 'hedge'
+
+        async def main():
+            result = await hedger.acall(slow, fast)
+            await asyncio.sleep(0)
+            return result
+
+        self.assertEqual(asyncio.run(main()), 'hedge')
+        self.assertEqual(cancelled, [1])
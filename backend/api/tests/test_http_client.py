@@ -0,0 +1,76 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import TestCase
+
+import requests
+
+from ..deadlines import DeadlineExceeded, request_deadline
+from ..http_client import UpstreamClient
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.path == '/slow':
+            time.sleep(0.5)
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestUpstreamClient(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_connections_are_reused(self):
+        client = UpstreamClient(pool_connections=1, pool_maxsize=2, connect_timeout=1, read_timeout=1)
+        for _ in range(5):
+            self.assertEqual(client.get(f'{self.base_url}/fast').json(), {'ok': True})
+
+        stats = client.stats()
+        self.assertEqual(stats['requests'], 5)
+        self.assertEqual(stats['in_flight'], 0)
+        pool = next(iter(stats['pools'].values()))
+        self.assertEqual(pool['connections_opened'], 1)
+        self.assertEqual(pool['requests_sent'], 5)
+        client.close()
+
+    def test_read_timeout_is_enforced(self):
+        client = UpstreamClient(connect_timeout=1, read_timeout=5)
+        with self.assertRaises(requests.exceptions.Timeout):
+            client.get(f'{self.base_url}/slow', read_timeout=0.1)
+
+        stats = client.stats()
+        self.assertEqual(stats['timeouts'], 1)
+        self.assertEqual(stats['errors'], 1)
+        client.close()
+
+    def test_deadline_shrinks_the_read_timeout(self):
+        client = UpstreamClient(connect_timeout=1, read_timeout=5)
+        started = time.monotonic()
+        with request_deadline(0.1):
+            with self.assertRaises(DeadlineExceeded):
+                client.get(f'{self.base_url}/slow')
+            with self.assertRaises(DeadlineExceeded):
+                client.get(f'{self.base_url}/fast')
+
+        self.assertLess(time.monotonic() - started, 0.4)
+        self.assertEqual(client.stats()['requests'], 1)
+        client.close()
@@ -0,0 +1,173 @@
+import json
+from unittest import TestCase, mock
+
+from django.test import Client, override_settings
+from rest_framework.test import APIRequestFactory
+
+from ..cache import roadmap_cache
+from ..metrics import Counter, Histogram, record_usage, registry
+from ..prompts import ROADMAP_MODEL_NAME
+from ..roadmap_library import LIBRARY_MODEL_NAME
+from ..views import MentalHealthManagementView, WellbeingRoadmapView
+from .test_roadmap import ROADMAP
+
+FUNCTIONS = [{'name': 'ai-chat', 'function_id': 'fn', 'version_id': 'v1', 'model_name': 'chat-model'}]
+
+
+def sample(text, line_start):
+    """Value of the exposition line starting with ``line_start``."""
+    for line in text.splitlines():
+        if line.startswith(line_start + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+
+class TestMetricTypes(TestCase):
+    def test_counter_renders_one_series_per_label_set(self):
+        counter = Counter('test_total', 'Things.', ['kind'])
+        counter.inc(kind='a')
+        counter.inc(2, kind='a')
+        counter.inc(kind='b"c')
+
+        self.assertEqual(counter.render(), [
+            '# HELP test_total Things.',
+            '# TYPE test_total counter',
+            'test_total{kind="a"} 3',
+            'test_total{kind="b\\"c"} 1',
+        ])
+
+    def test_counter_rejects_wrong_labels(self):
+        with self.assertRaises(ValueError):
+            Counter('test_total', 'Things.', ['kind']).inc(other='a')
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram('test_seconds', 'Latency.', ['view'], buckets=(0.1, 1))
+        for value in (0.05, 0.5, 0.7, 3):
+            histogram.observe(value, view='v')
+
+        lines = histogram.render()[2:]
+        self.assertEqual(lines, [
+            'test_seconds_bucket{view="v",le="0.1"} 1',
+            'test_seconds_bucket{view="v",le="1"} 3',
+            'test_seconds_bucket{view="v",le="+Inf"} 4',
+            'test_seconds_sum{view="v"} 4.25',
+            'test_seconds_count{view="v"} 4',
+        ])
+
+    def test_record_usage_skips_non_numeric_fields(self):
+        counter = Counter('test_tokens_total', 'Tokens.', ['view', 'model', 'type'])
+        with mock.patch('api.metrics.tokens_total', counter):
+            record_usage('View', 'm', {'prompt_tokens': 5, 'total_tokens': 7, 'note': 'x'})
+            record_usage('View', 'm', None)
+
+        self.assertEqual(counter.value(view='View', model='m', type='prompt'), 5)
+        self.assertEqual(counter.value(view='View', model='m', type='total'), 7)
+
+
+@mock.patch.dict('os.environ', {'AI_API_KEY': 'key', 'GEMINI_API_KEY': 'key'})
+class TestMetricsEndpoint(TestCase):
+    def setUp(self):
+        registry.clear()
+        roadmap_cache.clear()
+        self.factory = APIRequestFactory()
+        # These prompts would otherwise be answered from the curated library
+        library = override_settings(ROADMAP_LIBRARY_ENABLED=False)
+        library.enable()
+        self.addCleanup(library.disable)
+
+    def tearDown(self):
+        roadmap_cache.clear()
+
+    def scrape(self):
+        response = Client().get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return response.content.decode()
+
+    @mock.patch('api.views.function_catalog')
+    @mock.patch('requests.Session.request')
+    def test_chat_request_records_latency_and_tokens(self, request, catalog):
+        catalog.get.return_value = FUNCTIONS
+        request.return_value = mock.Mock(status_code=200, json=lambda: {
+            'model': 'chat-model',
+            'choices': [{'message': {'content': 'Hello'}}],
+            'usage': {'prompt_tokens': 10, 'completion_tokens': 32, 'total_tokens': 42},
+        })
+        view = MentalHealthManagementView.as_view()
+        response = view(self.factory.post('/api/mental-health-support/', {'prompt': 'hi'}, format='json'))
+        self.assertEqual(response.status_code, 200)
+
+        text = self.scrape()
+        labels = 'view="MentalHealthManagementView",model="chat-model"'
+        self.assertEqual(sample(text, 'mindwell_catalog_lookup_seconds_count{view="MentalHealthManagementView"}'), 1)
+        self.assertEqual(sample(text, f'mindwell_upstream_seconds_count{{{labels}}}'), 1)
+        self.assertEqual(sample(text, f'mindwell_request_seconds_count{{{labels},status="200"}}'), 1)
+        self.assertEqual(sample(text, f'mindwell_tokens_total{{{labels},type="completion"}}'), 32)
+        self.assertEqual(sample(text, f'mindwell_tokens_total{{{labels},type="total"}}'), 42)
+
+    def test_roadmap_requests_record_cache_and_parse_outcomes(self):
+        view = WellbeingRoadmapView.as_view()
+
+        def post(prompt):
+            return view(self.factory.post('/api/wellbeing/roadmap/', {'prompt': prompt}, format='json'))
+
+        valid = mock.Mock(text=json.dumps(ROADMAP), spec=['text'])
+        invalid = mock.Mock(text='not json', spec=['text'])
+        with mock.patch.object(WellbeingRoadmapView, 'generate_roadmap', side_effect=[valid, invalid]):
+            post('stress')
+            post('stress')
+            self.assertEqual(post('sleep').status_code, 500)
+
+        text = self.scrape()
+        view_label = 'view="WellbeingRoadmapView"'
+        labels = f'{view_label},model="{ROADMAP_MODEL_NAME}"'
+        self.assertEqual(sample(text, f'mindwell_cache_requests_total{{{view_label},result="hit"}}'), 1)
+        self.assertEqual(sample(text, f'mindwell_cache_requests_total{{{view_label},result="miss"}}'), 2)
+        self.assertEqual(sample(text, f'mindwell_parse_seconds_count{{{labels}}}'), 2)
+        self.assertEqual(sample(text, f'mindwell_parse_failures_total{{{labels}}}'), 1)
+        self.assertEqual(sample(text, f'mindwell_request_seconds_count{{{labels},status="500"}}'), 1)
+
+    @mock.patch('requests.Session.request')
+    def test_streamed_roadmaps_record_the_same_outcomes(self, request):
+        text = json.dumps(ROADMAP)
+        usage = {'usageMetadata': {'promptTokenCount': 10, 'candidatesTokenCount': 32, 'totalTokenCount': 42}}
+
+        def gemini_stream(*frames):
+            response = mock.Mock(status_code=200)
+            response.iter_lines.return_value = iter(f'data: {json.dumps(frame)}' for frame in frames)
+            return response
+
+        request.side_effect = [
+            gemini_stream({'candidates': [{'content': {'parts': [{'text': text}]}}]}, usage),
+            gemini_stream({'candidates': [{'content': {'parts': [{'text': 'not json'}]}}]}),
+        ]
+        view = WellbeingRoadmapView.as_view()
+        for prompt in ('streamed stress', 'streamed sleep'):
+            response = view(self.factory.post('/api/wellbeing/roadmap/', {'prompt': prompt, 'stream': True},
+                                              format='json'))
+            b''.join(response.streaming_content)
+
+        text = self.scrape()
+        view_label = 'view="WellbeingRoadmapView"'
+        labels = f'{view_label},model="{ROADMAP_MODEL_NAME}"'
+        self.assertEqual(sample(text, f'mindwell_cache_requests_total{{{view_label},result="miss"}}'), 1)
+        self.assertEqual(sample(text, f'mindwell_cache_requests_total{{{view_label},result="failed"}}'), 1)
+        self.assertEqual(sample(text, f'mindwell_upstream_seconds_count{{{labels}}}'), 2)
+        self.assertEqual(sample(text, f'mindwell_parse_seconds_count{{{labels}}}'), 2)
+        self.assertEqual(sample(text, f'mindwell_parse_failures_total{{{labels}}}'), 1)
+        self.assertEqual(sample(text, f'mindwell_tokens_total{{{labels},type="completion"}}'), 32)
+
+    def test_library_roadmaps_are_counted_separately(self):
+        view = WellbeingRoadmapView.as_view()
+        with override_settings(ROADMAP_LIBRARY_ENABLED=True), \
+                mock.patch.object(WellbeingRoadmapView, 'generate_roadmap') as generate:
+            response = view(self.factory.post('/api/wellbeing/roadmap/', {'prompt': 'stress'}, format='json'))
+        self.assertEqual(response.status_code, 200)
+        generate.assert_not_called()
+
+        text = self.scrape()
+        view_label = 'view="WellbeingRoadmapView"'
+        self.assertEqual(sample(text, f'mindwell_cache_requests_total{{{view_label},result="library"}}'), 1)
+        self.assertEqual(
+            sample(text, f'mindwell_request_seconds_count{{{view_label},model="{LIBRARY_MODEL_NAME}",status="200"}}'), 1
+        )
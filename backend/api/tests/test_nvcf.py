@@ -0,0 +1,85 @@
+import threading
+import time
+from unittest import TestCase, mock
+
+from ..nvcf import (
+    CatalogError,
+    FunctionCatalog,
+    resolve_model_name,
+    text_generation_functions,
+)
+
+
+class TestFunctionSelection(TestCase):
+    def test_text_generation_functions(self):
+        catalog = {
+            'functions': [
+                {'id': '1', 'versionId': 'a', 'name': 'ai-qwen2_5-7b-instruct', 'status': 'ACTIVE'},
+                {'id': '2', 'versionId': 'b', 'name': 'ai-mistral-nemo-12b-instruct', 'status': 'ACTIVE'},
+                {'id': '3', 'versionId': 'c', 'name': 'ai-llama-guard', 'status': 'INACTIVE'},
+                {'id': '4', 'versionId': 'd', 'name': 'ai-chat-helper', 'status': 'ACTIVE'},
+            ]
+        }
+        names = [func['name'] for func in text_generation_functions(catalog)]
+        self.assertEqual(names, ['ai-chat-helper', 'ai-mistral-nemo-12b-instruct'])
+
+    def test_resolve_model_name(self):
+        self.assertEqual(resolve_model_name('ai-mistral-nemo-12b-instruct'), 'mistralai/mistral-12b-instruct')
+        self.assertEqual(resolve_model_name('ai-llama-3-70b'), 'meta-llama/llama-3-70b')
+        self.assertEqual(resolve_model_name('ai-chat-helper'), 'chat-helper')
+
+
+class TestFunctionCatalog(TestCase):
+    def setUp(self):
+        self.calls = 0
+
+    def fetch(self, api_key):
+        self.calls += 1
+        return [{'function_id': f'fn-{self.calls}', 'version_id': 'v', 'model_name': 'm', 'name': 'n'}]
+
+    def test_fresh_entry_is_reused(self):
+        catalog = FunctionCatalog(ttl=60, fetch=self.fetch)
+        self.assertEqual(catalog.get('key')[0]['function_id'], 'fn-1')
+        self.assertEqual(catalog.get('key')[0]['function_id'], 'fn-1')
+        self.assertEqual(self.calls, 1)
+
+    def test_stale_entry_served_while_refreshing(self):
+        release = threading.Event()
+
+        def slow_fetch(api_key):
+            if self.calls:
+                release.wait(5)
+            return self.fetch(api_key)
+
+        catalog = FunctionCatalog(ttl=0, fetch=slow_fetch)
+        self.assertEqual(catalog.get('key')[0]['function_id'], 'fn-1')
+
+        # The refresh is blocked, so the stale entry must come back immediately
+        started = time.monotonic()
+        self.assertEqual(catalog.get('key')[0]['function_id'], 'fn-1')
+        self.assertEqual(catalog.get('key')[0]['function_id'], 'fn-1')
+        self.assertLess(time.monotonic() - started, 1)
+
+        release.set()
+        deadline = time.monotonic() + 5
+        while catalog.get('key')[0]['function_id'] == 'fn-1' and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(catalog.get('key')[0]['function_id'], 'fn-2')
+
+    def test_failed_refresh_keeps_stale_entry(self):
+        catalog = FunctionCatalog(ttl=0, fetch=self.fetch)
+        catalog.get('key')
+        catalog._fetch = mock.Mock(side_effect=CatalogError('down', 500))
+        self.assertEqual(catalog.get('key')[0]['function_id'], 'fn-1')
+
+        deadline = time.monotonic() + 5
+        while catalog._refreshing and time.monotonic() < deadline:
+            time.sleep(0.01)
+        catalog._fetch.assert_called_once_with('key')
+        self.assertEqual(catalog.get('key')[0]['function_id'], 'fn-1')
+
+    def test_cold_failure_raises(self):
+        catalog = FunctionCatalog(ttl=60, fetch=mock.Mock(side_effect=CatalogError('Authentication failed.', 401)))
+        with self.assertRaises(CatalogError) as ctx:
+            catalog.get('key')
+        self.assertEqual(ctx.exception.status_code, 401)
@@ -0,0 +1,110 @@
+import json
+import threading
+from unittest import TestCase, mock
+
+from django.test import override_settings
+
+from ..deadlines import DeadlineExceeded, request_deadline
+from ..exceptions import UpstreamError
+from ..providers import GeminiRoadmapProvider
+from ..resilience import CircuitBreaker
+
+
+class TestGeminiRoadmapProvider(TestCase):
+    @mock.patch('google.generativeai.GenerativeModel')
+    @mock.patch('google.generativeai.configure')
+    def test_model_is_built_once_across_threads(self, configure, generative_model):
+        provider = GeminiRoadmapProvider()
+        configure.assert_not_called()
+
+        models = []
+        threads = [threading.Thread(target=lambda: models.append(provider.model)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        configure.assert_called_once()
+        generative_model.assert_called_once()
+        self.assertTrue(all(model is models[0] for model in models))
+
+    @mock.patch('google.generativeai.GenerativeModel')
+    @mock.patch('google.generativeai.configure')
+    def test_endpoint_override_uses_rest_transport(self, configure, generative_model):
+        with override_settings(GEMINI_API_ENDPOINT='http://127.0.0.1:8099'):
+            GeminiRoadmapProvider().model
+        self.assertEqual(configure.call_args.kwargs['transport'], 'rest')
+        self.assertEqual(configure.call_args.kwargs['client_options'], {'api_endpoint': 'http://127.0.0.1:8099'})
+
+    @mock.patch('google.generativeai.types.generation_types.GenerateContentResponse.from_response')
+    @mock.patch('google.generativeai.GenerativeModel')
+    @mock.patch('google.generativeai.configure')
+    def test_generate_sends_system_prompt_and_request(self, configure, generative_model, from_response):
+        provider = GeminiRoadmapProvider()
+        self.assertIs(provider.generate('stress at work'), from_response.return_value)
+
+        model = generative_model.return_value
+        contents = model._prepare_request.call_args.kwargs['contents']
+        self.assertIn('JSON-only', contents[0])
+        self.assertIn('stress at work', contents[1])
+        self.assertEqual(model._client.generate_content.call_args.kwargs['timeout'], provider.timeout)
+
+    @mock.patch('google.generativeai.types.generation_types.GenerateContentResponse.from_response')
+    @mock.patch('google.generativeai.GenerativeModel')
+    @mock.patch('google.generativeai.configure')
+    def test_timeout_shrinks_to_the_request_deadline(self, configure, generative_model, from_response):
+        provider = GeminiRoadmapProvider()
+        with request_deadline(5):
+            provider.generate('stress at work')
+        timeout = generative_model.return_value._client.generate_content.call_args.kwargs['timeout']
+        self.assertLessEqual(timeout, 5)
+
+    @mock.patch('google.generativeai.GenerativeModel')
+    @mock.patch('google.generativeai.configure')
+    def test_expired_deadline_skips_the_call(self, configure, generative_model):
+        provider = GeminiRoadmapProvider()
+        with request_deadline(0):
+            with self.assertRaises(DeadlineExceeded):
+                provider.generate('stress at work')
+        generative_model.return_value._client.generate_content.assert_not_called()
+
+
+class TestGeminiStream(TestCase):
+    def _response(self, status_code=200, lines=()):
+        response = mock.Mock(status_code=status_code, text='error')
+        response.iter_lines.return_value = iter(lines)
+        return response
+
+    @override_settings(GEMINI_API_ENDPOINT='http://127.0.0.1:8099')
+    @mock.patch('requests.Session.request')
+    def test_yields_text_from_sse_frames(self, request):
+        frame = {'candidates': [{'content': {'parts': [{'text': '{"title": '}, {'text': '"Plan"'}]}}]}
+        request.return_value = self._response(lines=[f'data: {json.dumps(frame)}', '', 'data: {"candidates": []}'])
+        provider = GeminiRoadmapProvider(breaker=CircuitBreaker('test'))
+
+        self.assertEqual(list(provider.stream('stress')), ['{"title": "Plan"'])
+        args, kwargs = request.call_args
+        self.assertEqual(args[1], 'http://127.0.0.1:8099/v1beta/models/gemini-1.5-pro:streamGenerateContent?alt=sse')
+        self.assertEqual(kwargs['json']['generationConfig']['maxOutputTokens'], 1000)
+        self.assertTrue(kwargs['stream'])
+        request.return_value.close.assert_called_once()
+
+    @mock.patch('requests.Session.request')
+    def test_error_status_counts_against_the_breaker(self, request):
+        request.return_value = self._response(status_code=503)
+        breaker = CircuitBreaker('test', failure_threshold=1)
+        provider = GeminiRoadmapProvider(breaker=breaker)
+
+        with self.assertRaises(UpstreamError):
+            list(provider.stream('stress'))
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+    @mock.patch('requests.Session.request')
+    def test_client_error_status_does_not_count_against_the_breaker(self, request):
+        request.return_value = self._response(status_code=400)
+        breaker = CircuitBreaker('test', failure_threshold=1)
+        provider = GeminiRoadmapProvider(breaker=breaker)
+
+        with self.assertRaises(UpstreamError):
+            list(provider.stream('stress'))
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
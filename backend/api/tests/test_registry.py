@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+from ..registry import ProviderRegistry, providers
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+STARTUP_SNIPPET = """
+import os, sys
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mindwell.settings')
+import logging; logging.disable(logging.CRITICAL)
+import django; django.setup()
+import mindwell.urls
+print('loaded:' + ' '.join(m for m in ('httpx', 'api.providers', 'api.async_http_client', 'google.generativeai') if m in sys.modules))
+"""
+
+
+class TestProviderRegistry(TestCase):
+    def setUp(self):
+        self.registry = ProviderRegistry()
+        self.registry.register('path', 'os.path:join')
+
+    def test_provider_is_imported_on_first_use(self):
+        self.assertFalse(self.registry.loaded('path'))
+        self.assertIs(self.registry.get('path'), os.path.join)
+        self.assertTrue(self.registry.loaded('path'))
+        self.assertIsNotNone(self.registry.stats()['path']['load_seconds'])
+
+    def test_proxy_forwards_attribute_access(self):
+        self.registry.register('environ', 'os:environ')
+        proxy = self.registry.proxy('environ')
+        self.assertFalse(self.registry.loaded('environ'))
+        self.assertEqual(proxy.get('PATH'), os.environ.get('PATH'))
+        self.assertTrue(self.registry.loaded('environ'))
+
+    def test_unknown_provider_raises(self):
+        with self.assertRaises(KeyError):
+            self.registry.get('missing')
+
+    def test_default_providers_are_registered(self):
+        self.assertEqual(set(providers.stats()), {'gemini', 'nvcf_async'})
+
+
+class TestLazyStartup(TestCase):
+    def test_importing_the_urls_loads_no_provider_clients(self):
+        output = subprocess.run(
+            [sys.executable, '-c', STARTUP_SNIPPET], cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        ).stdout
+        self.assertEqual(output.strip().splitlines()[-1], 'loaded:')
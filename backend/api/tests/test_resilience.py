@@ -0,0 +1,173 @@
+from unittest import TestCase, mock
+
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory
+
+from ..admission import gemini_limiter
+from ..cache import roadmap_cache
+from ..exceptions import UpstreamError
+from ..resilience import CircuitBreaker, CircuitOpenError, RetryBudget, budgeted_retry, gemini_breaker
+from ..views import WellbeingRoadmapView
+
+
+class TestCircuitBreaker(TestCase):
+    def setUp(self):
+        self.now = 100.0
+        patcher = mock.patch('api.resilience.time.monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker('Test', failure_threshold=3, reset_timeout=10)
+
+    def _fail(self):
+        with self.assertRaises(ValueError):
+            self.breaker.call(mock.Mock(side_effect=ValueError('down')))
+
+    def test_opens_after_consecutive_failures(self):
+        for _ in range(3):
+            self._fail()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+        func = mock.Mock()
+        self.now += 4
+        with self.assertRaises(CircuitOpenError) as ctx:
+            self.breaker.call(func)
+        func.assert_not_called()
+        self.assertEqual(ctx.exception.status_code, 503)
+        self.assertEqual(ctx.exception.retry_after, 6)
+
+    def test_client_errors_do_not_count_against_the_provider(self):
+        from google.api_core.exceptions import InvalidArgument, TooManyRequests
+
+        for error in [InvalidArgument('prompt too long'), UpstreamError('bad request', 500, upstream_status=400)] * 3:
+            with self.assertRaises(type(error)):
+                self.breaker.call(mock.Mock(side_effect=error))
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+        for _ in range(3):
+            with self.assertRaises(TooManyRequests):
+                self.breaker.call(mock.Mock(side_effect=TooManyRequests('slow down')))
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+    def test_success_resets_the_failure_count(self):
+        self._fail()
+        self._fail()
+        self.breaker.call(lambda: 'ok')
+        self._fail()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_lets_one_probe_through(self):
+        for _ in range(3):
+            self._fail()
+        self.now += 10
+
+        self.breaker.before_call()
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()
+        self.breaker.record_success()
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(self.breaker.call(lambda: 'ok'), 'ok')
+
+    def test_failed_probe_reopens(self):
+        for _ in range(3):
+            self._fail()
+        self.now += 10
+        self._fail()
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError) as ctx:
+            self.breaker.before_call()
+        self.assertEqual(ctx.exception.retry_after, 10)
+
+    def test_lost_probe_is_replaced_after_a_timeout(self):
+        for _ in range(3):
+            self._fail()
+        self.now += 10
+        self.breaker.before_call()
+
+        self.now += 10
+        self.breaker.before_call()
+
+
+@mock.patch('tenacity.nap.time.sleep')
+class TestBudgetedRetry(TestCase):
+    def test_retries_until_the_budget_runs_out(self, sleep):
+        budget = RetryBudget(ratio=0, cap=1)
+        func = mock.Mock(side_effect=ConnectionError('reset'))
+        with mock.patch('api.resilience.retry_budget', budget):
+            with self.assertRaises(ConnectionError):
+                budgeted_retry((ConnectionError,))(func)()
+
+        self.assertEqual(func.call_count, 2)
+        self.assertEqual(budget.stats(), {'retries': 1, 'denied': 1, 'tokens': 0.0})
+        self.assertLessEqual(max(call.args[0] for call in sleep.call_args_list), 2)
+
+    def test_open_circuit_is_not_retried(self, sleep):
+        func = mock.Mock(side_effect=CircuitOpenError('Gemini', 5))
+        with self.assertRaises(CircuitOpenError):
+            budgeted_retry((Exception,))(func)()
+        func.assert_called_once()
+
+    def test_last_attempt_does_not_spend_budget(self, sleep):
+        budget = RetryBudget(ratio=0, cap=5)
+        func = mock.Mock(side_effect=ConnectionError('reset'))
+        with mock.patch('api.resilience.retry_budget', budget):
+            with self.assertRaises(ConnectionError):
+                budgeted_retry((ConnectionError,), attempts=3)(func)()
+        self.assertEqual(func.call_count, 3)
+        self.assertEqual(budget.stats()['tokens'], 3.0)
+
+
+@mock.patch.dict('os.environ', {'GEMINI_API_KEY': 'key'})
+class TestRoadmapViewCircuit(TestCase):
+    def setUp(self):
+        roadmap_cache.clear()
+        gemini_breaker.reset()
+        self.addCleanup(gemini_breaker.reset)
+        # These prompts would otherwise be answered from the curated library
+        library = override_settings(ROADMAP_LIBRARY_ENABLED=False)
+        library.enable()
+        self.addCleanup(library.disable)
+
+    def test_open_circuit_returns_503_with_retry_after(self):
+        view = WellbeingRoadmapView.as_view()
+        factory = APIRequestFactory()
+
+        def request():
+            return factory.post('/api/wellbeing/roadmap/', {'prompt': 'stress'}, format='json')
+
+        with mock.patch('api.providers.GeminiRoadmapProvider.model', new_callable=mock.PropertyMock) as model:
+            model.return_value._client.generate_content.side_effect = RuntimeError('unavailable')
+            for _ in range(gemini_breaker.failure_threshold):
+                self.assertEqual(view(request()).status_code, 500)
+            response = view(request())
+
+        self.assertEqual(response.status_code, 503)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+        self.assertEqual(model.return_value._client.generate_content.call_count, gemini_breaker.failure_threshold)
+
+    @mock.patch('requests.Session.request')
+    def test_open_circuit_fails_a_streamed_request_before_it_starts(self, request):
+        for _ in range(gemini_breaker.failure_threshold):
+            gemini_breaker.record_failure()
+
+        response = WellbeingRoadmapView.as_view()(APIRequestFactory().post(
+            '/api/wellbeing/roadmap/', {'prompt': 'stress', 'stream': True}, format='json'
+        ))
+
+        self.assertEqual(response.status_code, 503)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+        request.assert_not_called()
+
+    @mock.patch('requests.Session.request')
+    def test_upstream_error_status_fails_a_streamed_request_before_it_starts(self, request):
+        request.return_value = mock.Mock(status_code=502, text='bad gateway')
+
+        response = WellbeingRoadmapView.as_view()(APIRequestFactory().post(
+            '/api/wellbeing/roadmap/', {'prompt': 'stress', 'stream': True}, format='json'
+        ))
+
+        self.assertEqual(response.status_code, 500)
+        self.assertFalse(response.streaming)
+        request.return_value.close.assert_called_once()
+        self.assertEqual(gemini_limiter.stats()['in_flight'], 0)
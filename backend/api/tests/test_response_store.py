@@ -0,0 +1,133 @@
+import json
+import os
+import tempfile
+from unittest import TestCase, mock
+
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIRequestFactory
+
+from ..cache import roadmap_cache
+from ..response_store import ResponseStore, chat_store_key, response_store, roadmap_store_key, store_key
+from ..views import MentalHealthManagementView, WellbeingRoadmapView
+from .test_roadmap import ROADMAP
+
+
+class TestStoreKeys(TestCase):
+    def test_keys_cover_provider_model_prompt_and_config(self):
+        key = store_key('gemini', 'model', 'prompt', {'temperature': 0.1})
+        self.assertEqual(key, store_key('gemini', 'model', 'prompt', {'temperature': 0.1}))
+        self.assertNotEqual(key, store_key('nvcf', 'model', 'prompt', {'temperature': 0.1}))
+        self.assertNotEqual(key, store_key('gemini', 'other', 'prompt', {'temperature': 0.1}))
+        self.assertNotEqual(key, store_key('gemini', 'model', 'other prompt', {'temperature': 0.1}))
+        self.assertNotEqual(key, store_key('gemini', 'model', 'prompt', {'temperature': 0.7}))
+
+    def test_equivalent_prompts_share_a_key(self):
+        self.assertEqual(roadmap_store_key('Anxiety and sleep!'), roadmap_store_key('anxiety and  sleep'))
+        with override_settings(RESPONSE_STORE_CHAT_ENABLED=True):
+            self.assertEqual(chat_store_key('m', 'Hi there'), chat_store_key('m', 'hi there.'))
+            self.assertNotEqual(chat_store_key('m', 'hi'), chat_store_key('n', 'hi'))
+        with override_settings(RESPONSE_STORE_CHAT_ENABLED=False):
+            self.assertIsNone(chat_store_key('m', 'hi'))
+
+
+class TestResponseStore(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'responses.sqlite3')
+
+    def test_entries_survive_a_new_store_on_the_same_file(self):
+        ResponseStore(self.path, max_entries=10, ttl=60).set('a', {'roadmap': ROADMAP}, 'gemini', 'model')
+
+        store = ResponseStore(self.path, max_entries=10, ttl=60)
+        self.assertEqual(store.get('a'), {'roadmap': ROADMAP})
+        self.assertIsNone(store.get('b'))
+        stats = store.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_entries_expire(self):
+        store = ResponseStore(self.path, max_entries=10, ttl=10)
+        with mock.patch('api.response_store.time.time', return_value=1000):
+            store.set('a', 1, 'gemini', 'model')
+        with mock.patch('api.response_store.time.time', return_value=1009):
+            self.assertEqual(store.get('a'), 1)
+        with mock.patch('api.response_store.time.time', return_value=1010):
+            self.assertIsNone(store.get('a'))
+        self.assertEqual(store.stats()['expirations'], 1)
+        self.assertEqual(len(store), 0)
+
+    def test_least_recently_read_entries_are_evicted(self):
+        store = ResponseStore(self.path, max_entries=2, ttl=3600)
+        with mock.patch('api.response_store.time.time', return_value=1000):
+            store.set('a', 1, 'gemini', 'model')
+        with mock.patch('api.response_store.time.time', return_value=1001):
+            store.set('b', 2, 'gemini', 'model')
+        with mock.patch('api.response_store.time.time', return_value=1100):
+            store.get('a')
+            store.set('c', 3, 'gemini', 'model')
+
+            self.assertEqual(store.get('a'), 1)
+            self.assertIsNone(store.get('b'))
+            self.assertEqual(store.get('c'), 3)
+        self.assertEqual(store.stats()['evictions'], 1)
+
+    def test_empty_path_disables_the_store(self):
+        store = ResponseStore('', max_entries=10, ttl=60)
+        store.set('a', 1, 'gemini', 'model')
+        self.assertIsNone(store.get('a'))
+        self.assertEqual(len(store), 0)
+
+    def test_unusable_file_counts_as_a_miss(self):
+        store = ResponseStore(os.path.join(self.path, 'missing', 'responses.sqlite3'), max_entries=10, ttl=60)
+        store.set('a', 1, 'gemini', 'model')
+        self.assertIsNone(store.get('a'))
+        self.assertEqual(store.stats()['errors'], 2)
+
+
+@mock.patch.dict('os.environ', {'AI_API_KEY': 'key', 'GEMINI_API_KEY': 'key'})
+class TestViewsUseResponseStore(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        store = override_settings(
+            RESPONSE_STORE_PATH=os.path.join(directory.name, 'responses.sqlite3'),
+            RESPONSE_STORE_CHAT_ENABLED=True,
+            ROADMAP_LIBRARY_ENABLED=False,
+        )
+        store.enable()
+        self.addCleanup(store.disable)
+        roadmap_cache.clear()
+        self.addCleanup(roadmap_cache.clear)
+        self.factory = APIRequestFactory()
+
+    def test_roadmap_is_served_from_the_store_after_a_restart(self):
+        view = WellbeingRoadmapView.as_view()
+        generated = mock.Mock(text=json.dumps(ROADMAP), spec=['text'])
+        with mock.patch.object(WellbeingRoadmapView, 'generate_roadmap', return_value=generated) as generate:
+            first = view(self.factory.post('/api/wellbeing/roadmap/', {'prompt': 'exam nerves'}, format='json'))
+            # A new worker starts with an empty in-process cache
+            roadmap_cache.clear()
+            second = view(self.factory.post('/api/wellbeing/roadmap/', {'prompt': 'Exam nerves!'}, format='json'))
+
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'STORED')
+        self.assertEqual(second.data['roadmap'], ROADMAP)
+        self.assertEqual(len(response_store), 1)
+
+    @mock.patch('api.views.function_catalog')
+    @mock.patch('requests.Session.request')
+    def test_chat_completion_is_served_from_the_store(self, request, catalog):
+        catalog.get.return_value = [{'name': 'ai-chat', 'function_id': 'fn', 'version_id': 'v1', 'model_name': 'chat'}]
+        request.return_value = mock.Mock(status_code=200, json=lambda: {
+            'model': 'chat', 'choices': [{'message': {'content': 'Take a breath.'}}], 'usage': {},
+        })
+        view = MentalHealthManagementView.as_view()
+
+        responses = [
+            view(self.factory.post('/api/mental-health-support/', {'prompt': 'hello'}, format='json'))
+            for _ in range(2)
+        ]
+
+        self.assertEqual(request.call_count, 1)
+        self.assertEqual([r.data['generated_text'] for r in responses], ['Take a breath.'] * 2)
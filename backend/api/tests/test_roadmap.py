@@ -0,0 +1,113 @@
+import json
+from unittest import TestCase
+
+from ..roadmap import RoadmapError, RoadmapStreamParser, extract_json_object, parse_roadmap
+
+ROADMAP = {
+    'title': 'Sleep Plan',
+    'description': 'Better sleep',
+    'timeline': '4 weeks',
+    'steps': [
+        {
+            'step': 1,
+            'title': 'Routine',
+            'description': 'Build a routine',
+            'actions': ['Fixed bedtime', 'No screens'],
+            'resources': ['Sleep app', 'Journal'],
+        }
+    ],
+    'tips': ['Be consistent', 'Wind down'],
+    'milestones': ['Routine set', 'Better rest'],
+}
+
+
+class TestParseRoadmap(TestCase):
+    def test_plain_json(self):
+        self.assertEqual(parse_roadmap(json.dumps(ROADMAP)), ROADMAP)
+
+    def test_fenced_json_with_trailing_comma(self):
+        content = 'Here you go:\n```json\n' + json.dumps(ROADMAP)[:-1] + ',}\n```\nEnjoy!'
+        self.assertEqual(parse_roadmap(content), ROADMAP)
+
+    def test_missing_field(self):
+        data = dict(ROADMAP)
+        del data['milestones']
+        with self.assertRaises(RoadmapError) as ctx:
+            parse_roadmap(json.dumps(data))
+        self.assertIn('milestones', ctx.exception.message)
+
+    def test_missing_step_field(self):
+        data = dict(ROADMAP, steps=[{'step': 1, 'title': 'Only a title'}])
+        with self.assertRaises(RoadmapError) as ctx:
+            parse_roadmap(json.dumps(data))
+        self.assertIn('Step 1', ctx.exception.message)
+
+    def test_not_json(self):
+        with self.assertRaises(RoadmapError):
+            parse_roadmap('I cannot help with that.')
+
+
+class TestExtractJsonObject(TestCase):
+    def test_ignores_text_after_the_object(self):
+        self.assertEqual(extract_json_object('{"a": 1}\n```\nHope this helps {really}!'), {'a': 1})
+
+    def test_single_quotes_and_apostrophes(self):
+        content = "{'title': 'Don't panic', 'tips': ['It's fine', 'Breathe']}"
+        self.assertEqual(extract_json_object(content), {'title': "Don't panic", 'tips': ["It's fine", 'Breathe']})
+
+    def test_apostrophes_in_double_quoted_strings_survive(self):
+        content = '{"title": "You\'re not alone", "tips": ["Don\'t skip meals",],}'
+        self.assertEqual(extract_json_object(content), {'title': "You're not alone", 'tips': ["Don't skip meals"]})
+
+    def test_stray_quotes_and_raw_newlines(self):
+        content = '{"description": "Try the "4-7-8" method\nnightly", "steps": []}'
+        self.assertEqual(
+            extract_json_object(content),
+            {'description': 'Try the "4-7-8" method\nnightly', 'steps': []}
+        )
+
+    def test_truncated_output(self):
+        with self.assertRaises(RoadmapError) as ctx:
+            extract_json_object('{"title": "Plan", "steps": [{"step": 1')
+        self.assertIn('cut off', ctx.exception.message)
+
+    def test_non_object_steps_are_rejected(self):
+        data = dict(ROADMAP, steps=['just a string'])
+        with self.assertRaises(RoadmapError):
+            parse_roadmap(json.dumps(data))
+
+
+class TestRoadmapStreamParser(TestCase):
+    def _feed(self, text, size):
+        parser = RoadmapStreamParser()
+        events = []
+        for i in range(0, len(text), size):
+            events.append(parser.feed(text[i:i + size]))
+        return parser, events
+
+    def test_header_then_each_step_as_it_closes(self):
+        second = dict(ROADMAP['steps'][0], step=2, title='Wind down')
+        roadmap = dict(ROADMAP, steps=[ROADMAP['steps'][0], second])
+        text = 'Here is your plan:\n```json\n' + json.dumps(roadmap, indent=2) + '\n```'
+        parser, events = self._feed(text, 7)
+
+        flat = [event for chunk in events for event in chunk]
+        self.assertEqual(flat, [
+            ('roadmap', {'title': 'Sleep Plan', 'description': 'Better sleep', 'timeline': '4 weeks'}),
+            ('step', ROADMAP['steps'][0]),
+            ('step', second),
+        ])
+        # The first step is reported by the chunk that closes it, long before the text ends
+        first_step_chunk = next(i for i, chunk in enumerate(events) if ('step', ROADMAP['steps'][0]) in chunk)
+        self.assertLess(first_step_chunk, len(events) // 2)
+        self.assertEqual(parse_roadmap(parser.text), roadmap)
+
+    def test_header_is_sent_when_steps_start_even_if_incomplete(self):
+        parser, events = self._feed('{"title": "Plan", "steps": [', 100)
+        self.assertEqual(events, [[('roadmap', {'title': 'Plan', 'description': '', 'timeline': ''})]])
+
+    def test_braces_inside_strings_and_incomplete_steps_are_ignored(self):
+        text = '{"title": "A {curly} plan", "description": "d", "timeline": "t", "steps": [{"step": 1, "title": "x"}, '
+        parser, events = self._feed(text, 5)
+        flat = [event for chunk in events for event in chunk]
+        self.assertEqual(flat, [('roadmap', {'title': 'A {curly} plan', 'description': 'd', 'timeline': 't'})])
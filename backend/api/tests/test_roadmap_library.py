@@ -0,0 +1,97 @@
+import json
+from unittest import TestCase, mock
+
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIRequestFactory
+
+from ..cache import roadmap_cache
+from ..roadmap import RoadmapError
+from ..roadmap_library import LIBRARY_MODEL_NAME, RoadmapLibrary, roadmap_library
+from ..views import WellbeingRoadmapView
+from .test_roadmap import ROADMAP
+
+TEMPLATES = [
+    {'id': 'sleep', 'keywords': {'sleep': 3, 'insomnia': 3, 'fall asleep': 3, 'tired': 1}, 'roadmap': ROADMAP},
+    {'id': 'anxiety', 'keywords': {'anxiety': 3, 'anxious': 3, 'racing thought': 2}, 'roadmap': ROADMAP},
+]
+
+
+class TestRoadmapLibrary(TestCase):
+    def setUp(self):
+        self.library = RoadmapLibrary(TEMPLATES, min_confidence=0.6)
+
+    def test_matches_prompts_about_one_theme(self):
+        for prompt, template_id in [
+            ('Help me manage my insomnia', 'sleep'),
+            ("I can't fall asleep and I'm always tired", 'sleep'),
+            ('How do I cope with racing thoughts?', 'anxiety'),
+        ]:
+            match = self.library.match(prompt)
+            self.assertIsNotNone(match, prompt)
+            self.assertEqual(match.template_id, template_id)
+            self.assertEqual(match.roadmap, ROADMAP)
+
+    def test_mixed_or_specific_prompts_fall_through(self):
+        for prompt in ['anxiety and sleep issues', 'anxious about my divorce', 'help me', 'I want to end my life, anxiety']:
+            self.assertIsNone(self.library.match(prompt), prompt)
+
+    def test_stats_report_the_share_of_prompts_absorbed(self):
+        self.library.match('insomnia')
+        self.library.match('insomnia again')
+        self.library.match('my divorce')
+        self.library.match('anxiety')
+
+        stats = self.library.stats()
+        self.assertEqual(stats['lookups'], 4)
+        self.assertEqual(stats['matched'], 3)
+        self.assertEqual(stats['templates'], {'sleep': 2, 'anxiety': 1})
+        self.assertEqual(stats['absorbed_rate'], 0.75)
+
+    def test_matches_return_copies(self):
+        self.library.match('insomnia').roadmap['steps'].clear()
+        self.assertEqual(self.library.match('insomnia').roadmap, ROADMAP)
+
+    def test_invalid_templates_are_rejected(self):
+        broken = [{'id': 'sleep', 'keywords': {'sleep': 1}, 'roadmap': {'title': 'Sleep'}}]
+        with self.assertRaises(RoadmapError):
+            RoadmapLibrary(broken)
+
+    def test_curated_library_loads(self):
+        self.assertGreaterEqual(len(roadmap_library), 4)
+
+
+@mock.patch.dict('os.environ', {'GEMINI_API_KEY': 'key'})
+class TestRoadmapViewLibrary(SimpleTestCase):
+    def setUp(self):
+        roadmap_cache.clear()
+        self.addCleanup(roadmap_cache.clear)
+        self.factory = APIRequestFactory()
+        self.view = WellbeingRoadmapView.as_view()
+
+    def _post(self, body):
+        return self.view(self.factory.post('/api/wellbeing/roadmap/', body, format='json'))
+
+    @override_settings(ROADMAP_LIBRARY_ENABLED=True)
+    def test_confident_match_skips_gemini(self):
+        with mock.patch.object(WellbeingRoadmapView, 'generate_roadmap') as generate:
+            response = self._post({'prompt': 'I have insomnia'})
+            streamed = self._post({'prompt': 'I have insomnia', 'stream': True})
+            events = [frame.decode().split('\n')[0] for frame in streamed.streaming_content]
+
+        generate.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Cache'], 'LIBRARY')
+        self.assertEqual(response.data['model'], LIBRARY_MODEL_NAME)
+        self.assertEqual(response.data['roadmap']['title'], 'Better Sleep Plan')
+        self.assertEqual(events[0], 'event: roadmap')
+        self.assertEqual(events[-1], 'event: done')
+
+    @override_settings(ROADMAP_LIBRARY_ENABLED=False)
+    def test_disabled_library_is_not_consulted(self):
+        generated = mock.Mock(text=json.dumps(ROADMAP), spec=['text'])
+        with mock.patch.object(WellbeingRoadmapView, 'generate_roadmap', return_value=generated) as generate:
+            response = self._post({'prompt': 'I have insomnia'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['roadmap'], ROADMAP)
+        generate.assert_called_once()
@@ -0,0 +1,64 @@
+from unittest import TestCase, mock
+
+from ..router import ModelRouter
+
+FUNCTIONS = [
+    {'name': 'ai-chat-a', 'function_id': 'a', 'version_id': 'v', 'model_name': 'a'},
+    {'name': 'ai-chat-b', 'function_id': 'b', 'version_id': 'v', 'model_name': 'b'},
+    {'name': 'ai-chat-c', 'function_id': 'c', 'version_id': 'v', 'model_name': 'c'},
+]
+
+
+class TestModelRouter(TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('api.router.time.monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.router = ModelRouter(alpha=0.5, max_error_rate=0.5, probe_interval=30)
+
+    def _call(self, latencies, failing=()):
+        function = self.router.choose(FUNCTIONS)
+        function_id = function['function_id']
+        self.router.record(function_id, latencies[function_id], ok=function_id not in failing)
+        return function_id
+
+    def test_first_choice_is_catalog_order(self):
+        self.assertEqual(self.router.choose(FUNCTIONS)['function_id'], 'a')
+
+    def test_tries_each_function_then_prefers_the_fastest(self):
+        latencies = {'a': 3.0, 'b': 0.5, 'c': 1.0}
+        chosen = [self._call(latencies) for _ in range(6)]
+        self.assertEqual(chosen, ['a', 'b', 'c', 'b', 'b', 'b'])
+
+    def test_failing_function_loses_traffic(self):
+        latencies = {'a': 0.5, 'b': 1.0, 'c': 2.0}
+        for _ in range(3):
+            self._call(latencies)
+        self.assertEqual(self._call(latencies, failing={'a'}), 'a')
+
+        self.assertEqual([self._call(latencies) for _ in range(3)], ['b', 'b', 'b'])
+        self.assertFalse(self.router.stats()['functions']['a']['healthy'])
+
+    def test_idle_functions_are_probed_after_the_interval(self):
+        latencies = {'a': 2.0, 'b': 0.5, 'c': 1.0}
+        for _ in range(3):
+            self._call(latencies)
+        self.assertEqual(self._call(latencies), 'b')
+
+        self.now += 31
+        # Least recently tried first, one probe each, then back to the fastest
+        self.assertEqual([self._call(latencies) for _ in range(3)], ['a', 'c', 'b'])
+        self.assertEqual(self.router.stats()['probes'], 2)
+
+    def test_recovered_function_wins_traffic_back(self):
+        latencies = {'a': 0.5, 'b': 1.0, 'c': 2.0}
+        for _ in range(3):
+            self._call(latencies)
+        self._call(latencies, failing={'a'})
+        self.assertEqual(self._call(latencies), 'b')
+
+        self.now += 31
+        # a's probe succeeds and makes it the fastest healthy function again
+        self.assertEqual([self._call(latencies) for _ in range(3)], ['a', 'b', 'c'])
+        self.assertEqual(self._call(latencies), 'a')
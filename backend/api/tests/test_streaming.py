@@ -0,0 +1,107 @@
+import json
+from unittest import TestCase, mock
+
+from ..deadlines import Deadline
+from ..streaming import iter_chat_chunks, roadmap_events, sse_event, stream_chat_completion, stream_roadmap
+from .test_roadmap import ROADMAP
+
+
+def _upstream(lines):
+    response = mock.Mock()
+    response.iter_lines.return_value = iter(lines)
+    return response
+
+
+def _frames(events):
+    frames = []
+    for raw in events:
+        event, data = 'message', None
+        for line in raw.strip().split('\n'):
+            if line.startswith('event: '):
+                event = line[len('event: '):]
+            elif line.startswith('data: '):
+                data = json.loads(line[len('data: '):])
+        frames.append((event, data))
+    return frames
+
+
+class TestStreaming(TestCase):
+    def test_sse_event(self):
+        self.assertEqual(sse_event({'a': 1}), 'data: {"a": 1}\n\n')
+        self.assertEqual(sse_event({'a': 1}, event='done'), 'event: done\ndata: {"a": 1}\n\n')
+
+    def test_iter_chat_chunks_skips_noise(self):
+        upstream = _upstream([
+            ': keep-alive',
+            '',
+            'data: {"choices": []}',
+            'data: not-json',
+            'data: [DONE]',
+            'data: {"ignored": true}',
+        ])
+        self.assertEqual(list(iter_chat_chunks(upstream)), [{'choices': []}])
+
+    def test_stream_chat_completion_forwards_tokens(self):
+        upstream = _upstream([
+            'data: {"model": "m1", "choices": [{"delta": {"role": "assistant"}}]}',
+            'data: {"choices": [{"delta": {"content": "Hello"}}]}',
+            'data: {"choices": [{"delta": {"content": " there"}}], "usage": {"total_tokens": 7}}',
+            'data: [DONE]',
+        ])
+        frames = _frames(stream_chat_completion(upstream, 'fallback'))
+        self.assertEqual(frames, [
+            ('token', {'token': 'Hello'}),
+            ('token', {'token': ' there'}),
+            ('done', {'model': 'm1', 'usage': {'total_tokens': 7}}),
+        ])
+        upstream.close.assert_called_once()
+
+    def test_stream_chat_completion_reports_broken_stream(self):
+        def lines():
+            yield 'data: {"choices": [{"delta": {"content": "Hi"}}]}'
+            raise ConnectionError('reset')
+
+        upstream = mock.Mock()
+        upstream.iter_lines.return_value = lines()
+        frames = _frames(stream_chat_completion(upstream, 'm'))
+        self.assertEqual(frames[0], ('token', {'token': 'Hi'}))
+        self.assertEqual(frames[-1][0], 'error')
+        upstream.close.assert_called_once()
+
+
+class TestRoadmapStreaming(TestCase):
+    def test_frames_follow_the_generated_text(self):
+        text = json.dumps(ROADMAP)
+        completed = []
+        frames = _frames(stream_roadmap(
+            (text[i:i + 10] for i in range(0, len(text), 10)), 'gemini', on_complete=completed.append
+        ))
+
+        self.assertEqual([event for event, _ in frames], ['roadmap', 'step', 'done'])
+        self.assertEqual(frames[1][1], ROADMAP['steps'][0])
+        self.assertEqual(frames[2][1], {'roadmap': ROADMAP, 'model': 'gemini', 'usage': {}})
+        self.assertEqual(completed, [frames[2][1]])
+
+    def test_invalid_roadmap_ends_with_an_error_and_is_not_completed(self):
+        completed = []
+        frames = _frames(stream_roadmap(iter(['{"title": "Plan"}']), 'gemini', on_complete=completed.append))
+        self.assertEqual(frames[-1][0], 'error')
+        self.assertEqual(completed, [])
+
+    def test_upstream_failure_ends_with_an_error(self):
+        def chunks():
+            yield '{"title": "Plan", '
+            raise ConnectionError('reset')
+
+        frames = _frames(stream_roadmap(chunks(), 'gemini'))
+        self.assertEqual(frames[-1], ('error', {'error': 'The response stream was interrupted. Please try again.'}))
+
+    def test_expired_deadline_stops_the_stream(self):
+        frames = _frames(stream_roadmap(iter(['{"title": "Plan"']), 'gemini', deadline=Deadline(0)))
+        self.assertEqual(frames, [('error', {'error': 'The response took too long to complete. Please try again.'})])
+
+    def test_cached_roadmap_is_replayed_as_frames(self):
+        body = {'roadmap': ROADMAP, 'model': 'gemini', 'usage': {}}
+        frames = _frames(roadmap_events(body))
+        self.assertEqual([event for event, _ in frames], ['roadmap', 'step', 'done'])
+        self.assertEqual(frames[-1][1], body)
@@ -1,7 +1,14 @@
 from django.urls import path
-from .views import MentalHealthManagementView, WellbeingRoadmapView
+from django.views.decorators.csrf import csrf_exempt
+from .async_views import AsyncMentalHealthBatchView, AsyncMentalHealthManagementView, AsyncWellbeingRoadmapView
+from .views import MentalHealthBatchView, MentalHealthManagementView, WellbeingRoadmapView
 
 urlpatterns = [
     path('mental-health-support/', MentalHealthManagementView.as_view(), name='mental-health-support'),
+    path('mental-health-support/batch/', MentalHealthBatchView.as_view(), name='mental-health-support-batch'),
     path('wellbeing/roadmap/', WellbeingRoadmapView.as_view(), name='wellbeing-roadmap'),
-] 
\ No newline at end of file
+    # Async variants; these only free the worker while waiting when served over ASGI
+    path('async/mental-health-support/', csrf_exempt(AsyncMentalHealthManagementView.as_view()), name='async-mental-health-support'),
+    path('async/mental-health-support/batch/', csrf_exempt(AsyncMentalHealthBatchView.as_view()), name='async-mental-health-support-batch'),
+    path('async/wellbeing/roadmap/', csrf_exempt(AsyncWellbeingRoadmapView.as_view()), name='async-wellbeing-roadmap'),
+]
@@ -0,0 +1,133 @@
+"""
+Compare sync and async chat view throughput against a slow fake NVCF upstream.
+
+The sync view is driven from a fixed thread pool, standing in for a WSGI
+server with that many workers; the async view is driven from one event loop,
+as under ASGI. Run from the backend directory:
+
+    python benchmarks/async_throughput.py --requests 200 --workers 8 --latency 0.5
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+class FakeUpstream(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 resets connections under a burst of async requests
+    request_queue_size = 1024
+
+
+def make_handler(latency):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _send(self, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self._send({'functions': [
+                {'id': 'fn', 'versionId': 'v1', 'name': 'ai-mistral-nemo-12b-instruct', 'status': 'ACTIVE'},
+            ]})
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            time.sleep(latency)
+            self._send({
+                'model': 'mistralai/mistral-12b-instruct',
+                'choices': [{'message': {'content': 'You are doing great.'}}],
+                'usage': {'total_tokens': 42},
+            })
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def run_sync(total, workers):
+    from django.test import RequestFactory
+    from api.views import MentalHealthManagementView
+
+    view = MentalHealthManagementView.as_view()
+    factory = RequestFactory()
+
+    def call(_):
+        request = factory.post('/api/mental-health-support/', {'prompt': 'stress'}, content_type='application/json')
+        return view(request).status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        statuses = list(pool.map(call, range(total)))
+    return time.perf_counter() - started, statuses
+
+
+def run_async(total, concurrency):
+    from django.test import AsyncRequestFactory
+    from api.async_views import AsyncMentalHealthManagementView
+
+    view = AsyncMentalHealthManagementView.as_view()
+    factory = AsyncRequestFactory()
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def call():
+            async with semaphore:
+                request = factory.post('/api/async/mental-health-support/', {'prompt': 'stress'}, content_type='application/json')
+                return (await view(request)).status_code
+
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*(call() for _ in range(total)))
+        return time.perf_counter() - started, statuses
+
+    return asyncio.run(main())
+
+
+def report(label, elapsed, statuses):
+    ok = sum(1 for code in statuses if code == 200)
+    print(f"{label:<28} {len(statuses):>5} requests  {elapsed:7.2f}s  {len(statuses) / elapsed:8.1f} req/s  ({ok} ok)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=8, help='sync worker threads')
+    parser.add_argument('--concurrency', type=int, default=200, help='in-flight async requests')
+    parser.add_argument('--latency', type=float, default=0.5, help='fake upstream latency in seconds')
+    args = parser.parse_args()
+
+    server = FakeUpstream(('127.0.0.1', 0), make_handler(args.latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mindwell.settings')
+    os.environ['AI_API_KEY'] = 'benchmark'
+    os.environ['NVCF_API_BASE'] = f'http://127.0.0.1:{server.server_address[1]}'
+    os.environ['UPSTREAM_POOL_MAXSIZE'] = str(args.workers)
+
+    import django
+    django.setup()
+    logging.disable(logging.INFO)
+
+    report(f'sync ({args.workers} workers)', *run_sync(args.requests, args.workers))
+    report(f'async ({args.concurrency} in flight)', *run_async(args.requests, args.concurrency))
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
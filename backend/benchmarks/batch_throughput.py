@@ -0,0 +1,84 @@
+"""
+Compare one prompt per request with the batch endpoint against a slow fake NVCF upstream.
+
+Both runs send the same prompts through the synchronous views: the first
+posts them one at a time to /api/mental-health-support/, the second in
+batches to /api/mental-health-support/batch/. Run from the backend directory:
+
+    python benchmarks/batch_throughput.py --prompts 40 --batch-size 20 --latency 0.5
+"""
+import argparse
+import logging
+import os
+import threading
+import time
+
+# Also puts the backend directory on sys.path
+from async_throughput import FakeUpstream, make_handler
+
+
+def run_single(total):
+    from django.test import RequestFactory
+    from api.views import MentalHealthManagementView
+
+    view = MentalHealthManagementView.as_view()
+    factory = RequestFactory()
+
+    started = time.perf_counter()
+    ok = 0
+    for _ in range(total):
+        request = factory.post('/api/mental-health-support/', {'prompt': 'stress'}, content_type='application/json')
+        ok += view(request).status_code == 200
+    return time.perf_counter() - started, ok
+
+
+def run_batch(total, batch_size):
+    from rest_framework.test import APIRequestFactory
+    from api.views import MentalHealthBatchView
+
+    view = MentalHealthBatchView.as_view()
+    factory = APIRequestFactory()
+
+    started = time.perf_counter()
+    ok = 0
+    for offset in range(0, total, batch_size):
+        prompts = ['stress'] * min(batch_size, total - offset)
+        request = factory.post('/api/mental-health-support/batch/', {'prompts': prompts}, format='json')
+        results = view(request).data['results']
+        ok += sum(1 for item in results if 'error' not in item)
+    return time.perf_counter() - started, ok
+
+
+def report(label, total, elapsed, ok):
+    print(f"{label:<32} {total:>5} prompts  {elapsed:7.2f}s  {total / elapsed:8.1f} prompts/s  ({ok} ok)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--prompts', type=int, default=40)
+    parser.add_argument('--batch-size', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=8, help='BATCH_MAX_CONCURRENCY')
+    parser.add_argument('--latency', type=float, default=0.5, help='fake upstream latency in seconds')
+    args = parser.parse_args()
+
+    server = FakeUpstream(('127.0.0.1', 0), make_handler(args.latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mindwell.settings')
+    os.environ['AI_API_KEY'] = 'benchmark'
+    os.environ['NVCF_API_BASE'] = f'http://127.0.0.1:{server.server_address[1]}'
+    os.environ['BATCH_MAX_PROMPTS'] = str(args.batch_size)
+    os.environ['BATCH_MAX_CONCURRENCY'] = str(args.concurrency)
+    os.environ['UPSTREAM_POOL_MAXSIZE'] = str(args.concurrency)
+
+    import django
+    django.setup()
+    logging.disable(logging.INFO)
+
+    report('one prompt per request', args.prompts, *run_single(args.prompts))
+    report(f'batches of {args.batch_size} ({args.concurrency} in flight)', args.prompts, *run_batch(args.prompts, args.batch_size))
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
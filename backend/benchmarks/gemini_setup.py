@@ -0,0 +1,92 @@
+"""
+Measure what the shared Gemini provider saves per request and at import time.
+
+Per request, the old path constructed a ``GenerativeModel`` and rebuilt the
+system prompt before every call; the provider reuses one model and the
+module-level prompt. At import time, ``api.views`` no longer imports and
+configures ``google.generativeai``.
+No network calls are made. Run from the backend directory:
+
+    python benchmarks/gemini_setup.py --iterations 2000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import timeit
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+IMPORT_SNIPPET = """
+import os, time
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mindwell.settings')
+import logging; logging.disable(logging.CRITICAL)
+import django; django.setup()
+started = time.perf_counter()
+import {module}
+print(time.perf_counter() - started)
+"""
+
+
+def import_seconds(module, runs=5):
+    """Best-of-N wall time to import ``module`` in a fresh interpreter after Django setup."""
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', IMPORT_SNIPPET.format(module=module)],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mindwell.settings')
+    os.environ.setdefault('GEMINI_API_KEY', 'benchmark')
+    import logging
+    logging.disable(logging.CRITICAL)
+    import django
+    django.setup()
+
+    import google.generativeai as genai
+    from api.prompts import (
+        ROADMAP_GENERATION_CONFIG,
+        ROADMAP_MODEL_NAME,
+        build_roadmap_contents,
+    )
+    from api.providers import GeminiRoadmapProvider
+
+    prompt = 'anxiety and sleep issues'
+    provider = GeminiRoadmapProvider()
+    provider.model
+
+    def construct_model():
+        return genai.GenerativeModel(ROADMAP_MODEL_NAME, generation_config=ROADMAP_GENERATION_CONFIG)
+
+    def shared_model():
+        return provider.model
+
+    def build_request():
+        return provider.model._prepare_request(contents=build_roadmap_contents(prompt))
+
+    def timed(func):
+        return min(timeit.repeat(func, number=args.iterations, repeat=5)) / args.iterations
+
+    constructed, shared, request = timed(construct_model), timed(shared_model), timed(build_request)
+    print(f"GenerativeModel per request:          {constructed * 1e6:8.2f} us")
+    print(f"shared provider model:                {shared * 1e6:8.2f} us  (saves {(constructed - shared) * 1e6:.2f} us/request)")
+    print(f"request build (paid either way):      {request * 1e6:8.2f} us")
+
+    genai_import = import_seconds('google.generativeai')
+    views_import = import_seconds('api.views')
+    print(f"import google.generativeai:           {genai_import * 1e3:8.1f} ms  (no longer paid at startup)")
+    print(f"import api.views:                     {views_import * 1e3:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Load-test the chat and roadmap views against the local mock LLM server.
+
+Starts benchmarks/mock_llm.py in-process, points NVCF_API_BASE and
+GEMINI_API_ENDPOINT at it, and drives MentalHealthManagementView and
+WellbeingRoadmapView from a thread pool at each concurrency level, standing
+in for a WSGI server with that many workers. Reports throughput, latency
+percentiles and status codes per view and level. Run from the backend
+directory:
+
+    python benchmarks/load_test.py --concurrency 1,8,32 --requests 200 --error-rate 0.02
+
+Roadmap prompts are all distinct, so the cache and request coalescing do
+not hide upstream latency; circuit breakers and the router are reset
+before every level.
+"""
+import argparse
+import logging
+import math
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from mock_llm import MockLLMServer, add_behaviour_arguments, behaviour_from_args
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+VIEWS = {
+    'chat': ('api.views', 'MentalHealthManagementView', '/api/mental-health-support/'),
+    'roadmap': ('api.views', 'WellbeingRoadmapView', '/api/wellbeing/roadmap/'),
+}
+
+
+def percentile(ordered, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return math.nan
+    return ordered[max(0, math.ceil(len(ordered) * p / 100) - 1)]
+
+
+def reset_state():
+    from api.cache import roadmap_cache
+    from api.resilience import gemini_breaker, nvcf_breaker
+    from api.router import model_router
+
+    roadmap_cache.clear()
+    gemini_breaker.reset()
+    nvcf_breaker.reset()
+    model_router.reset()
+
+
+def run_level(name, concurrency, total):
+    """Send ``total`` requests to one view with ``concurrency`` in flight; returns (elapsed, latencies, statuses)."""
+    import importlib
+    from rest_framework.test import APIRequestFactory
+
+    module, class_name, path = VIEWS[name]
+    view = getattr(importlib.import_module(module), class_name).as_view()
+    factory = APIRequestFactory()
+
+    def call(i):
+        request = factory.post(path, {'prompt': f'I feel stressed about work, week {i}'}, format='json')
+        started = time.perf_counter()
+        status = view(request).status_code
+        return time.perf_counter() - started, status
+
+    reset_state()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(call, range(total)))
+    elapsed = time.perf_counter() - started
+    return elapsed, sorted(latency for latency, _ in results), Counter(status for _, status in results)
+
+
+def report(name, concurrency, elapsed, latencies, statuses):
+    ok = statuses.get(200, 0)
+    others = ' '.join(f'{code}x{count}' for code, count in sorted(statuses.items()) if code != 200)
+    print(
+        f"{name:<8} {concurrency:>5} {len(latencies):>7} {ok:>6} {len(latencies) / elapsed:8.1f}"
+        f" {percentile(latencies, 50) * 1000:8.0f} {percentile(latencies, 95) * 1000:8.0f}"
+        f" {percentile(latencies, 99) * 1000:8.0f}  {others}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--views', default='chat,roadmap', help='comma-separated: chat, roadmap')
+    parser.add_argument('--concurrency', default='1,8,32', help='comma-separated in-flight request counts')
+    parser.add_argument('--requests', type=int, default=200, help='requests per view and level')
+    add_behaviour_arguments(parser)
+    args = parser.parse_args()
+
+    views = [name.strip() for name in args.views.split(',') if name.strip()]
+    unknown = [name for name in views if name not in VIEWS]
+    if unknown:
+        parser.error(f'Unknown views: {", ".join(unknown)}')
+    levels = [int(level) for level in args.concurrency.split(',')]
+
+    server = MockLLMServer(behaviour_from_args(parser, args)).start()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mindwell.settings')
+    os.environ['AI_API_KEY'] = 'mock'
+    os.environ['GEMINI_API_KEY'] = 'mock'
+    os.environ['NVCF_API_BASE'] = server.url
+    os.environ['GEMINI_API_ENDPOINT'] = server.url
+    os.environ['UPSTREAM_POOL_MAXSIZE'] = str(max(levels))
+
+    import django
+    django.setup()
+    logging.disable(logging.CRITICAL)
+
+    print(f"{'view':<8} {'conc':>5} {'reqs':>7} {'ok':>6} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  other statuses")
+    for name in views:
+        for concurrency in levels:
+            report(name, concurrency, *run_level(name, concurrency, args.requests))
+    print(f"upstream calls: {server.behaviour.stats()}")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,292 @@
+"""
+Local stand-in for the NVCF and Gemini APIs used by the mindwell views.
+
+Serves the NVCF ``GET /functions`` catalog, ``POST /pexec/functions/<id>/versions/<v>``
+chat completions and Gemini's ``POST /v1beta/models/<model>:generateContent``
+and ``:streamGenerateContent?alt=sse``, with configurable latency, error rate and malformed output. Roadmaps are
+taken from the recorded outputs in fixtures/roadmap_outputs.json.
+
+Latency specs are ``fixed:S``, ``uniform:LOW,HIGH`` or ``lognormal:MEDIAN,SIGMA``
+in seconds. Run it on its own and point a dev server at it:
+
+    python benchmarks/mock_llm.py --port 8099 --chat-latency lognormal:0.8,0.4 --error-rate 0.02
+    NVCF_API_BASE=http://127.0.0.1:8099 GEMINI_API_ENDPOINT=http://127.0.0.1:8099 \\
+        AI_API_KEY=mock GEMINI_API_KEY=mock python manage.py runserver
+
+or use it from benchmarks/load_test.py, which starts one itself.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'roadmap_outputs.json')
+
+FUNCTIONS = [
+    {'id': 'mock-mistral', 'versionId': 'v1', 'name': 'ai-mistral-nemo-12b-instruct', 'status': 'ACTIVE'},
+    {'id': 'mock-llama', 'versionId': 'v1', 'name': 'ai-llama-3_1-8b-chat', 'status': 'ACTIVE'},
+    {'id': 'mock-embed', 'versionId': 'v1', 'name': 'ai-embed-qa-4', 'status': 'ACTIVE'},
+]
+
+CHAT_REPLY = (
+    "It sounds like you have a lot on your plate right now, and it makes sense to feel stretched. "
+    "Try picking one small thing to finish today, and take a few slow breaths before you start."
+)
+
+PEXEC_PATH = re.compile(r'^/pexec/functions/([^/]+)/versions/([^/]+)$')
+GEMINI_PATH = re.compile(r'^/v1beta/models/([^/:]+):generateContent$')
+GEMINI_STREAM_PATH = re.compile(r'^/v1beta/models/([^/:]+):streamGenerateContent$')
+
+# Characters per streamed Gemini chunk, and the share of the latency spent before the first one
+STREAM_CHUNK_SIZE = 64
+STREAM_FIRST_CHUNK_SHARE = 0.1
+
+
+def parse_latency(spec):
+    """Turn a latency spec into a function returning one delay in seconds."""
+    kind, _, args = spec.partition(':')
+    try:
+        values = [float(value) for value in args.split(',')] if args else []
+        if kind == 'fixed' and len(values) == 1:
+            return lambda rng: values[0]
+        if kind == 'uniform' and len(values) == 2:
+            return lambda rng: rng.uniform(values[0], values[1])
+        if kind == 'lognormal' and len(values) == 2:
+            mu = math.log(values[0])
+            return lambda rng: rng.lognormvariate(mu, values[1])
+    except ValueError:
+        pass
+    raise ValueError(f'Invalid latency spec: {spec}')
+
+
+def truncate(text, rng):
+    """Cut a model output short, the way a response that hit its token limit looks."""
+    return text[:rng.randint(len(text) // 4, len(text) * 3 // 4)]
+
+
+class MockBehaviour:
+    """
+    How the stand-in answers: per-endpoint latency plus the share of calls
+    that fail with a 5xx/429 or return an unusable body. Shared by every
+    handler thread; the random generator is guarded by a lock.
+    """
+
+    def __init__(self, chat_latency='fixed:0.5', roadmap_latency='fixed:2', catalog_latency='fixed:0.05',
+                 error_rate=0.0, malformed_rate=0.0, seed=None):
+        self.chat_latency = parse_latency(chat_latency)
+        self.roadmap_latency = parse_latency(roadmap_latency)
+        self.catalog_latency = parse_latency(catalog_latency)
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        with open(FIXTURES) as f:
+            self.roadmaps = [fixture['output'] for fixture in json.load(f)]
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._counters = {'catalog': 0, 'chat': 0, 'roadmap': 0, 'errors': 0, 'malformed': 0}
+
+    def _draw(self, latency):
+        """Pick this call's delay and outcome: 'ok', 'error' or 'malformed'."""
+        with self._lock:
+            delay = max(0.0, latency(self._rng))
+            roll = self._rng.random()
+            if roll < self.error_rate:
+                outcome = 'error'
+            elif roll < self.error_rate + self.malformed_rate:
+                outcome = 'malformed'
+            else:
+                outcome = 'ok'
+            choice = self._rng.random()
+        return delay, outcome, choice
+
+    def _count(self, *names):
+        with self._lock:
+            for name in names:
+                self._counters[name] += 1
+
+    def catalog(self):
+        delay, _, _ = self._draw(self.catalog_latency)
+        self._count('catalog')
+        return delay, 200, {'functions': FUNCTIONS}
+
+    def chat(self, model):
+        delay, outcome, choice = self._draw(self.chat_latency)
+        self._count('chat')
+        if outcome == 'error':
+            self._count('errors')
+            return delay, 429 if choice < 0.3 else 503, {'detail': 'mock upstream error'}
+        if outcome == 'malformed':
+            self._count('malformed')
+            return delay, 200, {'model': model, 'choices': [], 'usage': {}}
+        words = len(CHAT_REPLY.split())
+        return delay, 200, {
+            'model': model,
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': CHAT_REPLY}, 'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': 480, 'completion_tokens': words, 'total_tokens': 480 + words},
+        }
+
+    def roadmap(self):
+        delay, outcome, choice = self._draw(self.roadmap_latency)
+        self._count('roadmap')
+        if outcome == 'error':
+            self._count('errors')
+            status = 429 if choice < 0.3 else 503
+            return delay, status, {'error': {'code': status, 'message': 'mock upstream error', 'status': 'UNAVAILABLE'}}
+        text = self.roadmaps[int(choice * len(self.roadmaps))]
+        if outcome == 'malformed':
+            self._count('malformed')
+            with self._lock:
+                text = truncate(text, self._rng) if choice < 0.5 else 'I am sorry, I cannot help with that.'
+        return delay, 200, {
+            'candidates': [{
+                'content': {'role': 'model', 'parts': [{'text': text}]},
+                'finishReason': 'STOP',
+                'index': 0,
+            }],
+            'usageMetadata': {'promptTokenCount': 420, 'candidatesTokenCount': 900, 'totalTokenCount': 1320},
+        }
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters)
+
+
+def make_handler(behaviour):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _send(self, delay, status, payload):
+            time.sleep(delay)
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _write_chunk(self, data):
+            self.wfile.write(f'{len(data):x}\r\n'.encode() + data + b'\r\n')
+            self.wfile.flush()
+
+        def _send_stream(self, delay, status, payload):
+            """Send a Gemini answer as SSE frames spread over ``delay``, like a model generating it."""
+            if status != 200:
+                self._send(delay, status, payload)
+                return
+            text = payload['candidates'][0]['content']['parts'][0]['text']
+            pieces = [text[i:i + STREAM_CHUNK_SIZE] for i in range(0, len(text), STREAM_CHUNK_SIZE)] or ['']
+            time.sleep(delay * STREAM_FIRST_CHUNK_SHARE)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            gap = delay * (1 - STREAM_FIRST_CHUNK_SHARE) / len(pieces)
+            for i, piece in enumerate(pieces):
+                if i:
+                    time.sleep(gap)
+                frame = {'candidates': [{'content': {'role': 'model', 'parts': [{'text': piece}]}, 'index': 0}]}
+                if i == len(pieces) - 1:
+                    frame['usageMetadata'] = payload['usageMetadata']
+                self._write_chunk(f'data: {json.dumps(frame)}\r\n\r\n'.encode())
+            self._write_chunk(b'')
+
+        def _read_json(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            try:
+                return json.loads(body or b'{}')
+            except ValueError:
+                return {}
+
+        def do_GET(self):
+            if self.path.split('?')[0] == '/functions':
+                self._send(*behaviour.catalog())
+            else:
+                self._send(0, 404, {'detail': 'not found'})
+
+        def do_POST(self):
+            path = self.path.split('?')[0]
+            payload = self._read_json()
+            if PEXEC_PATH.match(path):
+                self._send(*behaviour.chat(payload.get('model', '')))
+            elif GEMINI_PATH.match(path):
+                self._send(*behaviour.roadmap())
+            elif GEMINI_STREAM_PATH.match(path):
+                self._send_stream(*behaviour.roadmap())
+            else:
+                self._send(0, 404, {'detail': 'not found'})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 resets connections under a burst of requests
+    request_queue_size = 1024
+
+    def __init__(self, behaviour, host='127.0.0.1', port=0):
+        super().__init__((host, port), make_handler(behaviour))
+        self.behaviour = behaviour
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        """Serve from a daemon thread and return self."""
+        threading.Thread(target=self.serve_forever, name='mock-llm', daemon=True).start()
+        return self
+
+
+def add_behaviour_arguments(parser):
+    parser.add_argument('--chat-latency', default='lognormal:0.8,0.4',
+                        help='NVCF pexec latency spec (default: %(default)s)')
+    parser.add_argument('--roadmap-latency', default='lognormal:3,0.3',
+                        help='Gemini generateContent latency spec (default: %(default)s)')
+    parser.add_argument('--catalog-latency', default='fixed:0.05',
+                        help='NVCF /functions latency spec (default: %(default)s)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of calls answered with 429/503')
+    parser.add_argument('--malformed-rate', type=float, default=0.0, help='share of calls with an unusable body')
+    parser.add_argument('--seed', type=int, default=None)
+
+
+def behaviour_from_args(parser, args):
+    try:
+        return MockBehaviour(
+            chat_latency=args.chat_latency,
+            roadmap_latency=args.roadmap_latency,
+            catalog_latency=args.catalog_latency,
+            error_rate=args.error_rate,
+            malformed_rate=args.malformed_rate,
+            seed=args.seed,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8099)
+    add_behaviour_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockLLMServer(behaviour_from_args(parser, args), args.host, args.port)
+    print(f'Mock NVCF and Gemini APIs on {server.url}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(server.behaviour.stats()))
+
+
+if __name__ == '__main__':
+    main()
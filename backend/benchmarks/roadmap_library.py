@@ -0,0 +1,73 @@
+"""
+Time the curated roadmap library's matcher and see how much traffic it absorbs.
+
+Runs api.roadmap_library.roadmap_library over a sample of realistic roadmap
+prompts, printing which template (if any) each one matched and with what
+confidence, the share answered without a Gemini call at the configured
+threshold, and the mean time per lookup. Run from the backend directory:
+
+    python benchmarks/roadmap_library.py --iterations 20000 --min-confidence 0.6
+"""
+import argparse
+import logging
+import os
+import sys
+import timeit
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+PROMPTS = [
+    'anxiety',
+    'Help me manage my anxiety',
+    'I keep having panic attacks',
+    'How do I stop overthinking and racing thoughts?',
+    'I feel anxious at work before meetings',
+    'anxiety and sleep issues',
+    "I can't sleep at night",
+    'trouble falling asleep',
+    'insomnia',
+    'always tired',
+    'stress',
+    "I'm overwhelmed with deadlines",
+    "I'm stressed about work",
+    "I'm burned out from my job",
+    'I feel exhausted and unmotivated at work',
+    'burnout recovery',
+    'my dog died and I am sad',
+    'I just moved to a new city and feel lonely',
+    'how can I be more confident when speaking in public',
+    'I want to build a healthy morning routine',
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=20000, help='lookups of each prompt to time')
+    parser.add_argument('--min-confidence', type=float, default=None, help='override ROADMAP_LIBRARY_MIN_CONFIDENCE')
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mindwell.settings')
+    import django
+    django.setup()
+    logging.disable(logging.CRITICAL)
+
+    from api.roadmap_library import RoadmapLibrary
+
+    library = RoadmapLibrary.load(min_confidence=args.min_confidence)
+    for prompt in PROMPTS:
+        match = library.match(prompt)
+        outcome = f'{match.template_id} ({match.confidence:.2f})' if match else f'gemini ({library.score(prompt)[1]:.2f})'
+        print(f'{prompt:<55} {outcome}')
+
+    stats = library.stats()
+    print(f"\nabsorbed {stats['matched']}/{stats['lookups']} prompts ({stats['absorbed_rate']:.0%}) "
+          f"at min confidence {library.min_confidence}")
+
+    seconds = min(timeit.repeat(lambda: [library.match(prompt) for prompt in PROMPTS], number=args.iterations // 10,
+                                repeat=3))
+    print(f"mean lookup: {seconds / (args.iterations // 10) / len(PROMPTS) * 1e6:.1f} us")
+
+
+if __name__ == '__main__':
+    main()
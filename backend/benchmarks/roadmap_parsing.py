@@ -0,0 +1,89 @@
+"""
+Micro-benchmark roadmap parsing on recorded model outputs.
+
+Compares the previous multi-pass cleanup (fence split, find/rfind, quote
+replacement, two regex passes, json.loads and a json.dumps(indent=2) for
+logging) against api.roadmap.parse_roadmap, and reports which outputs each
+one can turn into a valid roadmap. Run from the backend directory:
+
+    python benchmarks/roadmap_parsing.py --iterations 2000
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import timeit
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'roadmap_outputs.json')
+
+
+def legacy_parse(content):
+    """The cleanup WellbeingRoadmapView.post used to run, minus the logging calls."""
+    if '```json' in content:
+        content = content.split('```json')[1].split('```')[0].strip()
+    elif '```' in content:
+        content = content.split('```')[1].split('```')[0].strip()
+    content = content.strip()
+    content = content[content.find('{'):]
+    content = content[:content.rfind('}')+1]
+    content = content.replace("'", '"')
+    content = content.replace('"s', '"s')
+    content = content.replace('"t', '"t')
+    content = content.replace('"re', '"re')
+    content = content.replace('"ll', '"ll')
+    content = content.replace('"ve', '"ve')
+    content = re.sub(r'(?<!\\)"([^"]*?)(?<!\\)"', r'"\1"', content)
+    content = re.sub(r',(\s*[}\]])', r'\1', content)
+    if not (content.startswith('{') and content.endswith('}')):
+        raise ValueError('not an object')
+    try:
+        roadmap_data = json.loads(content)
+        json.dumps(roadmap_data, indent=2)
+    except json.JSONDecodeError:
+        fixed_content = re.sub(r'(?<!\\)"([^"]*?)(?<!\\)"', r'"\1"', content)
+        roadmap_data = json.loads(fixed_content)
+    return roadmap_data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mindwell.settings')
+    import django
+    django.setup()
+    logging.disable(logging.CRITICAL)
+    from api.roadmap import parse_roadmap
+
+    with open(FIXTURES) as f:
+        samples = json.load(f)
+
+    print(f"{'output':<24}{'legacy us':>12}{'new us':>10}{'speedup':>10}   legacy / new")
+    for sample in samples:
+        results = []
+        for func in (legacy_parse, parse_roadmap):
+            try:
+                func(sample['output'])
+                ok = 'ok'
+            except Exception:
+                ok = 'FAIL'
+
+            def run():
+                try:
+                    func(sample['output'])
+                except Exception:
+                    pass
+
+            seconds = min(timeit.repeat(run, number=args.iterations, repeat=5)) / args.iterations
+            results.append((seconds, ok))
+        (legacy, legacy_ok), (new, new_ok) = results
+        print(f"{sample['name']:<24}{legacy * 1e6:>12.1f}{new * 1e6:>10.1f}{legacy / new:>9.1f}x   {legacy_ok} / {new_ok}")
+
+
+if __name__ == '__main__':
+    main()
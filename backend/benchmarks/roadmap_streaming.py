@@ -0,0 +1,86 @@
+"""
+Time to the first roadmap node with and without streaming, against the mock LLM server.
+
+Without streaming the client sees nothing until the whole roadmap has been
+generated and validated; with ``stream: true`` the header and each step
+arrive as Gemini writes them. Reports, per mode, when the header, the first
+step and the finished roadmap reached the client. Run from the backend
+directory:
+
+    python benchmarks/roadmap_streaming.py --requests 10 --roadmap-latency fixed:4
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+
+from mock_llm import MockLLMServer, add_behaviour_arguments, behaviour_from_args
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def timed_request(view, factory, prompt, stream):
+    """Seconds until the header, the first step and the end of the response (None if never seen)."""
+    started = time.perf_counter()
+    request = factory.post('/api/wellbeing/roadmap/', {'prompt': prompt, 'stream': stream}, format='json')
+    response = view(request)
+    header = first_step = None
+    if stream:
+        for frame in response.streaming_content:
+            frame = frame.decode() if isinstance(frame, bytes) else frame
+            now = time.perf_counter() - started
+            if header is None and frame.startswith('event: roadmap'):
+                header = now
+            elif first_step is None and frame.startswith('event: step'):
+                first_step = now
+    else:
+        header = first_step = time.perf_counter() - started
+    return header, first_step, time.perf_counter() - started
+
+
+def summarize(label, timings):
+    columns = []
+    for name, values in zip(('header', 'first step', 'done'), zip(*timings)):
+        values = [value for value in values if value is not None]
+        columns.append(f"{name} {statistics.median(values):6.2f}s" if values else f"{name}      -")
+    print(f"{label:<12} " + '   '.join(columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=10, help='requests per mode')
+    add_behaviour_arguments(parser)
+    parser.set_defaults(roadmap_latency='fixed:4')
+    args = parser.parse_args()
+
+    server = MockLLMServer(behaviour_from_args(parser, args)).start()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mindwell.settings')
+    os.environ['GEMINI_API_KEY'] = 'mock'
+    os.environ['GEMINI_API_ENDPOINT'] = server.url
+
+    import django
+    django.setup()
+    logging.disable(logging.CRITICAL)
+
+    from rest_framework.test import APIRequestFactory
+    from api.cache import roadmap_cache
+    from api.views import WellbeingRoadmapView
+
+    view = WellbeingRoadmapView.as_view()
+    factory = APIRequestFactory()
+    for stream in (False, True):
+        roadmap_cache.clear()
+        timings = [
+            timed_request(view, factory, f'Anxiety and poor sleep, attempt {i}', stream)
+            for i in range(args.requests)
+        ]
+        summarize('streaming' if stream else 'buffered', timings)
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Measure worker startup time and baseline memory with lazily loaded providers.
+
+Each run starts a fresh interpreter, sets Django up and imports
+``mindwell.urls`` as a worker does before serving its first request,
+then reports the wall time of that import and the process RSS. The
+``eager`` row also loads every provider in api.registry and builds the
+Gemini model, which is what a worker pays once it has served both kinds
+of request.
+Linux only, since RSS is read from /proc. Run from the backend directory:
+
+    python benchmarks/startup.py --runs 5
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STARTUP_SNIPPET = """
+import os, time
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mindwell.settings')
+os.environ.setdefault('GEMINI_API_KEY', 'benchmark')
+import logging; logging.disable(logging.CRITICAL)
+started = time.perf_counter()
+import django; django.setup()
+import mindwell.urls
+if {eager}:
+    from api.registry import providers
+    providers.get('nvcf_async')
+    providers.get('gemini').model
+elapsed = time.perf_counter() - started
+rss = next(int(line.split()[1]) for line in open('/proc/self/status') if line.startswith('VmRSS:'))
+print(elapsed, rss)
+"""
+
+
+def startup(eager, runs):
+    """Best-of-N startup seconds and the matching RSS in MB."""
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', STARTUP_SNIPPET.format(eager=eager)],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        ).stdout
+        seconds, rss = output.strip().splitlines()[-1].split()
+        samples.append((float(seconds), int(rss) / 1024))
+    return min(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    lazy_seconds, lazy_rss = startup(False, args.runs)
+    eager_seconds, eager_rss = startup(True, args.runs)
+    print(f"lazy providers:   {lazy_seconds * 1e3:7.1f} ms  {lazy_rss:6.1f} MB RSS")
+    print(f"eager providers:  {eager_seconds * 1e3:7.1f} ms  {eager_rss:6.1f} MB RSS")
+    print(f"saved per worker: {(eager_seconds - lazy_seconds) * 1e3:7.1f} ms  {eager_rss - lazy_rss:6.1f} MB RSS")
+
+
+if __name__ == '__main__':
+    main()
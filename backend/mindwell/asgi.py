@@ -2,5 +2,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mindwell.settings')
- 
+
+# Serve with an ASGI server (e.g. `uvicorn mindwell.asgi:application`) so the
+# async views under /api/async/ can hold many upstream calls per worker
 application = get_asgi_application() 
\ No newline at end of file
@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
 from dotenv import load_dotenv
+from corsheaders.defaults import default_headers
 import logging
 
 # Configure logging
@@ -126,6 +127,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True  # Configure this appropriately in production
+CORS_ALLOW_HEADERS = (*default_headers, 'x-request-timeout')
 
 # REST Framework settings
 REST_FRAMEWORK = {
@@ -171,4 +173,87 @@ LOGGING = {
             'propagate': True,
         },
     },
-} 
\ No newline at end of file
+}
+
+# AI service settings
+NVCF_API_BASE = os.getenv('NVCF_API_BASE', 'https://api.nvcf.nvidia.com/v2/nvcf')
+# Seconds before the cached NVCF function selection is refreshed in the background
+NVCF_CATALOG_TTL = int(os.getenv('NVCF_CATALOG_TTL', '300'))
+
+# Shared upstream HTTP pool (api/http_client.py); timeouts are in seconds
+UPSTREAM_POOL_CONNECTIONS = int(os.getenv('UPSTREAM_POOL_CONNECTIONS', '4'))
+UPSTREAM_POOL_MAXSIZE = int(os.getenv('UPSTREAM_POOL_MAXSIZE', '10'))
+UPSTREAM_CONNECT_TIMEOUT = float(os.getenv('UPSTREAM_CONNECT_TIMEOUT', '5'))
+UPSTREAM_READ_TIMEOUT = float(os.getenv('UPSTREAM_READ_TIMEOUT', '60'))
+
+# Gemini API host override, e.g. http://127.0.0.1:8099 for benchmarks/mock_llm.py;
+# empty uses Google's default endpoint over gRPC
+GEMINI_API_ENDPOINT = os.getenv('GEMINI_API_ENDPOINT', '')
+
+# Connection cap for the httpx client used by the async views
+UPSTREAM_ASYNC_MAX_CONNECTIONS = int(os.getenv('UPSTREAM_ASYNC_MAX_CONNECTIONS', '100'))
+
+# In-process cache of validated roadmaps keyed on the normalized prompt
+ROADMAP_CACHE_SIZE = int(os.getenv('ROADMAP_CACHE_SIZE', '256'))
+ROADMAP_CACHE_TTL = int(os.getenv('ROADMAP_CACHE_TTL', '3600'))
+
+# NVCF function routing (api/router.py): EWMA weight, error rate above which a
+# function stops taking regular traffic, and seconds between probes of the others
+NVCF_ROUTER_ALPHA = float(os.getenv('NVCF_ROUTER_ALPHA', '0.3'))
+NVCF_ROUTER_MAX_ERROR_RATE = float(os.getenv('NVCF_ROUTER_MAX_ERROR_RATE', '0.5'))
+NVCF_ROUTER_PROBE_INTERVAL = float(os.getenv('NVCF_ROUTER_PROBE_INTERVAL', '30'))
+
+# Hedged upstream calls (api/hedging.py): once HEDGE_MIN_SAMPLES latencies are
+# known, a call slower than the HEDGE_PERCENTILE latency gets a second call;
+# extra calls are capped at HEDGE_BUDGET_RATIO of traffic
+HEDGE_ENABLED = os.getenv('HEDGE_ENABLED', 'False') == 'True'
+HEDGE_PERCENTILE = float(os.getenv('HEDGE_PERCENTILE', '95'))
+HEDGE_MIN_SAMPLES = int(os.getenv('HEDGE_MIN_SAMPLES', '20'))
+HEDGE_WINDOW = int(os.getenv('HEDGE_WINDOW', '200'))
+HEDGE_BUDGET_RATIO = float(os.getenv('HEDGE_BUDGET_RATIO', '0.1'))
+# Threads for hedged calls in the synchronous views; a call that finds too few
+# free runs unhedged on the request thread
+HEDGE_MAX_WORKERS = int(os.getenv('HEDGE_MAX_WORKERS', '32'))
+
+# Per-provider circuit breakers and the shared retry budget (api/resilience.py)
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '5'))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv('CIRCUIT_RESET_TIMEOUT', '30'))
+RETRY_BUDGET_RATIO = float(os.getenv('RETRY_BUDGET_RATIO', '0.2'))
+RETRY_BUDGET_CAP = float(os.getenv('RETRY_BUDGET_CAP', '10'))
+
+# End-to-end request deadline in seconds (api/deadlines.py); clients may ask for
+# less, or up to REQUEST_DEADLINE_MAX, with an X-Request-Timeout header
+REQUEST_DEADLINE = float(os.getenv('REQUEST_DEADLINE', '60'))
+REQUEST_DEADLINE_MAX = float(os.getenv('REQUEST_DEADLINE_MAX', '120'))
+
+# Admission control (api/admission.py): concurrent upstream calls per provider
+# (0 = no limit), how many more may queue and for how many seconds, and whether
+# crisis-related prompts get a priority lane ahead of other traffic
+NVCF_MAX_CONCURRENCY = int(os.getenv('NVCF_MAX_CONCURRENCY', '10'))
+GEMINI_MAX_CONCURRENCY = int(os.getenv('GEMINI_MAX_CONCURRENCY', '8'))
+ADMISSION_QUEUE_SIZE = int(os.getenv('ADMISSION_QUEUE_SIZE', '32'))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv('ADMISSION_QUEUE_TIMEOUT', '10'))
+ADMISSION_PRIORITY_ENABLED = os.getenv('ADMISSION_PRIORITY_ENABLED', 'True') == 'True'
+
+# Batch chat endpoint: prompts per request and how many are in flight at once;
+# keep the concurrency at or below UPSTREAM_POOL_MAXSIZE for the sync view
+BATCH_MAX_PROMPTS = int(os.getenv('BATCH_MAX_PROMPTS', '20'))
+BATCH_MAX_CONCURRENCY = int(os.getenv('BATCH_MAX_CONCURRENCY', '8'))
+
+# Curated roadmap library (api/roadmap_library.py): prompts that match one of
+# its themes with at least this confidence (0-1) are answered without Gemini
+ROADMAP_LIBRARY_ENABLED = os.getenv('ROADMAP_LIBRARY_ENABLED', 'True') == 'True'
+ROADMAP_LIBRARY_MIN_CONFIDENCE = float(os.getenv('ROADMAP_LIBRARY_MIN_CONFIDENCE', '0.6'))
+
+# Persistent response store (api/response_store.py): a SQLite file shared by all
+# workers that keeps validated roadmaps and chat completions across restarts.
+# Entries expire after RESPONSE_STORE_TTL seconds and the least recently read
+# go beyond RESPONSE_STORE_MAX_ENTRIES. Off unless a path is given, e.g.
+# RESPONSE_STORE_PATH=response_store.sqlite3 (relative to the working directory)
+RESPONSE_STORE_PATH = os.getenv('RESPONSE_STORE_PATH', '')
+RESPONSE_STORE_MAX_ENTRIES = int(os.getenv('RESPONSE_STORE_MAX_ENTRIES', '5000'))
+RESPONSE_STORE_TTL = int(os.getenv('RESPONSE_STORE_TTL', str(7 * 24 * 3600)))
+# Chat replies are keyed by the normalized prompt alone, so a stored reply is
+# served to any user who sends an equivalent message. Off by default; only
+# turn it on where chat prompts carry nothing personal
+RESPONSE_STORE_CHAT_ENABLED = os.getenv('RESPONSE_STORE_CHAT_ENABLED', 'False') == 'True'
@@ -3,6 +3,7 @@ import { Box, TextField, Button, Typography, Paper, CircularProgress, Alert } fr
 import SendIcon from '@mui/icons-material/Send';
 import { styled } from '@mui/material/styles';
 import { Theme } from '@mui/material/styles';
+import { readEventStream } from '../utils/eventStream';
 
 const ChatContainer = styled(Paper)(({ theme }) => ({
   padding: theme.spacing(2),
@@ -86,8 +87,9 @@ const ChatInterface: React.FC = () => {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          Accept: 'text/event-stream',
         },
-        body: JSON.stringify({ prompt: input }),
+        body: JSON.stringify({ prompt: input, stream: true }),
       });
 
       if (!response.ok) {
@@ -95,15 +97,36 @@ const ChatInterface: React.FC = () => {
         throw new Error(errorData.error || 'Failed to get response from the server');
       }
 
-      const data = await response.json();
-      
-      const aiMessage: Message = {
-        text: data.generated_text,
-        isUser: false,
-        timestamp: new Date(),
-      };
+      const contentType = response.headers.get('Content-Type') || '';
+      if (!response.body || !contentType.includes('text/event-stream')) {
+        const data = await response.json();
+
+        const aiMessage: Message = {
+          text: data.generated_text,
+          isUser: false,
+          timestamp: new Date(),
+        };
 
-      setMessages(prev => [...prev, aiMessage]);
+        setMessages(prev => [...prev, aiMessage]);
+        return;
+      }
+
+      // Render the reply as tokens arrive instead of waiting for the full generation
+      setMessages(prev => [...prev, { text: '', isUser: false, timestamp: new Date() }]);
+
+      await readEventStream(response.body, (event, data) => {
+        if (event === 'token') {
+          setIsLoading(false);
+          setMessages(prev => {
+            const next = [...prev];
+            const last = next[next.length - 1];
+            next[next.length - 1] = { ...last, text: last.text + data.token };
+            return next;
+          });
+        } else if (event === 'error') {
+          throw new Error(data.error || 'The response stream was interrupted');
+        }
+      });
     } catch (err) {
       setError(err instanceof Error ? err.message : 'An unexpected error occurred');
       console.error('Error:', err);
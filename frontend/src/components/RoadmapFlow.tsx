@@ -1,4 +1,4 @@
-import React, { useCallback, useMemo } from 'react';
+import React, { useCallback, useEffect, useMemo } from 'react';
 import ReactFlow, {
   Node,
   Edge,
@@ -111,6 +111,11 @@ const RoadmapFlow: React.FC<RoadmapFlowProps> = ({ roadmap }) => {
       });
     });
 
+    // A streamed roadmap has no tips or milestones until it is complete
+    if (roadmap.tips.length === 0 && roadmap.milestones.length === 0) {
+      return { nodes, edges };
+    }
+
     // Tips and Milestones nodes at the bottom, horizontally
     const lastStepY = 180 + (roadmap.steps.length - 1) * (NODE_HEIGHT + VERTICAL_GAP);
     nodes.push({
@@ -185,6 +190,12 @@ const RoadmapFlow: React.FC<RoadmapFlowProps> = ({ roadmap }) => {
   const [nodes, setNodes, onNodesChange] = useNodesState(initialNodes);
   const [edges, setEdges, onEdgesChange] = useEdgesState(initialEdges);
 
+  // useNodesState only reads its initial value; follow the roadmap as it grows
+  useEffect(() => {
+    setNodes(initialNodes);
+    setEdges(initialEdges);
+  }, [initialNodes, initialEdges, setNodes, setEdges]);
+
   const onInit = useCallback((reactFlowInstance: any) => {
     reactFlowInstance.fitView({ padding: 0.2 });
   }, []);
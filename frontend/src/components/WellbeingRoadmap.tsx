@@ -1,4 +1,4 @@
-import React, { useState, useCallback } from 'react';
+import React, { useState, useCallback, useEffect, useRef } from 'react';
 import ReactFlow, {
   Node,
   Edge,
@@ -7,6 +7,7 @@ import ReactFlow, {
   useNodesState,
   useEdgesState,
   Position,
+  ReactFlowInstance,
 } from 'reactflow';
 import 'reactflow/dist/style.css';
 import {
@@ -19,6 +20,7 @@ import {
   Alert,
 } from '@mui/material';
 import axios from 'axios';
+import { readEventStream } from '../utils/eventStream';
 
 interface RoadmapStep {
   step: number;
@@ -44,6 +46,14 @@ const WellbeingRoadmap: React.FC = () => {
   const [roadmapData, setRoadmapData] = useState<RoadmapData | null>(null);
   const [nodes, setNodes, onNodesChange] = useNodesState([]);
   const [edges, setEdges, onEdgesChange] = useEdgesState([]);
+  const flowRef = useRef<ReactFlowInstance | null>(null);
+
+  // Keep every node in view as streamed steps are added
+  useEffect(() => {
+    if (nodes.length > 0) {
+      window.requestAnimationFrame(() => flowRef.current?.fitView({ padding: 0.2 }));
+    }
+  }, [nodes.length]);
 
   const createFlowElements = useCallback((data: RoadmapData) => {
     const newNodes: Node[] = [];
@@ -138,6 +148,13 @@ const WellbeingRoadmap: React.FC = () => {
       }
     });
 
+    // Tips and milestones arrive last when the roadmap is streamed
+    if (data.steps.length === 0 || (data.tips.length === 0 && data.milestones.length === 0)) {
+      setNodes(newNodes);
+      setEdges(newEdges);
+      return;
+    }
+
     // Create tips and milestones nodes
     const tipsNodeId = 'tips';
     const milestonesNodeId = 'milestones';
@@ -214,27 +231,68 @@ const WellbeingRoadmap: React.FC = () => {
     setEdges(newEdges);
   }, []);
 
+  const showRoadmap = useCallback((data: RoadmapData) => {
+    setRoadmapData(data);
+    createFlowElements(data);
+  }, [createFlowElements]);
+
   const handleSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
     setLoading(true);
     setError(null);
+    setNodes([]);
+    setEdges([]);
 
     try {
-      const response = await axios.post('http://localhost:8000/api/wellbeing/roadmap/', {
-        prompt,
+      const response = await fetch('http://localhost:8000/api/wellbeing/roadmap/', {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          Accept: 'text/event-stream',
+        },
+        body: JSON.stringify({ prompt, stream: true }),
       });
 
-      if (response.data.roadmap) {
-        setRoadmapData(response.data.roadmap);
-        createFlowElements(response.data.roadmap);
-      } else {
-        setError('Invalid response format from server');
+      if (!response.ok) {
+        const errorData = await response.json().catch(() => ({}));
+        throw new Error(errorData.error || `Request failed with status ${response.status}`);
+      }
+
+      const contentType = response.headers.get('Content-Type') || '';
+      if (!response.body || !contentType.includes('text/event-stream')) {
+        const data = await response.json();
+        if (data.roadmap) {
+          showRoadmap(data.roadmap);
+        } else {
+          setError('Invalid response format from server');
+        }
+        return;
       }
+
+      // Draw the title node, then each step as soon as the server has parsed it
+      let partial: RoadmapData | null = null;
+      await readEventStream(response.body, (event, data) => {
+        if (event === 'roadmap') {
+          partial = { ...data, steps: [], tips: [], milestones: [] };
+        } else if (event === 'step' && partial) {
+          partial = { ...partial, steps: [...partial.steps, data] };
+        } else if (event === 'done') {
+          partial = data.roadmap;
+        } else if (event === 'error') {
+          throw new Error(data.error || 'The roadmap stream was interrupted');
+        } else {
+          return;
+        }
+        if (partial) showRoadmap(partial);
+      });
     } catch (err) {
       if (axios.isAxiosError(err)) {
         const errorMessage = err.response?.data?.error || err.message;
         setError(`Error: ${errorMessage}`);
         console.error('Full error:', err.response?.data);
+      } else if (err instanceof Error) {
+        setError(`Error: ${err.message}`);
+        console.error('Error:', err);
       } else {
         setError('An unexpected error occurred');
         console.error('Error:', err);
@@ -279,6 +337,7 @@ const WellbeingRoadmap: React.FC = () => {
           edges={edges}
           onNodesChange={onNodesChange}
           onEdgesChange={onEdgesChange}
+          onInit={(instance) => { flowRef.current = instance; }}
           fitView
           fitViewOptions={{ padding: 0.2 }}
         >
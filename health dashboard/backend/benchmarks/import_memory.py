@@ -0,0 +1,73 @@
+"""
+Compare peak memory of whole-file and streaming Samsung Health imports.
+
+For each export size in ``--rows``, writes a synthetic pedometer_step_count
+export (see import_health_data.py) and imports it in a fresh interpreter
+into a throwaway SQLite file, once reading the file whole and once in
+``--chunk-size`` row chunks. The peak RSS of each run is printed: the
+whole-file column grows with the export, the streaming one should not.
+Linux only, since peak RSS is read from /proc. Run from the backend
+directory:
+
+    python benchmarks/import_memory.py --rows 100000,400000 --chunk-size 100000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from import_health_data import write_export
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = """
+import os, time
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'health_dashboard.settings')
+import logging; logging.disable(logging.CRITICAL)
+import django; django.setup()
+from django.db import connection
+from django.test.utils import setup_test_environment
+from health_data.importers import stream_step_counts
+setup_test_environment()
+# A file database, so written rows do not count towards the importer's memory
+connection.settings_dict['TEST']['NAME'] = {database!r}
+connection.creation.create_test_db(verbosity=0, autoclobber=True)
+started = time.perf_counter()
+totals = stream_step_counts({path!r}, chunksize={chunk_size})
+# VmHWM rather than ru_maxrss, which Linux carries over from the parent across fork and exec
+peak_kb = next(int(line.split()[1]) for line in open('/proc/self/status') if line.startswith('VmHWM:'))
+print(totals['written'], time.perf_counter() - started, peak_kb)
+"""
+
+
+def run_import(path, chunk_size):
+    """Rows written, seconds and peak RSS in MB for one import in a fresh interpreter."""
+    database = os.path.join(os.path.dirname(path), 'test.sqlite3')
+    output = subprocess.run(
+        [sys.executable, '-c', IMPORT_SNIPPET.format(path=path, chunk_size=chunk_size, database=database)],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    ).stdout
+    written, seconds, peak_kb = output.strip().splitlines()[-1].split()
+    return int(written), float(seconds), int(peak_kb) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', default='100000,400000', help='comma-separated export sizes')
+    parser.add_argument('--chunk-size', type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10}  {'whole file':>20}  {'streaming':>20}")
+    for rows in [int(value) for value in args.rows.split(',')]:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'com.samsung.shealth.tracker.pedometer_step_count.csv')
+            write_export(path, rows)
+            _, whole_seconds, whole_peak = run_import(path, 0)
+            _, stream_seconds, stream_peak = run_import(path, args.chunk_size)
+        print(f"{rows:>10,}  {whole_peak:>8.0f} MB {whole_seconds:>7.1f} s  "
+              f"{stream_peak:>8.0f} MB {stream_seconds:>7.1f} s")
+
+
+if __name__ == '__main__':
+    main()
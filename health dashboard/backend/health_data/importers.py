@@ -0,0 +1,693 @@
+"""
+Vectorized parsing and bulk writes for Samsung Health CSV exports.
+
+Samsung exports put two metadata rows above the data, so frames are read
+with ``skiprows=2, header=None`` and columns are addressed by position.
+Parsing works on whole columns at once: timestamps, UTC offsets and
+numeric fields are converted with pandas, and missing values are filled
+through masks instead of per-row checks. The cleaned frames are then
+written with chunked ``bulk_create`` calls.
+
+The ``stream_*`` functions read an export ``chunksize`` rows at a time,
+only the columns they use and with compact dtypes, and write each chunk
+before reading the next, so peak memory does not grow with the export.
+"""
+import logging
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from queue import Empty
+from datetime import date
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
+
+import django
+import numpy as np
+import pandas as pd
+from django.db import transaction
+from django.db.models import F
+
+from .models import StepCount, DailySummary, ImportCheckpoint, ImportWatermark
+from .rollups import in_batches, roll_up_daily_summaries
+
+logger = logging.getLogger(__name__)
+
+# Rows per bulk INSERT; large enough to amortise round-trips, small enough for SQLite's variable limit
+DEFAULT_BATCH_SIZE = 2000
+
+# Rows read from a CSV at a time when streaming; about 20MB of parsed step count columns
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Samsung writes timestamps in UTC; the wearer's offset is in a separate column
+SAMSUNG_TIME_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+UTC_OFFSET_PATTERN = r'^\s*UTC([+-])(\d{2})(\d{2})\s*$'
+
+# Column positions in com.samsung.shealth.tracker.pedometer_step_count.*.csv
+STEP_COUNT_COLUMNS = {
+    'duration': 0,
+    'version_code': 1,
+    'run_step': 2,
+    'walk_step': 3,
+    'start_time': 4,
+    'update_time': 7,
+    'create_time': 8,
+    'count': 9,
+    'speed': 10,
+    'distance': 11,
+    'calories': 12,
+    'timezone': 13,
+    'device_uuid': 14,
+    'pkg_name': 15,
+    'end_time': 16,
+    'data_uuid': 17,
+}
+
+# Column positions in com.samsung.shealth.tracker.pedometer_day_summary.*.csv. Position 5 repeats
+# create_sh_ver as modify_sh_ver and the trailing comma leaves an empty last column.
+DAY_SUMMARY_COLUMNS = {
+    'create_sh_ver': 0,
+    'step_count': 1,
+    'binning_data': 2,
+    'active_time': 3,
+    'recommendation': 4,
+    'modify_sh_ver': 5,
+    'run_step_count': 6,
+    'update_time': 7,
+    'source_package_name': 8,
+    'create_time': 9,
+    'source_info': 10,
+    'speed': 11,
+    'distance': 12,
+    'calories': 13,
+    'walk_step_count': 14,
+    'device_uuid': 15,
+    'pkg_name': 16,
+    'healthy_step': 17,
+    'achievement': 18,
+    'data_uuid': 19,
+    'day_time': 20,
+}
+
+
+# Dtypes for the columns the importers read; the other columns are skipped while parsing the CSV.
+# Step counts fit float32 exactly; measurements and epoch milliseconds keep float64.
+STEP_COUNT_DTYPES = {
+    STEP_COUNT_COLUMNS['run_step']: 'float32',
+    STEP_COUNT_COLUMNS['walk_step']: 'float32',
+    STEP_COUNT_COLUMNS['start_time']: 'str',
+    STEP_COUNT_COLUMNS['update_time']: 'str',
+    STEP_COUNT_COLUMNS['speed']: 'float64',
+    STEP_COUNT_COLUMNS['distance']: 'float64',
+    STEP_COUNT_COLUMNS['calories']: 'float64',
+    STEP_COUNT_COLUMNS['timezone']: 'category',
+    STEP_COUNT_COLUMNS['device_uuid']: 'category',
+    STEP_COUNT_COLUMNS['end_time']: 'str',
+    STEP_COUNT_COLUMNS['data_uuid']: 'str',
+}
+
+DAY_SUMMARY_DTYPES = {
+    DAY_SUMMARY_COLUMNS['step_count']: 'float32',
+    DAY_SUMMARY_COLUMNS['active_time']: 'float64',
+    DAY_SUMMARY_COLUMNS['update_time']: 'str',
+    DAY_SUMMARY_COLUMNS['distance']: 'float64',
+    DAY_SUMMARY_COLUMNS['calories']: 'float64',
+    DAY_SUMMARY_COLUMNS['device_uuid']: 'category',
+    DAY_SUMMARY_COLUMNS['day_time']: 'float64',
+}
+
+
+def _column(df: pd.DataFrame, position: int) -> pd.Series:
+    """The column at ``position``, or an all-missing column if the export is narrower."""
+    if position in df.columns:
+        return df[position]
+    return pd.Series(np.nan, index=df.index, dtype='float64')
+
+
+def _numbers(values: pd.Series) -> pd.Series:
+    """Coerce a column to float, with missing or malformed values as 0."""
+    return pd.to_numeric(values, errors='coerce').fillna(0.0)
+
+
+def _strings(values: pd.Series, missing: Optional[str] = None) -> pd.Series:
+    """A column as Python strings, with ``missing`` in place of missing values."""
+    values = values.astype(object)
+    return values.where(values.notna(), missing)
+
+
+def parse_samsung_times(values: pd.Series) -> pd.Series:
+    """
+    Parse a column of Samsung timestamps into UTC datetimes.
+
+    Args:
+        values: Strings such as ``'2025-05-10 15:23:00.000'``
+
+    Returns:
+        pd.Series: ``datetime64[ns, UTC]`` values, NaT where a value is missing or malformed
+    """
+    times = pd.to_datetime(values, format=SAMSUNG_TIME_FORMAT, errors='coerce', utc=True)
+    # Only the few values that failed are stripped of padding and tried again
+    retry = (times.isna() & values.notna()).to_numpy()
+    if retry.any():
+        times[retry] = pd.to_datetime(values[retry].astype(str).str.strip(), format=SAMSUNG_TIME_FORMAT,
+                                      errors='coerce', utc=True)
+    return times
+
+
+def parse_utc_offsets(values: pd.Series) -> pd.Series:
+    """
+    Parse a column of Samsung ``time_offset`` values such as ``'UTC+0530'``.
+
+    An export holds a handful of distinct offsets, so each distinct value
+    is parsed once and the results are spread back over the rows.
+
+    Args:
+        values: Offset strings, possibly missing
+
+    Returns:
+        pd.Series: ``timedelta64[ns]`` offsets, zero where a value is missing or malformed
+    """
+    codes, uniques = pd.factorize(values)
+    parts = pd.Series(uniques, dtype='string').str.extract(UTC_OFFSET_PATTERN)
+    minutes = pd.to_numeric(parts[1], errors='coerce') * 60 + pd.to_numeric(parts[2], errors='coerce')
+    minutes = minutes.where(parts[0] != '-', -minutes).fillna(0).to_numpy(dtype='float64')
+    minutes = np.where(codes >= 0, minutes[codes] if len(minutes) else 0.0, 0.0)
+    return pd.Series(pd.to_timedelta(minutes, unit='m'), index=values.index)
+
+
+def step_count_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Clean a raw pedometer_step_count frame into StepCount fields.
+
+    Rows without a parseable start or end time are dropped. Step counts
+    are walk plus run steps; missing metrics become 0. ``date`` is the
+    calendar day in the wearer's own timezone, from the row's UTC offset.
+    A record repeated under the same ``data_uuid`` keeps its last row.
+
+    Args:
+        df: Frame read with ``skiprows=2, header=None``
+
+    Returns:
+        pd.DataFrame: Columns ``date``, ``start_time``, ``end_time``, ``count``,
+        ``distance``, ``calories``, ``speed``, ``device_uuid``, ``data_uuid`` and ``update_time``
+    """
+    start_time = parse_samsung_times(_column(df, STEP_COUNT_COLUMNS['start_time']))
+    end_time = parse_samsung_times(_column(df, STEP_COUNT_COLUMNS['end_time']))
+    valid = (start_time.notna() & end_time.notna()).to_numpy()
+    df, start_time, end_time = df[valid], start_time[valid], end_time[valid]
+
+    local_time = start_time.dt.tz_localize(None) + parse_utc_offsets(_column(df, STEP_COUNT_COLUMNS['timezone']))
+    steps = (_numbers(_column(df, STEP_COUNT_COLUMNS['walk_step'])).astype('int64')
+             + _numbers(_column(df, STEP_COUNT_COLUMNS['run_step'])).astype('int64'))
+    data_uuid = _strings(_column(df, STEP_COUNT_COLUMNS['data_uuid']))
+
+    frame = pd.DataFrame({
+        'date': local_time.dt.normalize(),
+        'start_time': start_time,
+        'end_time': end_time,
+        'count': steps,
+        'distance': _numbers(_column(df, STEP_COUNT_COLUMNS['distance'])),
+        'calories': _numbers(_column(df, STEP_COUNT_COLUMNS['calories'])),
+        'speed': _numbers(_column(df, STEP_COUNT_COLUMNS['speed'])),
+        'device_uuid': _strings(_column(df, STEP_COUNT_COLUMNS['device_uuid']), ''),
+        'data_uuid': data_uuid,
+        'update_time': parse_samsung_times(_column(df, STEP_COUNT_COLUMNS['update_time'])),
+    })
+    # The same record twice in one upsert statement is an error on some databases
+    repeated = data_uuid.notna().to_numpy() & data_uuid.duplicated(keep='last').to_numpy()
+    return frame[~repeated].reset_index(drop=True)
+
+
+def day_summary_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Clean a raw pedometer_day_summary frame into DailySummary fields.
+
+    ``day_time`` is the start of the day in epoch milliseconds; rows
+    without one are dropped. When the export holds several rows for one
+    day (one per device), the last one wins, as it did with
+    ``update_or_create``.
+
+    Args:
+        df: Frame read with ``skiprows=2, header=None``
+
+    Returns:
+        pd.DataFrame: Columns ``date``, ``step_count``, ``distance``, ``calories``, ``active_time``,
+        ``device_uuid`` and ``update_time``
+    """
+    day_time = pd.to_numeric(_column(df, DAY_SUMMARY_COLUMNS['day_time']), errors='coerce')
+    valid = day_time.notna().to_numpy()
+    df, day_time = df[valid], day_time[valid]
+
+    frame = pd.DataFrame({
+        'date': pd.to_datetime(day_time.astype('int64'), unit='ms', utc=True).dt.tz_localize(None).dt.normalize(),
+        'step_count': _numbers(_column(df, DAY_SUMMARY_COLUMNS['step_count'])).astype('int64'),
+        'distance': _numbers(_column(df, DAY_SUMMARY_COLUMNS['distance'])),
+        'calories': _numbers(_column(df, DAY_SUMMARY_COLUMNS['calories'])),
+        'active_time': _numbers(_column(df, DAY_SUMMARY_COLUMNS['active_time'])).astype('int64'),
+        'device_uuid': _strings(_column(df, DAY_SUMMARY_COLUMNS['device_uuid']), ''),
+        'update_time': parse_samsung_times(_column(df, DAY_SUMMARY_COLUMNS['update_time'])),
+    })
+    return frame.drop_duplicates('date', keep='last').reset_index(drop=True)
+
+
+def write_step_counts(frame: pd.DataFrame, batch_size: int = DEFAULT_BATCH_SIZE,
+                      touched: Optional[Set[date]] = None) -> int:
+    """
+    Upsert a cleaned step count frame on ``data_uuid`` in chunks of ``batch_size`` rows.
+
+    Re-importing a record updates it in place; rows without a
+    ``data_uuid`` are always inserted. When ``touched`` is given, the
+    days written to are added to it, including the previous day of any
+    record that moved, for roll_up_daily_summaries().
+
+    Model instances are built one chunk at a time from plain Python
+    lists, so the whole frame is never held as objects at once.
+
+    Returns:
+        int: Number of rows inserted or updated
+    """
+    written = 0
+    for offset in range(0, len(frame), batch_size):
+        chunk = frame.iloc[offset:offset + batch_size]
+        objects = [
+            StepCount(
+                date=date,
+                start_time=start_time,
+                end_time=end_time,
+                count=count,
+                distance=distance,
+                calories=calories,
+                speed=speed,
+                device_uuid=device_uuid,
+                data_uuid=data_uuid,
+            )
+            for date, start_time, end_time, count, distance, calories, speed, device_uuid, data_uuid in zip(
+                chunk['date'].dt.date,
+                chunk['start_time'].dt.to_pydatetime(),
+                chunk['end_time'].dt.to_pydatetime(),
+                chunk['count'].tolist(),
+                chunk['distance'].tolist(),
+                chunk['calories'].tolist(),
+                chunk['speed'].tolist(),
+                chunk['device_uuid'].tolist(),
+                chunk['data_uuid'].tolist(),
+            )
+        ]
+        if touched is not None:
+            touched.update(step_count.date for step_count in objects)
+            data_uuids = [step_count.data_uuid for step_count in objects if step_count.data_uuid is not None]
+            for batch in in_batches(data_uuids):
+                touched.update(StepCount.objects.filter(data_uuid__in=batch).values_list('date', flat=True))
+        StepCount.objects.bulk_create(
+            objects,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['data_uuid'],
+            update_fields=['date', 'start_time', 'end_time', 'count', 'distance', 'calories', 'speed', 'device_uuid',
+                           'updated_at'],
+        )
+        written += len(objects)
+    return written
+
+
+def write_step_counts_and_roll_up(frame: pd.DataFrame, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Upsert step counts and recompute the DailySummary of every day they touched.
+
+    Returns:
+        int: Number of step count rows inserted or updated
+    """
+    touched: Set[date] = set()
+    with transaction.atomic():
+        written = write_step_counts(frame, batch_size=batch_size, touched=touched)
+        roll_up_daily_summaries(touched)
+    return written
+
+
+def write_daily_summaries(frame: pd.DataFrame, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Upsert a cleaned daily summary frame on ``date`` in chunks of ``batch_size`` rows.
+
+    Days that have step counts are left out, since their summaries are
+    rolled up from those.
+
+    Returns:
+        int: Number of rows inserted or updated
+    """
+    written = 0
+    for offset in range(0, len(frame), batch_size):
+        chunk = frame.iloc[offset:offset + batch_size]
+        dates = chunk['date'].dt.date
+        rolled_up = set()
+        for batch in in_batches(dates.unique()):
+            rolled_up.update(StepCount.objects.filter(date__in=batch).values_list('date', flat=True))
+        if rolled_up:
+            chunk = chunk[~dates.isin(rolled_up)]
+        objects = [
+            DailySummary(date=date, step_count=step_count, distance=distance, calories=calories,
+                         active_time=active_time)
+            for date, step_count, distance, calories, active_time in zip(
+                chunk['date'].dt.date,
+                chunk['step_count'].tolist(),
+                chunk['distance'].tolist(),
+                chunk['calories'].tolist(),
+                chunk['active_time'].tolist(),
+            )
+        ]
+        DailySummary.objects.bulk_create(
+            objects,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['date'],
+            update_fields=['step_count', 'distance', 'calories', 'active_time', 'updated_at'],
+        )
+        written += len(objects)
+    return written
+
+
+def read_samsung_csv(file_path: str, dtypes: Optional[Dict[int, str]] = None, chunksize: Optional[int] = None,
+                     start_row: int = 0) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+    """
+    Read a Samsung Health CSV, skipping its two metadata rows.
+
+    Args:
+        file_path: Path to the export
+        dtypes: Column position to dtype; when given, only those columns are read
+        chunksize: Rows per frame; when given, an iterator of frames is returned
+        start_row: Data rows to skip, to resume a partly imported file
+
+    Returns:
+        The whole export as one frame, or an iterator over frames of ``chunksize`` rows
+    """
+    return pd.read_csv(
+        file_path,
+        skiprows=2 + start_row,
+        header=None,
+        usecols=sorted(dtypes) if dtypes else None,
+        dtype=dtypes,
+        chunksize=chunksize or None,
+    )
+
+
+def _parsed_chunks(file_path, dtypes, parse, chunksize, start_row=0):
+    """Yield ``(rows read, cleaned frame)`` for each chunk of an export."""
+    try:
+        chunks = read_samsung_csv(file_path, dtypes=dtypes, chunksize=chunksize, start_row=start_row)
+    except pd.errors.EmptyDataError:
+        # Nothing left after start_row
+        return
+    for chunk in (chunks if chunksize else [chunks]):
+        yield len(chunk), parse(chunk)
+
+
+def _stream(file_path, dtypes, parse, write, chunksize, batch_size, progress):
+    totals = {'rows': 0, 'written': 0}
+    for rows, frame in _parsed_chunks(file_path, dtypes, parse, chunksize):
+        totals['written'] += write(frame, batch_size=batch_size)
+        totals['rows'] += rows
+        if progress is not None:
+            progress(totals['rows'])
+    totals['skipped'] = totals['rows'] - totals['written']
+    return totals
+
+
+def stream_step_counts(file_path: str, chunksize: int = DEFAULT_CHUNK_SIZE, batch_size: int = DEFAULT_BATCH_SIZE,
+                       progress: Optional[Callable[[int], None]] = None) -> Dict[str, int]:
+    """
+    Import a pedometer_step_count export chunk by chunk.
+
+    The DailySummary of every day a chunk touches is rolled up as it is
+    written.
+
+    Args:
+        file_path: Path to the export
+        chunksize: Rows read and written at a time; 0 reads the whole file at once
+        batch_size: Rows per bulk INSERT
+        progress: Called with the number of rows processed so far after each chunk
+
+    Returns:
+        Dict with the ``rows`` read, the rows ``written`` and the rows ``skipped``
+    """
+    return _stream(file_path, STEP_COUNT_DTYPES, step_count_frame, write_step_counts_and_roll_up, chunksize, batch_size,
+                   progress)
+
+
+def stream_daily_summaries(file_path: str, chunksize: int = DEFAULT_CHUNK_SIZE,
+                           batch_size: int = DEFAULT_BATCH_SIZE,
+                           progress: Optional[Callable[[int], None]] = None) -> Dict[str, int]:
+    """
+    Import a pedometer_day_summary export chunk by chunk.
+
+    Each chunk is upserted on ``date``, so when a day repeats in a later
+    chunk the later row still wins. Arguments and result are as for
+    stream_step_counts().
+    """
+    return _stream(file_path, DAY_SUMMARY_DTYPES, day_summary_frame, write_daily_summaries, chunksize, batch_size,
+                   progress)
+
+
+class TrackerImporter(NamedTuple):
+    label: str
+    dtypes: Dict[int, str]
+    parse: Callable[[pd.DataFrame], pd.DataFrame]
+    write: Callable[..., int]
+    # Why rows of this type end up skipped, for reports
+    skipped: str
+
+
+# Importers by Samsung Health data type; exported CSVs of any other type are reported and left alone
+TRACKER_IMPORTERS = {
+    'com.samsung.shealth.tracker.pedometer_step_count': TrackerImporter(
+        'step counts', STEP_COUNT_DTYPES, step_count_frame, write_step_counts_and_roll_up,
+        'without a usable timestamp or repeating a record'),
+    'com.samsung.shealth.tracker.pedometer_day_summary': TrackerImporter(
+        'daily summaries', DAY_SUMMARY_DTYPES, day_summary_frame, write_daily_summaries,
+        'without a usable date, repeating a day or for days summarized from step counts'),
+}
+
+# Samsung names each CSV <data type>.<export timestamp>.csv
+EXPORT_FILE_PATTERN = re.compile(r'^(com\.samsung\.shealth\.[\w.]+?)\.(\d+)\.csv$')
+
+
+def discover_exports(data_dir: str) -> Dict[str, List[str]]:
+    """
+    Find every Samsung Health CSV in an export directory.
+
+    Args:
+        data_dir: The unpacked export directory
+
+    Returns:
+        Dict mapping each data type found to its file paths, oldest export first
+    """
+    exports: Dict[str, List[Tuple[int, str]]] = {}
+    for name in os.listdir(data_dir):
+        match = EXPORT_FILE_PATTERN.match(name)
+        if match:
+            exports.setdefault(match.group(1), []).append((int(match.group(2)), os.path.join(data_dir, name)))
+    return {data_type: [path for _, path in sorted(files)] for data_type, files in sorted(exports.items())}
+
+
+def _parse_files(data_type, files, chunksize):
+    """
+    Messages for the writer from parsing one data type's files in order.
+
+    Yields ``('chunk', data_type, (path, rows, frame))`` per chunk and
+    ``('file', data_type, path)`` once a file is fully parsed. A file that
+    fails yields ``('error', data_type, message)`` and ends the data type,
+    since its later exports must not overtake it.
+    """
+    importer = TRACKER_IMPORTERS[data_type]
+    for path, start_row in files:
+        try:
+            for rows, frame in _parsed_chunks(path, importer.dtypes, importer.parse, chunksize, start_row):
+                yield 'chunk', data_type, (path, rows, frame)
+        except Exception as e:
+            yield 'error', data_type, f'{os.path.basename(path)}: {str(e)}'
+            return
+        yield 'file', data_type, path
+
+
+def _parse_exports(data_type, files, chunksize, queue):
+    """Parser process: queue one data type's messages for the writer."""
+    for message in _parse_files(data_type, files, chunksize):
+        queue.put(message)
+    queue.put(('done', data_type, None))
+
+
+def _serial_messages(plan, chunksize):
+    for data_type, files in plan.items():
+        yield from _parse_files(data_type, files, chunksize)
+
+
+def _pooled_messages(plan, chunksize, workers):
+    context = multiprocessing.get_context()
+    with context.Manager() as manager, ProcessPoolExecutor(
+        max_workers=workers, mp_context=context, initializer=django.setup
+    ) as pool:
+        # Bounded, so parsers wait for the writer instead of piling parsed chunks up in memory
+        queue = manager.Queue(maxsize=2 * workers)
+        futures = [pool.submit(_parse_exports, data_type, files, chunksize, queue)
+                   for data_type, files in plan.items()]
+        remaining = len(futures)
+        try:
+            while remaining:
+                try:
+                    message = queue.get(timeout=1)
+                except Empty:
+                    # A parser process that died without reporting surfaces here as BrokenProcessPool
+                    for future in futures:
+                        if future.done():
+                            future.result()
+                    continue
+                if message[0] == 'done':
+                    remaining -= 1
+                else:
+                    yield message
+        finally:
+            if remaining:
+                # The writer stopped early; closing the queue releases parsers blocked on it
+                pool.shutdown(wait=False, cancel_futures=True)
+                manager.shutdown()
+
+
+def _plan_files(exports, resume):
+    """
+    Pair each file with the data row to start from, from its ImportCheckpoint.
+
+    A completed file of the same size is left out altogether. A file
+    without a checkpoint, of a different size, or imported with
+    ``resume`` off starts from its first row.
+    """
+    plan = {}
+    for data_type, paths in exports.items():
+        files = []
+        for path in paths:
+            path = os.path.abspath(path)
+            size = os.path.getsize(path)
+            checkpoint = ImportCheckpoint.objects.filter(path=path).first()
+            if resume and checkpoint is not None and checkpoint.size == size:
+                if not checkpoint.completed:
+                    files.append((path, checkpoint.rows))
+                continue
+            ImportCheckpoint.objects.update_or_create(path=path, defaults={'size': size, 'rows': 0, 'completed': False})
+            files.append((path, 0))
+        if files:
+            plan[data_type] = files
+    return plan
+
+
+def load_watermarks(data_type: str) -> Dict[str, pd.Timestamp]:
+    """The latest imported ``update_time`` for each device that has sent ``data_type``."""
+    return {
+        device_uuid: pd.Timestamp(update_time)
+        for device_uuid, update_time in ImportWatermark.objects.filter(data_type=data_type).values_list(
+            'device_uuid', 'update_time')
+    }
+
+
+def current_rows(frame: pd.DataFrame, watermarks: Dict[str, pd.Timestamp]) -> np.ndarray:
+    """
+    Mask of rows already imported in their current form.
+
+    A row is current when its device has a watermark and the row's
+    ``update_time`` is not newer than it. Rows without an ``update_time``
+    are never considered current.
+    """
+    if not watermarks or not len(frame):
+        return np.zeros(len(frame), dtype=bool)
+    marks = pd.to_datetime(frame['device_uuid'].map(watermarks), utc=True)
+    return (frame['update_time'].notna() & (frame['update_time'] <= marks)).to_numpy()
+
+
+def _advance_watermarks(data_type, watermarks, latest):
+    """Raise the stored watermarks to the newest ``update_time`` written per device."""
+    for device_uuid, update_time in latest.items():
+        if device_uuid in watermarks and watermarks[device_uuid] >= update_time:
+            continue
+        ImportWatermark.objects.update_or_create(
+            data_type=data_type, device_uuid=device_uuid, defaults={'update_time': update_time.to_pydatetime()}
+        )
+        watermarks[device_uuid] = update_time
+
+
+def import_exports(exports: Dict[str, List[str]], workers: int = 1, chunksize: int = DEFAULT_CHUNK_SIZE,
+                   batch_size: int = DEFAULT_BATCH_SIZE, resume: bool = True,
+                   progress: Optional[Callable[[str, int], None]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Import discovered exports with parallel parsers and a single database writer.
+
+    Each data type with an importer is parsed in its own process (up to
+    ``workers`` at once), its files in export order so later exports win.
+    Parsed chunks come back through a bounded queue and are written by
+    the calling process alone, so only one connection ever writes and
+    workers never touch the database. With ``workers`` of 1, or a single
+    data type, everything runs in the calling process.
+
+    Imports are idempotent and resumable. Rows are upserted, and rows no
+    newer than their device's ImportWatermark are dropped before they
+    reach the database. Each chunk is committed together with its file's
+    ImportCheckpoint, so an interrupted import picks up after the last
+    committed chunk. A file's watermarks only advance once the whole
+    file is in. With ``resume`` off neither checkpoints nor watermarks
+    hold anything back, e.g. to re-import rows after a partial wipe; the
+    watermarks still only ever move forward.
+
+    Args:
+        exports: As returned by discover_exports(); types without an importer are ignored
+        workers: Parser processes; more than one per data type would sit idle
+        chunksize: Rows parsed and written at a time; 0 reads each file whole
+        batch_size: Rows per bulk INSERT
+        resume: Continue from checkpoints and skip rows under the watermarks; when off, every
+            file is imported from its first row and every row is written
+        progress: Called with the data type and its rows processed so far after each chunk
+
+    Returns:
+        Dict by data type with the ``rows`` read, rows ``written``, rows that were already
+        ``current``, rows ``skipped`` as unusable, rows ``resumed`` past and any ``errors``
+    """
+    exports = {data_type: paths for data_type, paths in exports.items() if data_type in TRACKER_IMPORTERS}
+    totals = {data_type: {'rows': 0, 'written': 0, 'current': 0, 'skipped': 0, 'resumed': 0, 'errors': []}
+              for data_type in exports}
+    plan = _plan_files(exports, resume)
+    for data_type, files in plan.items():
+        totals[data_type]['resumed'] = sum(start_row for _, start_row in files)
+    watermarks = {data_type: load_watermarks(data_type) for data_type in plan}
+    # Newest update_time written per file and device, applied to the watermarks when the file completes
+    latest: Dict[str, Dict[str, pd.Timestamp]] = {}
+
+    workers = min(workers, len(plan))
+    if workers > 1:
+        messages = _pooled_messages(plan, chunksize, workers)
+    else:
+        messages = _serial_messages(plan, chunksize)
+
+    for kind, data_type, payload in messages:
+        result = totals[data_type]
+        if kind == 'error':
+            logger.error(f"Error importing {data_type}: {payload}")
+            result['errors'].append(payload)
+            continue
+        if kind == 'file':
+            with transaction.atomic():
+                _advance_watermarks(data_type, watermarks[data_type], latest.pop(payload, {}))
+                ImportCheckpoint.objects.filter(path=payload).update(completed=True)
+            continue
+
+        path, rows, frame = payload
+        current = current_rows(frame, watermarks[data_type] if resume else {})
+        fresh = frame[~current]
+        with transaction.atomic():
+            written = TRACKER_IMPORTERS[data_type].write(fresh, batch_size=batch_size)
+            ImportCheckpoint.objects.filter(path=path).update(rows=F('rows') + rows)
+        newest = fresh[fresh['update_time'].notna()].groupby('device_uuid')['update_time'].max()
+        file_latest = latest.setdefault(path, {})
+        for device_uuid, update_time in newest.items():
+            if device_uuid not in file_latest or update_time > file_latest[device_uuid]:
+                file_latest[device_uuid] = update_time
+
+        result['rows'] += rows
+        result['written'] += written
+        result['current'] += int(current.sum())
+        result['skipped'] = result['rows'] - result['written'] - result['current']
+        if progress is not None:
+            progress(data_type, result['rows'])
+    return totals
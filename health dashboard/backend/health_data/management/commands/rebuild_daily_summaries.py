@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from health_data.rollups import rebuild_daily_summaries
+
+class Command(BaseCommand):
+    help = 'Rebuild every daily summary from step counts and report days the incremental rollups got wrong'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help='Only report inconsistent days, and exit with an error if there are any')
+
+    def handle(self, *args, **options):
+        result = rebuild_daily_summaries(save=not options['check'])
+        inconsistent = len(result['missing']) + len(result['stale'])
+
+        for kind in ('missing', 'stale'):
+            if result[kind]:
+                self.stdout.write(self.style.WARNING(f"{len(result[kind])} daily summaries {kind}"))
+                if options['verbosity'] >= 2:
+                    for day in result[kind]:
+                        self.stdout.write(f'  {day}')
+
+        if options['check']:
+            if inconsistent:
+                raise CommandError(f'{inconsistent} daily summaries do not match their step counts')
+            self.stdout.write(self.style.SUCCESS('Daily summaries match their step counts'))
+        elif inconsistent:
+            self.stdout.write(self.style.SUCCESS(f'Corrected {inconsistent} daily summaries'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Daily summaries already matched their step counts'))
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('health_data', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=500, unique=True)),
+                ('size', models.BigIntegerField(help_text='File size in bytes; a different size restarts the file')),
+                ('rows', models.BigIntegerField(default=0, help_text='Data rows committed')),
+                ('completed', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='stepcount',
+            name='data_uuid',
+            field=models.CharField(blank=True, help_text='Samsung Health record id, so re-imports update instead of duplicating', max_length=64, null=True, unique=True),
+        ),
+        migrations.CreateModel(
+            name='ImportWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data_type', models.CharField(max_length=200)),
+                ('device_uuid', models.CharField(max_length=100)),
+                ('update_time', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('data_type', 'device_uuid'), name='unique_import_watermark')],
+            },
+        ),
+    ]
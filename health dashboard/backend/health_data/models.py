@@ -10,6 +10,8 @@ class StepCount(models.Model):
     calories = models.FloatField()
     speed = models.FloatField(help_text="Speed in m/s")
     device_uuid = models.CharField(max_length=100)
+    data_uuid = models.CharField(max_length=64, unique=True, null=True, blank=True,
+                                 help_text="Samsung Health record id, so re-imports update instead of duplicating")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -36,3 +38,29 @@ class DailySummary(models.Model):
 
     def __str__(self):
         return f"{self.date}: {self.step_count} steps, {self.distance/1000:.2f} km"
+
+class ImportWatermark(models.Model):
+    """Latest Samsung ``update_time`` imported per data type and device; older rows are already current."""
+    data_type = models.CharField(max_length=200)
+    device_uuid = models.CharField(max_length=100)
+    update_time = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['data_type', 'device_uuid'], name='unique_import_watermark'),
+        ]
+
+    def __str__(self):
+        return f"{self.data_type} {self.device_uuid}: {self.update_time}"
+
+class ImportCheckpoint(models.Model):
+    """How far the import of one export file got, so an interrupted import resumes there."""
+    path = models.CharField(max_length=500, unique=True)
+    size = models.BigIntegerField(help_text="File size in bytes; a different size restarts the file")
+    rows = models.BigIntegerField(default=0, help_text="Data rows committed")
+    completed = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.path}: {self.rows} rows{' (completed)' if self.completed else ''}"
@@ -0,0 +1,286 @@
+import os
+import tempfile
+from datetime import date, datetime, timezone
+from io import StringIO
+from unittest import mock
+
+import pandas as pd
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..importers import (
+    day_summary_frame,
+    discover_exports,
+    import_exports,
+    parse_utc_offsets,
+    read_samsung_csv,
+    step_count_frame,
+    stream_daily_summaries,
+    stream_step_counts,
+)
+from ..models import DailySummary, ImportCheckpoint, ImportWatermark, StepCount
+
+STEP_COUNT_FILE = 'com.samsung.shealth.tracker.pedometer_step_count.20250511020679.csv'
+DAY_SUMMARY_FILE = 'com.samsung.shealth.tracker.pedometer_day_summary.20250511020679.csv'
+
+
+def step_count_row(start_time, end_time, walk=98, run=0, offset='UTC+0530', device='InfE8IGVow',
+                   update_time='2025-05-10 15:25:00.009', data_uuid=None):
+    return [
+        '60000', '4', str(run), str(walk), start_time, '', '', update_time,
+        '2025-05-10 15:23:02.819', '98.1', '1.2213265', '73.27959', '3.4752014', offset, device,
+        'com.sec.android.app.shealth', end_time, data_uuid or f'uuid-{start_time}', '',
+    ]
+
+
+def day_summary_row(day_time, step_count):
+    return [
+        '62950170', str(step_count), 'binning_data.json', '549859', '6000', '62950170.1', '13',
+        '2025-05-10 18:30:00.536', 'com.sec.android.app.shealth', '2025-05-10 15:23:02.898', 'source_info.json',
+        '1.270005', '698.324', '33.73201', '875', 'VfS0qUERdZ', 'com.sec.android.app.shealth.1', '0',
+        'achievement.json', '5c9db927-fdd8-4891-8823-f4f1b32a520f', day_time, '',
+    ]
+
+
+def write_export(directory, name, rows):
+    """Write rows below the two metadata lines of a Samsung Health CSV."""
+    with open(os.path.join(directory, name), 'w') as f:
+        f.write(f'{name.rsplit(".", 2)[0]},6313011,4\n')
+        f.write(','.join(f'column_{i}' for i in range(len(rows[0]))) + '\n')
+        for row in rows:
+            f.write(','.join(row) + '\n')
+
+
+class TestSamsungParsing(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_utc_offsets(self):
+        offsets = parse_utc_offsets(pd.Series(['UTC+0530', 'UTC-0800', None, 'bogus']))
+        self.assertEqual([o.total_seconds() for o in offsets], [19800, -28800, 0, 0])
+
+    def test_step_counts_use_the_local_day_and_drop_rows_without_times(self):
+        write_export(self.directory.name, STEP_COUNT_FILE, [
+            step_count_row('2025-05-10 15:23:00.000', '2025-05-10 15:24:00.000', walk=98, run=2),
+            # 19:00 UTC is already the next day at UTC+0530
+            step_count_row('2025-05-10 19:00:00.000', '2025-05-10 19:01:00.000', offset='UTC+0530'),
+            step_count_row('', '2025-05-10 15:24:00.000'),
+            step_count_row('2025-05-10 16:00:00.000', '2025-05-10 16:01:00.000', walk='', device=''),
+        ])
+
+        frame = step_count_frame(read_samsung_csv(os.path.join(self.directory.name, STEP_COUNT_FILE)))
+
+        self.assertEqual(len(frame), 3)
+        self.assertEqual(list(frame['date'].dt.date), [date(2025, 5, 10), date(2025, 5, 11), date(2025, 5, 10)])
+        self.assertEqual(list(frame['count']), [100, 98, 0])
+        self.assertEqual(frame['start_time'][0].to_pydatetime(), datetime(2025, 5, 10, 15, 23, tzinfo=timezone.utc))
+        self.assertEqual(frame['device_uuid'][2], '')
+
+    def test_day_summaries_keep_the_last_row_per_day(self):
+        write_export(self.directory.name, DAY_SUMMARY_FILE, [
+            day_summary_row('1746835200000', 800),
+            day_summary_row('1746835200000', 888),
+            day_summary_row('', 100),
+        ])
+
+        frame = day_summary_frame(read_samsung_csv(os.path.join(self.directory.name, DAY_SUMMARY_FILE)))
+
+        self.assertEqual(list(frame['date'].dt.date), [date(2025, 5, 10)])
+        self.assertEqual(list(frame['step_count']), [888])
+
+
+class TestExportDiscovery(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_finds_every_export_oldest_first(self):
+        for name in [
+            'com.samsung.shealth.tracker.pedometer_step_count.20250601000000.csv',
+            STEP_COUNT_FILE,
+            'com.samsung.health.heart_rate.20250511020679.csv',
+            'com.samsung.shealth.sleep.20250511020679.csv',
+            'notes.csv',
+        ]:
+            open(os.path.join(self.directory.name, name), 'w').close()
+
+        exports = discover_exports(self.directory.name)
+
+        self.assertEqual(list(exports), ['com.samsung.shealth.sleep', 'com.samsung.shealth.tracker.pedometer_step_count'])
+        self.assertEqual([os.path.basename(path) for path in exports['com.samsung.shealth.tracker.pedometer_step_count']],
+                         [STEP_COUNT_FILE, 'com.samsung.shealth.tracker.pedometer_step_count.20250601000000.csv'])
+
+    def test_parser_processes_feed_one_writer(self):
+        write_export(self.directory.name, 'com.samsung.shealth.tracker.pedometer_step_count.20250601000000.csv', [
+            step_count_row('2025-05-10 15:23:00.000', '2025-05-10 15:24:00.000'),
+            step_count_row('2025-05-10 15:24:00.000', '2025-05-10 15:25:00.000'),
+        ])
+        write_export(self.directory.name, DAY_SUMMARY_FILE, [day_summary_row('1746748800000', 888)])
+        write_export(self.directory.name, 'com.samsung.shealth.sleep.20250511020679.csv', [['1', '2']])
+
+        totals = import_exports(discover_exports(self.directory.name), workers=2, chunksize=1)
+
+        self.assertEqual(totals['com.samsung.shealth.tracker.pedometer_step_count']['written'], 2)
+        self.assertEqual(totals['com.samsung.shealth.tracker.pedometer_day_summary']['written'], 1)
+        self.assertNotIn('com.samsung.shealth.sleep', totals)
+        self.assertEqual(StepCount.objects.count(), 2)
+        self.assertEqual(list(DailySummary.objects.order_by('date').values_list('step_count', flat=True)), [888, 196])
+
+    def test_a_broken_file_does_not_stop_the_others(self):
+        write_export(self.directory.name, STEP_COUNT_FILE, [['not', 'a', 'step', 'count', 'row']])
+        write_export(self.directory.name, DAY_SUMMARY_FILE, [day_summary_row('1746835200000', 888)])
+
+        with self.assertLogs('health_data.importers', 'ERROR'):
+            totals = import_exports(discover_exports(self.directory.name), workers=2)
+
+        self.assertEqual(len(totals['com.samsung.shealth.tracker.pedometer_step_count']['errors']), 1)
+        self.assertEqual(DailySummary.objects.get().step_count, 888)
+
+
+class TestIdempotentImports(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, STEP_COUNT_FILE)
+        write_export(self.directory.name, STEP_COUNT_FILE, [
+            step_count_row(f'2025-05-10 15:{minute:02d}:00.000', f'2025-05-10 15:{minute + 1:02d}:00.000')
+            for minute in range(5)
+        ])
+
+    def import_steps(self, **kwargs):
+        totals = import_exports(discover_exports(self.directory.name), chunksize=2, **kwargs)
+        return totals['com.samsung.shealth.tracker.pedometer_step_count']
+
+    def test_a_completed_file_is_not_read_again(self):
+        self.import_steps()
+        checkpoint = ImportCheckpoint.objects.get()
+        self.assertEqual((checkpoint.rows, checkpoint.completed), (5, True))
+        self.assertEqual(ImportWatermark.objects.get().device_uuid, 'InfE8IGVow')
+
+        result = self.import_steps()
+
+        self.assertEqual((result['rows'], result['written']), (0, 0))
+        self.assertEqual(StepCount.objects.count(), 5)
+
+    def test_rows_already_imported_are_not_written_again(self):
+        self.import_steps()
+        # A changed file is read again from its first row
+        with open(self.path, 'a') as f:
+            f.write('\n')
+
+        result = self.import_steps()
+
+        self.assertEqual(result, {'rows': 5, 'written': 0, 'current': 5, 'skipped': 0, 'resumed': 0, 'errors': []})
+        self.assertEqual(StepCount.objects.count(), 5)
+
+    def test_restart_rewrites_rows_under_the_watermark(self):
+        self.import_steps()
+        StepCount.objects.filter(start_time__gte=datetime(2025, 5, 10, 15, 2, tzinfo=timezone.utc)).delete()
+        mark = ImportWatermark.objects.get().update_time
+
+        result = self.import_steps(resume=False)
+
+        self.assertEqual((result['written'], result['current']), (5, 0))
+        self.assertEqual(StepCount.objects.count(), 5)
+        self.assertEqual(ImportWatermark.objects.get().update_time, mark)
+
+    def test_newer_rows_replace_older_ones_by_data_uuid(self):
+        self.import_steps()
+        write_export(self.directory.name, STEP_COUNT_FILE, [
+            step_count_row('2025-05-10 15:00:00.000', '2025-05-10 15:01:00.000', walk=120,
+                           update_time='2025-05-11 08:00:00.000'),
+            step_count_row('2025-05-10 15:01:00.000', '2025-05-10 15:02:00.000'),
+        ])
+
+        result = self.import_steps()
+
+        self.assertEqual((result['written'], result['current']), (1, 1))
+        self.assertEqual(StepCount.objects.count(), 5)
+        self.assertEqual(StepCount.objects.get(data_uuid='uuid-2025-05-10 15:00:00.000').count, 120)
+        self.assertEqual(ImportWatermark.objects.get().update_time, datetime(2025, 5, 11, 8, tzinfo=timezone.utc))
+
+    def test_an_interrupted_import_resumes_from_its_checkpoint(self):
+        self.import_steps()
+        # As if the import had stopped after committing its first chunk
+        StepCount.objects.filter(start_time__gte=datetime(2025, 5, 10, 15, 2, tzinfo=timezone.utc)).delete()
+        ImportCheckpoint.objects.update(rows=2, completed=False)
+        ImportWatermark.objects.all().delete()
+
+        result = self.import_steps()
+
+        self.assertEqual((result['resumed'], result['rows'], result['written']), (2, 3, 3))
+        self.assertEqual(StepCount.objects.count(), 5)
+        self.assertTrue(ImportCheckpoint.objects.get().completed)
+
+    def test_a_resumed_file_with_nothing_left_completes(self):
+        self.import_steps()
+        ImportCheckpoint.objects.update(completed=False)
+
+        result = self.import_steps()
+
+        self.assertEqual((result['resumed'], result['rows']), (5, 0))
+        self.assertTrue(ImportCheckpoint.objects.get().completed)
+
+
+class TestImportHealthDataCommand(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        write_export(self.directory.name, STEP_COUNT_FILE, [
+            step_count_row(f'2025-05-10 15:{minute:02d}:00.000', f'2025-05-10 15:{minute + 1:02d}:00.000')
+            for minute in range(7)
+        ])
+        write_export(self.directory.name, DAY_SUMMARY_FILE, [day_summary_row('1746835200000', 888)])
+
+    def test_imports_in_batches_and_upserts_summaries(self):
+        write_export(self.directory.name, DAY_SUMMARY_FILE, [day_summary_row('1746748800000', 888)])
+        DailySummary.objects.create(date=date(2025, 5, 9), step_count=1, distance=0, calories=0, active_time=0)
+
+        call_command('import_health_data', self.directory.name, batch_size=3, workers=1, stdout=StringIO())
+
+        self.assertEqual(StepCount.objects.count(), 7)
+        self.assertEqual(StepCount.objects.filter(date=date(2025, 5, 10), count=98).count(), 7)
+        summary = DailySummary.objects.get(date=date(2025, 5, 9))
+        self.assertEqual((summary.step_count, summary.active_time), (888, 549859))
+        self.assertEqual((summary.distance, summary.calories), (698.324, 33.73201))
+
+    def test_days_with_step_counts_are_rolled_up_from_them(self):
+        call_command('import_health_data', self.directory.name, workers=1, stdout=StringIO())
+
+        summary = DailySummary.objects.get()
+        self.assertEqual((summary.step_count, summary.active_time), (7 * 98, 7 * 60))
+        self.assertAlmostEqual(summary.distance, 7 * 73.27959)
+
+    def test_reports_why_rows_were_skipped_and_uses_one_worker_per_type(self):
+        write_export(self.directory.name, DAY_SUMMARY_FILE, [
+            day_summary_row('1746748800000', 800),
+            day_summary_row('1746748800000', 888),
+        ])
+        out = StringIO()
+        with mock.patch('health_data.management.commands.import_health_data.import_exports',
+                        wraps=import_exports) as run:
+            call_command('import_health_data', self.directory.name, workers=8, stdout=out)
+
+        self.assertEqual(run.call_args.kwargs['workers'], 2)
+        self.assertIn('Skipped 1 daily summaries rows without a usable date, repeating a day or for days summarized '
+                      'from step counts', out.getvalue())
+
+    def test_streams_in_chunks_with_progress(self):
+        processed = []
+        totals = stream_step_counts(os.path.join(self.directory.name, STEP_COUNT_FILE), chunksize=3, batch_size=2,
+                                    progress=processed.append)
+
+        self.assertEqual(processed, [3, 6, 7])
+        self.assertEqual(totals, {'rows': 7, 'written': 7, 'skipped': 0})
+        self.assertEqual(StepCount.objects.count(), 7)
+
+    def test_later_chunks_win_for_a_repeated_day(self):
+        write_export(self.directory.name, DAY_SUMMARY_FILE, [
+            day_summary_row('1746835200000', 800),
+            day_summary_row('1746835200000', 888),
+        ])
+
+        stream_daily_summaries(os.path.join(self.directory.name, DAY_SUMMARY_FILE), chunksize=1)
+
+        self.assertEqual(DailySummary.objects.get().step_count, 888)
@@ -0,0 +1,84 @@
+from datetime import date, datetime, timedelta, timezone
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+
+from ..models import DailySummary, StepCount
+from ..rollups import in_batches, rebuild_daily_summaries, roll_up_daily_summaries
+
+
+def create_step_count(day, hour, count, data_uuid=None):
+    start_time = datetime(day.year, day.month, day.day, hour, tzinfo=timezone.utc)
+    return StepCount.objects.create(
+        date=day, start_time=start_time, end_time=start_time + timedelta(minutes=1), count=count, distance=10,
+        calories=1.5, speed=1, device_uuid='InfE8IGVow', data_uuid=data_uuid,
+    )
+
+
+class TestDailyRollups(TestCase):
+    def setUp(self):
+        self.first, self.second = date(2025, 5, 9), date(2025, 5, 10)
+        create_step_count(self.first, 8, 100)
+        create_step_count(self.first, 9, 50)
+        create_step_count(self.second, 8, 70)
+
+    def test_rolls_up_every_touched_day_in_one_query(self):
+        with self.assertNumQueries(4):
+            # The grouped aggregate and the upsert, inside a savepoint; no day is left empty here
+            self.assertEqual(roll_up_daily_summaries({self.first, self.second}), 2)
+
+        first = DailySummary.objects.get(date=self.first)
+        self.assertEqual((first.step_count, first.distance, first.calories, first.active_time), (150, 20, 3, 120))
+        self.assertEqual(DailySummary.objects.get(date=self.second).step_count, 70)
+
+    def test_only_touched_days_are_recomputed(self):
+        roll_up_daily_summaries({self.first, self.second})
+        create_step_count(self.first, 10, 25)
+        create_step_count(self.second, 10, 30)
+
+        roll_up_daily_summaries({self.first})
+
+        self.assertEqual(DailySummary.objects.get(date=self.first).step_count, 175)
+        self.assertEqual(DailySummary.objects.get(date=self.second).step_count, 70)
+
+    def test_a_day_left_without_step_counts_loses_its_summary(self):
+        roll_up_daily_summaries({self.second})
+        StepCount.objects.filter(date=self.second).delete()
+
+        roll_up_daily_summaries({self.second})
+
+        self.assertFalse(DailySummary.objects.filter(date=self.second).exists())
+
+    def test_lookups_stay_under_the_query_variable_limit(self):
+        create_step_count(date(2025, 5, 11), 8, 30)
+        DailySummary.objects.create(date=date(2025, 5, 12), step_count=1, distance=0, calories=0, active_time=0)
+
+        with mock.patch.object(connection.features, 'max_query_params', 2):
+            self.assertEqual(list(map(len, in_batches(range(5)))), [2, 2, 1])
+            roll_up_daily_summaries({self.first, self.second, date(2025, 5, 11), date(2025, 5, 12)})
+
+        self.assertEqual(list(DailySummary.objects.order_by('date').values_list('step_count', flat=True)),
+                         [150, 70, 30])
+
+    def test_rebuild_reports_missing_and_stale_days(self):
+        roll_up_daily_summaries({self.first})
+        DailySummary.objects.filter(date=self.first).update(step_count=1)
+
+        self.assertEqual(rebuild_daily_summaries(save=False), {'missing': [self.second], 'stale': [self.first]})
+        rebuild_daily_summaries()
+
+        self.assertEqual(rebuild_daily_summaries(save=False), {'missing': [], 'stale': []})
+        self.assertEqual(DailySummary.objects.get(date=self.first).step_count, 150)
+
+    def test_check_command_fails_until_rebuilt(self):
+        with self.assertRaises(CommandError):
+            call_command('rebuild_daily_summaries', check=True, stdout=StringIO())
+
+        call_command('rebuild_daily_summaries', stdout=StringIO())
+        call_command('rebuild_daily_summaries', check=True, stdout=StringIO())
+
+        self.assertEqual(DailySummary.objects.count(), 2)
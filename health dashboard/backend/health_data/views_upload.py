@@ -14,7 +14,8 @@ from django.core.files.base import ContentFile
 from django.db import transaction, IntegrityError
 from django.core.exceptions import ValidationError
 from django.utils import timezone
-from .models import StepCount, DailySummary
+from .models import StepCount
+from .rollups import in_batches, roll_up_daily_summaries
 from .utils import validate_file, process_health_data, save_uploaded_file
 
 # Constants for data processing
@@ -109,6 +110,9 @@ class FileUploadView(APIView):
                 ]
                 StepCount.objects.bulk_create(step_instances, ignore_conflicts=True)
                 result['steps_imported'] = len(step_instances)
+                touched_dates = {step.date for step in step_instances}
+            else:
+                touched_dates = set()
             
             # Save heart rate data
             if 'heart_rate' in data and data['heart_rate']:
@@ -155,44 +159,13 @@ class FileUploadView(APIView):
                 result['workouts_imported'] = len(workout_instances)
             
             # Update daily summaries
-            result['daily_summaries_updated'] = self._update_daily_summaries(user)
+            result['daily_summaries_updated'] = self._update_daily_summaries(touched_dates)
             
         return result
     
-    def _update_daily_summaries(self, user):
-        """Update daily summaries based on the imported data."""
-        # Get the most recent date with step data
-        latest_step = StepCount.objects.filter(user=user).order_by('-date').first()
-        if not latest_step:
-            return 0
-            
-        # Calculate summary for the latest date
-        daily_steps = StepCount.objects.filter(
-            user=user,
-            date=latest_step.date
-        ).aggregate(
-            total_steps=Sum('count'),
-            total_distance=Sum('distance'),
-            total_calories=Sum('calories'),
-            active_time=Sum(
-                (F('end_time__hour') * 3600 + F('end_time__minute') * 60 + F('end_time__second')) -
-                (F('start_time__hour') * 3600 + F('start_time__minute') * 60 + F('start_time__second'))
-            )
-        )
-        
-        # Create or update the daily summary
-        DailySummary.objects.update_or_create(
-            user=user,
-            date=latest_step.date,
-            defaults={
-                'step_count': daily_steps['total_steps'] or 0,
-                'distance': daily_steps['total_distance'] or 0,
-                'calories': daily_steps['total_calories'] or 0,
-                'active_time': daily_steps['active_time'] or 0
-            }
-        )
-        
-        return 1
+    def _update_daily_summaries(self, dates):
+        """Recompute the daily summary of every day the upload wrote step counts for."""
+        return roll_up_daily_summaries(dates)
 
     def process_samsung_health_data(self, file_path):
         """Process Samsung Health data from the uploaded file."""
@@ -215,7 +188,6 @@ class FileUploadView(APIView):
         try:
             # This is a simplified example - adjust based on actual Samsung Health export format
             step_data = []
-            daily_summaries = {}
             
             # Example structure - adjust according to actual export format
             for item in data.get('data', []):
@@ -237,35 +209,10 @@ class FileUploadView(APIView):
                         device_uuid='samsung_health_import'
                     ))
                     
-                    # Update daily summary
-                    if date not in daily_summaries:
-                        daily_summaries[date] = {
-                            'step_count': 0,
-                            'distance': 0,
-                            'calories': 0,
-                            'active_time': 0
-                        }
-                    
-                    daily_summaries[date]['step_count'] += steps
-                    daily_summaries[date]['distance'] += distance
-                    daily_summaries[date]['calories'] += calories
-                    
                 except (ValueError, KeyError) as e:
                     continue
             
-            # Create daily summary objects
-            daily_summary_objects = [
-                DailySummary(
-                    date=date,
-                    step_count=values['step_count'],
-                    distance=values['distance'] * 1000,  # Convert km to meters
-                    calories=values['calories'],
-                    active_time=values.get('active_time', 0)
-                )
-                for date, values in daily_summaries.items()
-            ]
-            
-            return step_data, daily_summary_objects
+            return step_data
             
         except Exception as e:
             raise Exception(f"Error processing JSON data: {str(e)}")
@@ -297,7 +244,6 @@ class FileUploadView(APIView):
             
             # Process the data
             step_data = []
-            daily_summaries = {}
             
             for _, row in df.iterrows():
                 try:
@@ -320,35 +266,10 @@ class FileUploadView(APIView):
                         device_uuid='file_import'
                     ))
                     
-                    # Update daily summary
-                    if date not in daily_summaries:
-                        daily_summaries[date] = {
-                            'step_count': 0,
-                            'distance': 0,
-                            'calories': 0,
-                            'active_time': 0
-                        }
-                    
-                    daily_summaries[date]['step_count'] += steps
-                    daily_summaries[date]['distance'] += distance
-                    daily_summaries[date]['calories'] += calories
-                    
                 except (ValueError, KeyError) as e:
                     continue
             
-            # Create daily summary objects
-            daily_summary_objects = [
-                DailySummary(
-                    date=date,
-                    step_count=values['step_count'],
-                    distance=values['distance'] * 1000,  # Convert km to meters
-                    calories=values['calories'],
-                    active_time=values['active_time']
-                )
-                for date, values in daily_summaries.items()
-            ]
-            
-            return step_data, daily_summary_objects
+            return step_data
             
         except Exception as e:
             raise Exception(f"Error processing tabular data: {str(e)}")
@@ -388,24 +309,26 @@ class FileUploadView(APIView):
                     destination.write(chunk)
             
             # Process the file
-            step_data, daily_summaries = self.process_samsung_health_data(temp_file_path)
+            step_data = self.process_samsung_health_data(temp_file_path)
             
             # Save to database in a transaction
             with transaction.atomic():
                 # Delete existing data for these dates to avoid duplicates
                 if step_data:
-                    dates = list(set(step.date for step in step_data))
-                    StepCount.objects.filter(date__in=dates).delete()
-                    DailySummary.objects.filter(date__in=dates).delete()
+                    dates = set(step.date for step in step_data)
+                    for batch in in_batches(dates):
+                        StepCount.objects.filter(date__in=batch).delete()
                     
-                    # Bulk create new records
+                    # Bulk create new records and roll their days up
                     StepCount.objects.bulk_create(step_data)
-                    DailySummary.objects.bulk_create(daily_summaries)
+                    daily_summaries_updated = self._update_daily_summaries(dates)
+                else:
+                    daily_summaries_updated = 0
             
             return Response({
                 'message': 'File processed successfully',
                 'steps_imported': len(step_data),
-                'daily_summaries': len(daily_summaries)
+                'daily_summaries': daily_summaries_updated
             }, status=status.HTTP_201_CREATED)
             
         except Exception as e: